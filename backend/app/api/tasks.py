@@ -3,18 +3,22 @@
 """
 
 import math
+from pathlib import Path
 from typing import Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, status
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Response, status
 from loguru import logger
 
-from app.models import TaskStatus
+from app.config import settings
+from app.models import OutputFormat, TaskStatus
 from app.schemas import (
     TaskCreate,
     TaskResponse,
     TaskDetail,
     TaskListResponse,
+    SegmentResponse,
+    SegmentUpdate,
 )
 from app.services import TaskService, StorageService
 from .deps import get_task_service, get_storage_service
@@ -27,9 +31,12 @@ async def create_task(
     video: Optional[UploadFile] = File(None, description="视频文件（与 video_key 二选一）"),
     video_key: Optional[str] = Form(None, description="前端直传 OSS 后的文件路径"),
     source_language: str = Form(..., description="源语言代码，如 zh, en"),
-    target_language: str = Form(..., description="目标语言代码"),
+    target_language: str = Form(..., description="目标语言代码，多个语言用逗号分隔（如 en,ja,ko）"),
     title: Optional[str] = Form(None, description="任务标题"),
-    subtitle_mode: str = Form("burn", description="字幕模式: none/external/burn"),
+    subtitle_mode: str = Form("burn", description="字幕模式: none/external/burn/soft"),
+    output_format: str = Form("mp4", description="输出格式: mp4/hls/m4a/opus"),
+    preview: bool = Form(False, description="快速预览：只处理开头一段（高优先级队列）"),
+    preview_seconds: Optional[int] = Form(None, description="预览时长（秒，可选）"),
     task_service: TaskService = Depends(get_task_service),
     storage_service: StorageService = Depends(get_storage_service),
 ):
@@ -39,9 +46,16 @@ async def create_task(
     - **video_key**: 前端直传 OSS 后的文件路径（推荐，由 /upload/presign 返回）
     - **video**: 视频文件（后端中转模式，小文件适用）
     - **source_language**: 源语言代码（必需）
-    - **target_language**: 目标语言代码（必需）
+    - **target_language**: 目标语言代码（必需）。多个语言用逗号分隔时，
+      提取音频/语音识别/声音复刻只执行一次，各语言的翻译/合成/视频合成并行执行，
+      返回主任务（第一个语言），其他语言任务通过 `GET /tasks/{id}/children` 查询
     - **title**: 任务标题（可选）
     - **subtitle_mode**: 字幕模式（可选，默认 burn）
+    - **output_format**: 输出格式（可选，默认 mp4；hls 在合成过程中即可通过播放列表观看；
+      m4a/opus 只输出配音音轨和字幕，跳过视频下载与封装）
+    - **preview**: 快速预览（可选）。只处理开头 preview_seconds 秒（默认 2 分钟），
+      在独立的高优先级队列上执行；确认效果后通过 `POST /tasks/{id}/full` 转为完整任务，
+      预览阶段的译文 / 声音 / 分段音频会被复用
     """
     # 验证：video 和 video_key 必须提供其一
     has_video = video is not None and video.filename
@@ -53,8 +67,14 @@ async def create_task(
     valid_languages = {"zh", "en", "ja", "ko", "es", "fr", "de", "ru"}
     if source_language not in valid_languages:
         raise HTTPException(status_code=400, detail=f"Invalid source_language: {source_language}")
-    if target_language not in valid_languages:
-        raise HTTPException(status_code=400, detail=f"Invalid target_language: {target_language}")
+    target_languages = list(
+        dict.fromkeys(lang.strip() for lang in target_language.split(",") if lang.strip())
+    )
+    if not target_languages:
+        raise HTTPException(status_code=400, detail="target_language is required")
+    for lang in target_languages:
+        if lang not in valid_languages:
+            raise HTTPException(status_code=400, detail=f"Invalid target_language: {lang}")
 
     # 验证字幕模式
     from app.models import SubtitleMode
@@ -63,8 +83,31 @@ async def create_task(
     except ValueError:
         raise HTTPException(
             status_code=400,
-            detail=f"Invalid subtitle_mode: {subtitle_mode}. Must be one of: none, external, burn"
+            detail=f"Invalid subtitle_mode: {subtitle_mode}. Must be one of: none, external, burn, soft"
+        ) from None
+
+    # 验证输出格式
+    try:
+        output_format_enum = OutputFormat(output_format.upper())
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid output_format: {output_format}. Must be one of: mp4, hls, m4a, opus"
+        ) from None
+
+    # 验证预览参数
+    preview_duration_ms = None
+    if preview:
+        if len(target_languages) > 1:
+            raise HTTPException(status_code=400, detail="Preview supports a single target_language")
+        preview_duration_ms = (
+            preview_seconds * 1000 if preview_seconds else settings.preview_duration_ms
         )
+        if not 0 < preview_duration_ms <= settings.preview_max_duration_ms:
+            raise HTTPException(
+                status_code=400,
+                detail=f"preview_seconds must be between 1 and {settings.preview_max_duration_ms // 1000}",
+            )
 
     try:
         # 确定标题
@@ -75,12 +118,14 @@ async def create_task(
         else:
             task_title = video_key.split("/")[-1] if video_key else "Untitled"
 
-        # 创建任务记录
+        # 创建任务记录（主任务使用第一个目标语言）
         task_data = TaskCreate(
             title=task_title,
             source_language=source_language,
-            target_language=target_language,
+            target_language=target_languages[0],
             subtitle_mode=subtitle_mode_enum,
+            output_format=output_format_enum,
+            preview_duration_ms=preview_duration_ms,
         )
         task = await task_service.create_task(task_data)
 
@@ -99,12 +144,41 @@ async def create_task(
         await task_service.db.commit()
         await task_service.db.refresh(task)
 
+        # 其他目标语言：创建共享主任务产物的子任务
+        sibling_tasks = []
+        for lang in target_languages[1:]:
+            sibling = await task_service.create_task(
+                task_data.model_copy(update={"target_language": lang}),
+                parent_task_id=task.id,
+            )
+            sibling.input_video_path = video_path
+            sibling_tasks.append(sibling)
+
         # 提交 Celery 任务
-        from app.workers.tasks import process_video_pipeline
+        if sibling_tasks:
+            from app.workers.tasks import process_multilang_pipeline
 
-        celery_task = process_video_pipeline.delay(str(task.id))
-        task.celery_task_id = celery_task.id
+            celery_task = process_multilang_pipeline.delay(
+                str(task.id), [str(sibling.id) for sibling in sibling_tasks]
+            )
+        elif preview_duration_ms:
+            from app.workers.tasks import process_video_pipeline
+
+            # 预览任务：整条任务链在高优先级队列上执行
+            celery_task = process_video_pipeline.apply_async(
+                args=[str(task.id)],
+                kwargs={"queue": settings.preview_queue},
+                queue=settings.preview_queue,
+            )
+        else:
+            from app.workers.tasks import process_video_pipeline
+
+            celery_task = process_video_pipeline.delay(str(task.id))
+
+        for t in [task, *sibling_tasks]:
+            t.celery_task_id = celery_task.id
         await task_service.db.commit()
+        await task_service.db.refresh(task)
 
         logger.info(
             f"Task created and queued: id={task.id}, celery_task_id={celery_task.id}"
@@ -114,7 +188,66 @@ async def create_task(
 
     except Exception as e:
         logger.error(f"Failed to create task: {e}")
-        raise HTTPException(status_code=500, detail=f"Failed to create task: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to create task: {str(e)}") from e
+
+
+@router.post("/{task_id}/full", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
+async def create_full_task_from_preview(
+    task_id: UUID,
+    task_service: TaskService = Depends(get_task_service),
+    storage_service: StorageService = Depends(get_storage_service),
+):
+    """
+    预览转完整任务
+
+    创建处理整个视频的新任务，复用预览任务中相同分段的译文、voice_id 和分段音频。
+
+    - **task_id**: 预览任务 ID
+    """
+    preview_task = await task_service.get_task(task_id)
+
+    if not preview_task:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    if not preview_task.is_preview:
+        raise HTTPException(status_code=400, detail="Task is not a preview")
+
+    if preview_task.status != TaskStatus.COMPLETED:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Preview not completed yet. Current status: {preview_task.status.value}",
+        )
+
+    try:
+        task = await task_service.create_task(
+            TaskCreate(
+                title=preview_task.title,
+                source_language=preview_task.source_language,
+                target_language=preview_task.target_language,
+                subtitle_mode=preview_task.subtitle_mode,
+                output_format=preview_task.output_format,
+            ),
+            preview_task_id=preview_task.id,
+        )
+        # 输入视频复制到新任务目录，删除预览任务不影响完整任务
+        task.input_video_path = storage_service.copy_input_video(
+            preview_task.input_video_path, task.id
+        )
+
+        from app.workers.tasks import process_video_pipeline
+
+        celery_task = process_video_pipeline.delay(str(task.id))
+        task.celery_task_id = celery_task.id
+        await task_service.db.commit()
+        await task_service.db.refresh(task)
+
+        logger.info(f"Full task created from preview: id={task.id}, preview={task_id}")
+
+        return TaskResponse.model_validate(task)
+
+    except Exception as e:
+        logger.error(f"Failed to create full task from preview: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to create task: {str(e)}") from e
 
 
 @router.get("", response_model=TaskListResponse)
@@ -167,6 +300,108 @@ async def get_task(
     return TaskDetail.model_validate(task)
 
 
+@router.get("/{task_id}/children", response_model=list[TaskResponse])
+async def list_child_tasks(
+    task_id: UUID,
+    task_service: TaskService = Depends(get_task_service),
+):
+    """
+    获取多语言配音的子任务（其他目标语言）
+
+    - **task_id**: 主任务 ID
+    """
+    task = await task_service.get_task(task_id)
+
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    children = await task_service.list_child_tasks(task_id)
+
+    return [TaskResponse.model_validate(child) for child in children]
+
+
+@router.patch("/{task_id}/segments/{segment_id}", response_model=SegmentResponse)
+async def update_segment(
+    task_id: UUID,
+    segment_id: UUID,
+    segment_data: SegmentUpdate,
+    task_service: TaskService = Depends(get_task_service),
+):
+    """
+    编辑分段（译文 / 说话人 / 音色）
+
+    修改后分段的配音音频被清空，调用 redub 接口后只重新合成这些分段。
+
+    - **task_id**: 任务 ID
+    - **segment_id**: 分段 ID
+    """
+    task = await task_service.get_task(task_id)
+
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    if task.status not in (TaskStatus.COMPLETED, TaskStatus.FAILED):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Task is still processing. Current status: {task.status.value}",
+        )
+
+    segment = await task_service.edit_segment(
+        task_id,
+        segment_id,
+        translated_text=segment_data.translated_text,
+        speaker_id=segment_data.speaker_id,
+        voice_id=segment_data.voice_id,
+    )
+
+    if not segment:
+        raise HTTPException(status_code=404, detail="Segment not found")
+
+    return SegmentResponse.model_validate(segment)
+
+
+@router.post("/{task_id}/redub", response_model=TaskResponse)
+async def redub_task(
+    task_id: UUID,
+    task_service: TaskService = Depends(get_task_service),
+):
+    """
+    重新配音已编辑的分段
+
+    只重新合成被编辑过的分段，其余分段复用已有音频，之后重新混音 / 封装，不重新执行整个流程。
+
+    - **task_id**: 任务 ID
+    """
+    task = await task_service.get_task(task_id, with_segments=True)
+
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    if task.status not in (TaskStatus.COMPLETED, TaskStatus.FAILED):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Task is still processing. Current status: {task.status.value}",
+        )
+
+    edited = sum(1 for segment in task.segments if segment.needs_synthesis)
+    if not edited:
+        raise HTTPException(status_code=400, detail="No edited segments to re-dub")
+
+    if not await task_service.start_redub(task):
+        raise HTTPException(status_code=409, detail="Task is already being re-dubbed")
+
+    from app.workers.tasks import process_redub_pipeline
+
+    celery_task = process_redub_pipeline.delay(str(task.id))
+    task.celery_task_id = celery_task.id
+    await task_service.db.commit()
+    await task_service.db.refresh(task)
+
+    logger.info(f"Re-dub queued: id={task.id}, edited_segments={edited}")
+
+    return TaskResponse.model_validate(task)
+
+
 @router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_task(
     task_id: UUID,
@@ -183,9 +418,18 @@ async def delete_task(
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
 
-    # 删除 OSS 文件
+    # 其他目标语言的任务引用主任务目录下的输入视频和提取音频，需先删除这些任务
+    if await task_service.list_child_tasks(task_id):
+        raise HTTPException(
+            status_code=409,
+            detail="Task has dependent language tasks, delete them first",
+        )
+
+    # 删除 OSS 文件（分片任务的产物在各自目录下，数据库记录随主任务级联删除）
     try:
         storage_service.delete_task_files(task_id)
+        for shard in await task_service.list_shard_tasks(task_id):
+            storage_service.delete_task_files(shard.id)
     except Exception as e:
         logger.warning(f"Failed to delete OSS files for task {task_id}: {e}")
 
@@ -211,40 +455,116 @@ async def get_task_result(
     Returns:
         {
             "download_url": "https://...",
+            "audio_url": "https://...",
+            "subtitle_url": "https://...",
+            "audio_ready": true,
+            "subtitle_ready": true,
+            "video_ready": true,
             "expires_in": 3600
         }
+
+        烧录模式下视频编码期间即可获取配音音轨和字幕（video_ready 为 false，无 download_url）；
+        HLS 输出返回 playlist_url（合成过程中即可播放，ready 表示是否已全部生成）
     """
     task = await task_service.get_task(task_id)
 
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
 
-    if task.status != TaskStatus.COMPLETED:
+    if task.output_format == OutputFormat.HLS and task.output_video_path and (
+        task.status in (TaskStatus.MUXING, TaskStatus.COMPLETED)
+    ):
+        result = {
+            "playlist_url": f"{settings.api_prefix}/tasks/{task_id}/playlist.m3u8",
+            "ready": task.status == TaskStatus.COMPLETED,
+            "expires_in": 3600,
+        }
+        if task.subtitle_file_path:
+            result["subtitle_url"] = storage_service.get_download_url(
+                task.subtitle_file_path, expires=3600, filename=f"subtitle_{task_id}.ass"
+            )
+        return result
+
+    # 烧录模式下配音音轨和字幕先于视频发布：合成中即可获取
+    completed = task.status == TaskStatus.COMPLETED
+    if not completed and not (task.status == TaskStatus.MUXING and task.output_audio_path):
         raise HTTPException(
             status_code=400,
             detail=f"Task not completed yet. Current status: {task.status.value}",
         )
 
+    result = {
+        "expires_in": 3600,
+        "audio_ready": bool(task.output_audio_path),
+        "subtitle_ready": bool(task.subtitle_file_path),
+        "video_ready": completed and bool(task.output_video_path),
+    }
+
+    if task.output_audio_path:
+        audio_filename = f"dubbed_audio_{task_id}{Path(task.output_audio_path).suffix}"
+        result["audio_url"] = storage_service.get_download_url(
+            task.output_audio_path, expires=3600, filename=audio_filename
+        )
+
+    # 包含字幕下载链接（如果有）
+    if task.subtitle_file_path:
+        subtitle_filename = f"subtitle_{task_id}.ass"
+        result["subtitle_url"] = storage_service.get_download_url(
+            task.subtitle_file_path, expires=3600, filename=subtitle_filename
+        )
+
+    if not completed:
+        return result
+
+    if task.output_format.is_audio_only:
+        # 仅音频输出：下载链接指向配音音轨
+        if not task.output_audio_path:
+            raise HTTPException(status_code=404, detail="Output audio not found")
+        result["download_url"] = result["audio_url"]
+        return result
+
     if not task.output_video_path:
         raise HTTPException(status_code=404, detail="Output video not found")
 
     # 生成带文件名的下载链接（1 小时有效），确保浏览器下载而非预览
     video_filename = f"dubbed_video_{task_id}.mp4"
-    download_url = storage_service.get_download_url(
+    result["download_url"] = storage_service.get_download_url(
         task.output_video_path, expires=3600, filename=video_filename
     )
 
-    # 包含字幕下载链接（如果有）
-    result = {"download_url": download_url, "expires_in": 3600}
+    return result
 
-    if task.subtitle_file_path:
-        subtitle_filename = f"subtitle_{task_id}.ass"
-        subtitle_url = storage_service.get_download_url(
-            task.subtitle_file_path, expires=3600, filename=subtitle_filename
-        )
-        result["subtitle_url"] = subtitle_url
 
-    return result
+@router.get("/{task_id}/playlist.m3u8")
+async def get_task_playlist(
+    task_id: UUID,
+    task_service: TaskService = Depends(get_task_service),
+    storage_service: StorageService = Depends(get_storage_service),
+):
+    """
+    获取 HLS 播放列表（分片 URI 已改写为签名 URL）
+
+    合成过程中播放列表为 EVENT 类型，播放器会定期重新请求本接口获取新分片。
+
+    - **task_id**: 任务 ID
+    """
+    task = await task_service.get_task(task_id)
+
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    if task.output_format != OutputFormat.HLS or not task.output_video_path:
+        raise HTTPException(status_code=404, detail="No HLS output for this task")
+
+    playlist = storage_service.get_hls_playlist(task.output_video_path, expires=3600)
+    if playlist is None:
+        raise HTTPException(status_code=404, detail="Playlist not ready yet")
+
+    return Response(
+        content=playlist,
+        media_type="application/vnd.apple.mpegurl",
+        headers={"Cache-Control": "no-cache"},
+    )
 
 
 @router.get("/{task_id}/subtitle")
@@ -80,6 +80,18 @@ class Settings(BaseSettings):
     # ASR 配置
     asr_model: str = Field(default="sensevoice-v1", alias="ASR_MODEL")
     asr_language_hints: list[str] = Field(default=["zh", "en"], alias="ASR_LANGUAGE_HINTS")
+    asr_cache_enabled: bool = Field(default=True, alias="ASR_CACHE_ENABLED")  # 按音频哈希复用识别结果
+    # 跨任务 ASR 批处理（短音频合并为多文件转写任务）
+    asr_batch_enabled: bool = Field(default=False, alias="ASR_BATCH_ENABLED")
+    asr_batch_window_ms: int = Field(default=3000, alias="ASR_BATCH_WINDOW_MS")
+    asr_batch_max_files: int = Field(default=50, alias="ASR_BATCH_MAX_FILES")
+    asr_batch_max_duration_ms: int = Field(default=300000, alias="ASR_BATCH_MAX_DURATION_MS")  # 仅批处理 5 分钟以内的音频
+    # ASR 分段合并（同一说话人的相邻短片段合并为句子级配音单元）
+    segment_coalesce_enabled: bool = Field(default=True, alias="SEGMENT_COALESCE_ENABLED")
+    segment_coalesce_max_gap_ms: int = Field(default=400, alias="SEGMENT_COALESCE_MAX_GAP_MS")
+    segment_coalesce_max_duration_ms: int = Field(default=10000, alias="SEGMENT_COALESCE_MAX_DURATION_MS")
+    segment_coalesce_max_chars: int = Field(default=120, alias="SEGMENT_COALESCE_MAX_CHARS")
+    segment_coalesce_min_duration_ms: int = Field(default=1500, alias="SEGMENT_COALESCE_MIN_DURATION_MS")
 
     # LLM 配置
     llm_base_url: str = Field(
@@ -88,6 +100,20 @@ class Settings(BaseSettings):
     )
     llm_model: str = Field(default="qwen-turbo", alias="DASHSCOPE_LLM_MODEL")
     llm_max_tokens: int = Field(default=2000, alias="LLM_MAX_TOKENS")
+    # 异步 HTTP 连接池与超时（秒）
+    llm_max_connections: int = Field(default=32, alias="LLM_MAX_CONNECTIONS")
+    llm_max_keepalive_connections: int = Field(default=16, alias="LLM_MAX_KEEPALIVE_CONNECTIONS")
+    llm_request_timeout: float = Field(default=120.0, alias="LLM_REQUEST_TIMEOUT")
+    llm_connect_timeout: float = Field(default=10.0, alias="LLM_CONNECT_TIMEOUT")
+    llm_translation_concurrency: int = Field(default=4, alias="LLM_TRANSLATION_CONCURRENCY")  # 单任务并发翻译的分块数
+    # 跨任务翻译批处理（短视频的少量分段合并为一次请求）
+    llm_batch_enabled: bool = Field(default=False, alias="LLM_BATCH_ENABLED")
+    llm_batch_window_ms: int = Field(default=2000, alias="LLM_BATCH_WINDOW_MS")
+    llm_batch_max_tasks: int = Field(default=20, alias="LLM_BATCH_MAX_TASKS")
+    llm_batch_max_segments: int = Field(default=30, alias="LLM_BATCH_MAX_SEGMENTS")  # 仅批处理分段数不超过该值的任务
+    # 流式翻译：逐行解析译文，并在翻译阶段提前合成已完成分段的音频
+    llm_stream_translation: bool = Field(default=False, alias="LLM_STREAM_TRANSLATION")
+    llm_stream_tts_concurrency: int = Field(default=4, alias="LLM_STREAM_TTS_CONCURRENCY")
 
     # TTS 配置
     tts_model: Literal[
@@ -100,6 +126,31 @@ class Settings(BaseSettings):
         description="音色名称（系统音色）或 voice_id（复刻音色，如 vc_xxx）",
     )
     tts_format: str = Field(default="mp3", alias="TTS_FORMAT")
+    # 语速规划：合成前按译文长度估算时长，超出时间槽时提高语速（减少混音阶段的 atempo）
+    tts_speech_rate_planning: bool = Field(default=True, alias="TTS_SPEECH_RATE_PLANNING")
+    tts_max_speech_rate: float = Field(default=1.5, alias="TTS_MAX_SPEECH_RATE")
+    tts_slot_fill_ratio: float = Field(default=0.95, alias="TTS_SLOT_FILL_RATIO")
+    tts_duration_check_margin: float = Field(default=0.85, alias="TTS_DURATION_CHECK_MARGIN")  # 估算时长低于时间槽该比例时跳过实测
+
+    # 混音时间轴求解：片段起点允许的偏移范围和最大加速倍数
+    mix_max_lead_ms: int = Field(default=200, alias="MIX_MAX_LEAD_MS")  # 允许提前（毫秒）
+    mix_max_lag_ms: int = Field(default=600, alias="MIX_MAX_LAG_MS")  # 允许推迟（毫秒）
+    mix_max_speed: float = Field(default=4.0, alias="MIX_MAX_SPEED")
+    # 单次封装：配音混音直接送入最终 FFmpeg，音频只编码一次 AAC（关闭时先生成中间 MP3）
+    mux_single_pass: bool = Field(default=True, alias="MUX_SINGLE_PASS")
+    # 边编码边上传：单次封装输出分片 MP4 到管道，直接分片上传 OSS（不落地 output.mp4）
+    mux_stream_upload: bool = Field(default=True, alias="MUX_STREAM_UPLOAD")
+    mux_upload_part_size: int = Field(default=8 * 1024 * 1024, alias="MUX_UPLOAD_PART_SIZE")  # 分片大小（字节）
+    # 烧录模式先发布配音音轨（M4A）和字幕，视频编码完成前即可试听；视频封装时音轨直接复制
+    mux_publish_audio_early: bool = Field(default=True, alias="MUX_PUBLISH_AUDIO_EARLY")
+    # HLS 输出：分片时长（秒），分片产生后立即上传
+    hls_segment_seconds: float = Field(default=6.0, alias="HLS_SEGMENT_SECONDS")
+    # 字幕并行烧录：按关键帧分片，多个 FFmpeg 进程并行编码（0 表示使用 CPU 核数，1 表示关闭）
+    burn_parallel_workers: int = Field(default=0, alias="BURN_PARALLEL_WORKERS")
+    burn_min_piece_ms: int = Field(default=30000, alias="BURN_MIN_PIECE_MS")  # 最小分片时长
+    # 局部重编码：只重编码有字幕事件的 GOP（仅 H.264 封闭 GOP），重编码占比超过阈值时改为整体烧录（默认关闭）
+    burn_smart_render: bool = Field(default=False, alias="BURN_SMART_RENDER")
+    burn_smart_render_max_ratio: float = Field(default=0.7, alias="BURN_SMART_RENDER_MAX_RATIO")
 
     # ==================== 处理配置 ====================
     # 上传限制
@@ -108,6 +159,22 @@ class Settings(BaseSettings):
         default=["mp4", "avi", "mov", "mkv", "flv"], alias="ALLOWED_VIDEO_FORMATS"
     )
 
+    # 音频提取：通过 OSS 签名 URL 直接读取音频流，不下载视频（失败时回退为完整下载）
+    extract_audio_from_url: bool = Field(default=True, alias="EXTRACT_AUDIO_FROM_URL")
+    extract_url_expires: int = Field(default=3600, alias="EXTRACT_URL_EXPIRES")  # 签名 URL 有效期（秒）
+
+    # 快速预览：只处理开头一段，在独立的高优先级队列上执行
+    preview_duration_ms: int = Field(default=120000, alias="PREVIEW_DURATION_MS")  # 默认预览时长（2 分钟）
+    preview_max_duration_ms: int = Field(default=600000, alias="PREVIEW_MAX_DURATION_MS")  # 预览时长上限
+    preview_queue: str = Field(default="preview", alias="PREVIEW_QUEUE")
+    preview_reuse_tolerance_ms: int = Field(default=300, alias="PREVIEW_REUSE_TOLERANCE_MS")  # 复用分段的起点容差
+    # 分片流水线：超长视频的提取 / 识别 / 声音复刻在主任务上对全片执行一次（说话人 ID 一致），
+    # 之后在语音间隙处的关键帧切分为多个时间窗口，各分片并行执行翻译 / 合成 / 封装后流复制拼接
+    shard_pipeline_enabled: bool = Field(default=False, alias="SHARD_PIPELINE_ENABLED")
+    shard_min_duration_ms: int = Field(default=1800000, alias="SHARD_MIN_DURATION_MS")  # 启用分片的最短视频时长（30 分钟）
+    shard_target_ms: int = Field(default=600000, alias="SHARD_TARGET_MS")  # 目标分片时长（10 分钟）
+    shard_min_ms: int = Field(default=120000, alias="SHARD_MIN_MS")  # 最小分片时长
+
     # Worker 配置
     worker_concurrency: int = Field(default=4, alias="WORKER_CONCURRENCY")
     task_timeout: int = Field(default=3600, alias="TASK_TIMEOUT")  # 1小时
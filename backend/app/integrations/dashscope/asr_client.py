@@ -37,6 +37,29 @@ class ASRSegment:
         """分段时长（毫秒）"""
         return self.end_time_ms - self.start_time_ms
 
+    def to_dict(self) -> dict:
+        """序列化为字典（用于结果缓存）"""
+        return {
+            "text": self.text,
+            "start_time_ms": self.start_time_ms,
+            "end_time_ms": self.end_time_ms,
+            "speaker_id": self.speaker_id,
+            "emotion": self.emotion,
+            "confidence": self.confidence,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ASRSegment":
+        """从字典恢复分段"""
+        return cls(
+            text=data["text"],
+            start_time_ms=data["start_time_ms"],
+            end_time_ms=data["end_time_ms"],
+            speaker_id=data.get("speaker_id"),
+            emotion=data.get("emotion"),
+            confidence=data.get("confidence"),
+        )
+
     def __repr__(self) -> str:
         return (
             f"ASRSegment(text='{self.text[:20]}...', "
@@ -62,6 +85,27 @@ class ASRResult:
         self.full_text = full_text
         self.duration_ms = duration_ms
 
+    def to_dict(self) -> dict:
+        """序列化为字典（用于结果缓存）"""
+        return {
+            "task_id": self.task_id,
+            "file_url": self.file_url,
+            "segments": [seg.to_dict() for seg in self.segments],
+            "full_text": self.full_text,
+            "duration_ms": self.duration_ms,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ASRResult":
+        """从字典恢复识别结果"""
+        return cls(
+            task_id=data.get("task_id", ""),
+            file_url=data.get("file_url", ""),
+            segments=[ASRSegment.from_dict(seg) for seg in data.get("segments", [])],
+            full_text=data.get("full_text", ""),
+            duration_ms=data.get("duration_ms", 0),
+        )
+
     def __repr__(self) -> str:
         return (
             f"ASRResult(task_id={self.task_id}, "
@@ -120,13 +164,84 @@ class ASRClient:
             TimeoutError: 识别超时
             RuntimeError: 识别失败
         """
-        logger.info(f"Submitting ASR task: url={audio_url}, model={self.model}")
+        results = self.transcribe_batch([audio_url], timeout, poll_interval)
+
+        if audio_url not in results:
+            raise RuntimeError(f"ASR task failed for {audio_url}")
+
+        return results[audio_url]
+
+    def transcribe_batch(
+        self,
+        audio_urls: list[str],
+        timeout: int = 300,
+        poll_interval: int = 2,
+    ) -> dict[str, ASRResult]:
+        """
+        多文件语音识别（一次提交、一次轮询）
+
+        Args:
+            audio_urls: 音频文件 URL 列表（公网可访问）
+            timeout: 超时时间（秒），默认 5 分钟
+            poll_interval: 轮询间隔（秒），默认 2 秒
+
+        Returns:
+            audio_url -> ASRResult 映射（识别失败的文件不在结果中）
+
+        Raises:
+            TimeoutError: 识别超时
+            RuntimeError: 任务提交或整体识别失败
+        """
+        task_id = self._submit(audio_urls)
+        response = self._wait_for_completion(task_id, timeout, poll_interval)
+
+        results = {}
+        for item in response.output.results or []:
+            file_url = item.get("file_url")
+            if file_url not in audio_urls:
+                logger.warning(f"ASR result for unknown file_url, skipping: {file_url}")
+                continue
+
+            subtask_status = item.get("subtask_status", "SUCCEEDED")
+            if subtask_status != "SUCCEEDED":
+                logger.error(
+                    f"ASR subtask failed: file_url={file_url}, status={subtask_status}, "
+                    f"message={item.get('message')}"
+                )
+                continue
+
+            try:
+                results[file_url] = self._parse_result(task_id, file_url, item)
+            except RuntimeError as e:
+                logger.error(f"Skipping unparsable ASR result for {file_url}: {e}")
+
+        # 单文件任务返回的 file_url 可能与提交时不一致（如 URL 编码差异）
+        if not results and len(audio_urls) == 1 and response.output.results:
+            item = response.output.results[0]
+            if item.get("subtask_status", "SUCCEEDED") == "SUCCEEDED":
+                results[audio_urls[0]] = self._parse_result(task_id, audio_urls[0], item)
+
+        logger.info(f"ASR batch finished: {len(results)}/{len(audio_urls)} files succeeded")
+        return results
+
+    def _submit(self, audio_urls: list[str]) -> str:
+        """
+        提交异步识别任务
+
+        Args:
+            audio_urls: 音频文件 URL 列表
+
+        Returns:
+            DashScope 任务 ID
+        """
+        logger.info(
+            f"Submitting ASR task: files={len(audio_urls)}, model={self.model}"
+        )
 
-        # 提交异步任务
         try:
             response = Transcription.async_call(
                 model=self.model,
-                file_urls=[audio_url],
+                file_urls=audio_urls,
                 language_hints=self.language_hints,
                 enable_speaker_diarization=True,  # 启用说话人分离
                 disfluency_removal_enabled=True,  # 启用语气词过滤
@@ -137,12 +252,24 @@ class ASRClient:
 
             task_id = response.output.task_id
             logger.info(f"ASR task submitted: task_id={task_id}")
+            return task_id
 
         except Exception as e:
             logger.error(f"Failed to submit ASR task: {e}")
             raise RuntimeError(f"ASR task submission failed: {e}") from e
 
-        # 轮询结果
+    def _wait_for_completion(self, task_id: str, timeout: int, poll_interval: int):
+        """
+        轮询识别任务直至结束
+
+        Args:
+            task_id: DashScope 任务 ID
+            timeout: 超时时间（秒）
+            poll_interval: 轮询间隔（秒）
+
+        Returns:
+            成功时的 API 响应
+        """
         start_time = time.time()
         while True:
             elapsed = time.time() - start_time
@@ -156,7 +283,7 @@ class ASRClient:
 
                 if status == "SUCCEEDED":
                     logger.info(f"ASR task completed: task_id={task_id}, elapsed={elapsed:.1f}s")
-                    return self._parse_result(task_id, audio_url, result)
+                    return result
 
                 elif status == "FAILED":
                     error_msg = result.output.get("error_message", "Unknown error")
@@ -176,27 +303,19 @@ class ASRClient:
                 logger.error(f"Failed to fetch ASR result: {e}")
                 raise RuntimeError(f"Failed to fetch ASR result: {e}") from e
 
-    def _parse_result(self, task_id: str, audio_url: str, response) -> ASRResult:
+    def _parse_result(self, task_id: str, audio_url: str, transcription_data: dict) -> ASRResult:
         """
-        解析 ASR 识别结果
+        解析单个文件的 ASR 识别结果
 
         Args:
             task_id: 任务 ID
             audio_url: 音频 URL
-            response: API 响应
+            transcription_data: API 响应中该文件对应的结果项
 
         Returns:
             ASRResult
         """
         try:
-            # 获取识别结果 URL
-            results = response.output.results
-            if not results:
-                raise ValueError("No transcription results")
-
-            # 下载结果文件（通常是 JSON URL）
-            transcription_data = results[0]
-
             # 如果有 transcription_url，需要下载
             if "transcription_url" in transcription_data:
                 import requests
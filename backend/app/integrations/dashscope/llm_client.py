@@ -4,15 +4,27 @@ DashScope LLM 客户端封装
 """
 
 import asyncio
-from typing import Optional
+from typing import AsyncIterator, Optional
 
+import httpx
 from loguru import logger
-from openai import OpenAI
-from tenacity import retry, stop_after_attempt, wait_exponential
+from openai import AsyncOpenAI, OpenAI
+from tenacity import (
+    AsyncRetrying,
+    retry,
+    retry_if_not_exception_type,
+    stop_after_attempt,
+    wait_exponential,
+    wait_random_exponential,
+)
 
 from app.config import settings
 
 
+class TranslationTruncatedError(RuntimeError):
+    """LLM 输出达到 max_tokens 被截断（finish_reason == "length"）"""
+
+
 class LLMClient:
     """DashScope LLM 客户端（OpenAI 兼容）"""
 
@@ -46,11 +58,16 @@ class LLMClient:
             base_url=self.base_url,
         )
 
+        # 异步客户端（按事件循环惰性创建，共享连接池）
+        self._async_client: Optional[AsyncOpenAI] = None
+        self._async_loop: Optional[asyncio.AbstractEventLoop] = None
+
         logger.info(f"LLM Client initialized: model={self.model}, base_url={self.base_url}")
 
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=2, max=10),
+        retry=retry_if_not_exception_type(TranslationTruncatedError),
         reraise=True,
     )
     def translate(
@@ -73,6 +90,7 @@ class LLMClient:
             翻译结果
 
         Raises:
+            TranslationTruncatedError: 输出被 max_tokens 截断（原样重试无意义，不重试）
             RuntimeError: 翻译失败
         """
         logger.info(
@@ -95,7 +113,17 @@ class LLMClient:
                 top_p=0.9,  # 限制采样范围，进一步提高稳定性
             )
 
-            translation = response.choices[0].message.content.strip()
+            choice = response.choices[0]
+            translation = (choice.message.content or "").strip()
+
+            if choice.finish_reason == "length":
+                logger.warning(
+                    f"Translation truncated at max_tokens={self.max_tokens}: "
+                    f"{len(translation)} chars returned"
+                )
+                raise TranslationTruncatedError(
+                    f"Translation truncated at max_tokens={self.max_tokens}"
+                )
 
             logger.info(
                 f"Translation completed: {len(translation)} chars, "
@@ -104,10 +132,84 @@ class LLMClient:
 
             return translation
 
+        except TranslationTruncatedError:
+            raise
         except Exception as e:
             logger.error(f"Translation failed: {e}")
             raise RuntimeError(f"Translation failed: {e}") from e
 
+    async def translate_stream_async(
+        self,
+        text: str,
+        source_lang: str,
+        target_lang: str,
+        context: Optional[str] = None,
+    ) -> AsyncIterator[str]:
+        """
+        异步流式翻译（原生 AsyncOpenAI，stream=True），逐个产出增量文本
+
+        流式请求中途失败无法安全重试（已产出的内容会重复），因此不做自动重试，
+        由调用方根据已收到的内容决定如何恢复。
+
+        Args:
+            text: 待翻译文本
+            source_lang: 源语言代码
+            target_lang: 目标语言代码
+            context: 上下文信息（可选）
+
+        Yields:
+            译文增量片段
+
+        Raises:
+            TranslationTruncatedError: 输出被 max_tokens 截断（已产出的内容仍然有效）
+            RuntimeError: 翻译失败
+        """
+        logger.info(
+            f"Stream translating (async): {len(text)} chars, {source_lang} -> {target_lang}"
+        )
+
+        finish_reason = None
+        total_chars = 0
+
+        try:
+            stream = await self.async_client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": self._build_system_prompt(source_lang, target_lang)},
+                    {"role": "user", "content": self._build_user_prompt(text, context)},
+                ],
+                max_tokens=self.max_tokens,
+                temperature=0.1,
+                top_p=0.9,
+                stream=True,
+                timeout=settings.llm_request_timeout,
+            )
+
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                choice = chunk.choices[0]
+                if choice.delta and choice.delta.content:
+                    total_chars += len(choice.delta.content)
+                    yield choice.delta.content
+                if choice.finish_reason:
+                    finish_reason = choice.finish_reason
+
+        except Exception as e:
+            logger.error(f"Stream translation failed after {total_chars} chars: {e}")
+            raise RuntimeError(f"Stream translation failed: {e}") from e
+
+        if finish_reason == "length":
+            logger.warning(
+                f"Stream translation truncated at max_tokens={self.max_tokens}: "
+                f"{total_chars} chars returned"
+            )
+            raise TranslationTruncatedError(
+                f"Translation truncated at max_tokens={self.max_tokens}"
+            )
+
+        logger.info(f"Stream translation completed: {total_chars} chars")
+
     def translate_batch(
         self,
         texts: list[str],
@@ -142,6 +244,25 @@ class LLMClient:
 
         return results
 
+    @property
+    def async_client(self) -> AsyncOpenAI:
+        """
+        当前事件循环的 AsyncOpenAI 客户端
+
+        底层 httpx 连接池按事件循环共享（见 _get_shared_http_client），
+        重试由 tenacity 统一处理，因此关闭 SDK 自带重试。
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_loop is not loop:
+            self._async_client = AsyncOpenAI(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                http_client=_get_shared_http_client(),
+                max_retries=0,
+            )
+            self._async_loop = loop
+        return self._async_client
+
     async def translate_async(
         self,
         text: str,
@@ -150,7 +271,7 @@ class LLMClient:
         context: Optional[str] = None,
     ) -> str:
         """
-        异步翻译
+        异步翻译（原生 AsyncOpenAI，带抖动的指数退避重试）
 
         Args:
             text: 待翻译文本
@@ -160,13 +281,61 @@ class LLMClient:
 
         Returns:
             翻译结果
+
+        Raises:
+            TranslationTruncatedError: 输出被 max_tokens 截断（不重试）
+            RuntimeError: 翻译失败
         """
-        # 在线程池中运行同步方法
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            None, self.translate, text, source_lang, target_lang, context
+        logger.info(
+            f"Translating (async): {len(text)} chars, {source_lang} -> {target_lang}"
         )
 
+        messages = [
+            {"role": "system", "content": self._build_system_prompt(source_lang, target_lang)},
+            {"role": "user", "content": self._build_user_prompt(text, context)},
+        ]
+
+        try:
+            async for attempt in AsyncRetrying(
+                stop=stop_after_attempt(3),
+                wait=wait_random_exponential(multiplier=1, max=10),
+                retry=retry_if_not_exception_type(TranslationTruncatedError),
+                reraise=True,
+            ):
+                with attempt:
+                    response = await self.async_client.chat.completions.create(
+                        model=self.model,
+                        messages=messages,
+                        max_tokens=self.max_tokens,
+                        temperature=0.1,
+                        top_p=0.9,
+                        timeout=settings.llm_request_timeout,
+                    )
+                    choice = response.choices[0]
+                    translation = (choice.message.content or "").strip()
+
+                    if choice.finish_reason == "length":
+                        logger.warning(
+                            f"Translation truncated at max_tokens={self.max_tokens}: "
+                            f"{len(translation)} chars returned"
+                        )
+                        raise TranslationTruncatedError(
+                            f"Translation truncated at max_tokens={self.max_tokens}"
+                        )
+
+        except TranslationTruncatedError:
+            raise
+        except Exception as e:
+            logger.error(f"Translation failed: {e}")
+            raise RuntimeError(f"Translation failed: {e}") from e
+
+        logger.info(
+            f"Translation completed: {len(translation)} chars, "
+            f"tokens={response.usage.total_tokens if response.usage else 'n/a'}"
+        )
+
+        return translation
+
     async def translate_batch_async(
         self,
         texts: list[str],
@@ -281,6 +450,36 @@ class LLMClient:
         return text
 
 
+# 按事件循环共享的 httpx 连接池（httpx.AsyncClient 不能跨事件循环使用）
+_shared_http_clients: dict[int, tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = {}
+
+
+def _get_shared_http_client() -> httpx.AsyncClient:
+    """获取当前事件循环共享的 httpx.AsyncClient（连接数与超时来自配置）"""
+    loop = asyncio.get_running_loop()
+
+    # 清理已关闭事件循环的连接池记录
+    for key, (cached_loop, _) in list(_shared_http_clients.items()):
+        if cached_loop.is_closed():
+            del _shared_http_clients[key]
+
+    entry = _shared_http_clients.get(id(loop))
+    if entry is None or entry[0] is not loop:
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.llm_max_connections,
+                max_keepalive_connections=settings.llm_max_keepalive_connections,
+            ),
+            timeout=httpx.Timeout(
+                settings.llm_request_timeout, connect=settings.llm_connect_timeout
+            ),
+        )
+        entry = (loop, client)
+        _shared_http_clients[id(loop)] = entry
+
+    return entry[1]
+
+
 # 全局单例
 _llm_client: Optional[LLMClient] = None
 
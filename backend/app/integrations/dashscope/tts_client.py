@@ -218,6 +218,7 @@ class TTSClient:
         format: Optional[str] = None,
         auto_clone: bool = False,
         clone_audio_path: Optional[str] = None,
+        speech_rate: Optional[float] = None,
     ) -> bytes:
         """
         语音合成
@@ -230,6 +231,7 @@ class TTSClient:
             format: 音频格式（可选，覆盖初始化参数）
             auto_clone: 是否自动复刻（仅限声音复刻模型）
             clone_audio_path: 复刻音频路径（仅在 auto_clone=True 时使用）
+            speech_rate: 语速（可选，0.5-2.0，默认 1.0）
 
         Returns:
             音频数据（bytes）
@@ -280,20 +282,24 @@ class TTSClient:
                     f"Got: {voice}. Please call enroll_voice() first or use auto_clone=True."
                 )
 
+        if speech_rate is not None:
+            speech_rate = min(max(speech_rate, 0.5), 2.0)
+
         logger.info(
             f"Synthesizing: text_len={len(text)}, model={self.model}, "
-            f"voice={voice}, format={format}"
+            f"voice={voice}, format={format}, speech_rate={speech_rate or 1.0}"
         )
 
         try:
             # 对于 qwen3-tts-vc-realtime 系列，使用 WebSocket 实时 API
             if self.model.startswith("qwen3-tts"):
-                audio_data = self._synthesize_realtime(text, voice)
+                audio_data = self._synthesize_realtime(text, voice, speech_rate)
             else:
                 # 对于 cosyvoice 等模型，使用 SpeechSynthesizer
                 synthesizer = SpeechSynthesizer(
                     model=self.model,
                     voice=voice,
+                    speech_rate=speech_rate or 1.0,
                 )
                 audio_data = synthesizer.call(text)
 
@@ -307,13 +313,16 @@ class TTSClient:
             logger.error(f"Synthesis failed: {e}")
             raise RuntimeError(f"Synthesis failed: {e}") from e
 
-    def _synthesize_realtime(self, text: str, voice: str) -> bytes:
+    def _synthesize_realtime(
+        self, text: str, voice: str, speech_rate: Optional[float] = None
+    ) -> bytes:
         """
         使用 QwenTtsRealtime WebSocket API 进行语音合成
 
         Args:
             text: 待合成文本
             voice: 复刻的 voice_id
+            speech_rate: 语速（可选）
 
         Returns:
             PCM 音频数据（bytes）
@@ -370,6 +379,7 @@ class TTSClient:
                 voice=voice,
                 response_format=AudioFormat.PCM_24000HZ_MONO_16BIT,
                 mode="server_commit",
+                speech_rate=speech_rate,
             )
 
             # 发送文本
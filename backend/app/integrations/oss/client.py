@@ -190,6 +190,94 @@ class OSSClient:
             logger.error(f"Upload failed: {e}")
             raise
 
+    def upload_stream_multipart(
+        self,
+        stream: BinaryIO,
+        oss_path: str,
+        content_type: Optional[str] = None,
+        part_size: int = 8 * 1024 * 1024,
+        max_in_flight: int = 2,
+    ) -> str:
+        """
+        以分片上传方式上传不定长的流（如 FFmpeg 管道输出）
+
+        边读边传：每凑满 part_size 字节就提交一个分片，分片在后台线程上传，
+        读取方（生产者）无需等待上传完成；同时在途的分片数不超过 max_in_flight，
+        内存占用约为 part_size × (max_in_flight + 1)。失败时取消分片上传。
+
+        Args:
+            stream: 可读的二进制流（读到 EOF 结束）
+            oss_path: OSS 中的目标路径（相对路径）
+            content_type: 文件 MIME 类型（可选）
+            part_size: 分片大小（字节，OSS 要求除最后一片外不小于 100KB）
+            max_in_flight: 最大并发上传分片数
+
+        Returns:
+            OSS key
+
+        Raises:
+            oss2.exceptions.OssError: 上传失败
+        """
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+
+        key = self._build_key(oss_path)
+
+        headers = {}
+        if content_type:
+            headers["Content-Type"] = content_type
+
+        logger.info(f"Uploading stream (multipart) -> oss://{self.bucket_name}/{key}")
+
+        upload_id = self.bucket.init_multipart_upload(key, headers=headers).upload_id
+        slots = threading.Semaphore(max_in_flight)
+        futures = []
+        total_bytes = 0
+
+        def upload_part(part_number: int, data: bytes) -> oss2.models.PartInfo:
+            try:
+                result = self.bucket.upload_part(key, upload_id, part_number, data)
+                return oss2.models.PartInfo(part_number, result.etag, size=len(data))
+            finally:
+                slots.release()
+
+        try:
+            with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+                part_number = 1
+                while True:
+                    data = stream.read(part_size)
+                    if not data:
+                        break
+                    total_bytes += len(data)
+                    slots.acquire()
+                    # 已有分片失败时尽早停止读取（result() 抛出异常）
+                    for future in futures:
+                        if future.done():
+                            future.result()
+                    futures.append(executor.submit(upload_part, part_number, data))
+                    part_number += 1
+
+                parts = [future.result() for future in futures]
+
+            if not parts:
+                # 空流：取消分片上传，写入空对象
+                self.bucket.abort_multipart_upload(key, upload_id)
+                self.bucket.put_object(key, b"", headers=headers)
+            else:
+                self.bucket.complete_multipart_upload(key, upload_id, parts)
+
+            logger.info(
+                f"Multipart upload success: {key}, parts={len(futures)}, bytes={total_bytes}"
+            )
+            return key
+        except Exception as e:
+            logger.error(f"Multipart upload failed: {e}")
+            try:
+                self.bucket.abort_multipart_upload(key, upload_id)
+            except oss2.exceptions.OssError as abort_error:
+                logger.warning(f"Abort multipart upload failed: {abort_error}")
+            raise
+
     def download_file(self, oss_path: str, local_path: str) -> str:
         """
         从 OSS 下载文件到本地
@@ -254,6 +342,56 @@ class OSSClient:
             logger.error(f"Download failed: {e}")
             raise
 
+    def copy_file(
+        self,
+        src_path: str,
+        dst_path: str,
+        part_size: int = 512 * 1024 * 1024,
+    ) -> str:
+        """
+        在同一 Bucket 内复制文件（服务端复制，不经过本地）
+
+        超过 part_size 的文件（如完整输入视频）按分片复制，CopyObject 只支持 1GB 以内的文件。
+
+        Args:
+            src_path: 源文件路径（相对路径）
+            dst_path: 目标文件路径（相对路径）
+            part_size: 分片复制的分片大小（字节）
+
+        Returns:
+            目标 OSS key
+        """
+        src_key = self._build_key(src_path)
+        dst_key = self._build_key(dst_path)
+
+        logger.info(f"Copying file: {src_key} -> {dst_key}")
+
+        try:
+            size = self.bucket.head_object(src_key).content_length
+            if size <= part_size:
+                self.bucket.copy_object(self.bucket_name, src_key, dst_key)
+                return dst_key
+
+            upload_id = self.bucket.init_multipart_upload(dst_key).upload_id
+            try:
+                parts = []
+                for part_number, start in enumerate(range(0, size, part_size), start=1):
+                    end = min(start + part_size, size) - 1
+                    result = self.bucket.upload_part_copy(
+                        self.bucket_name, src_key, (start, end), dst_key, upload_id, part_number
+                    )
+                    parts.append(oss2.models.PartInfo(part_number, result.etag))
+                self.bucket.complete_multipart_upload(dst_key, upload_id, parts)
+            except oss2.exceptions.OssError:
+                self.bucket.abort_multipart_upload(dst_key, upload_id)
+                raise
+
+            logger.info(f"Multipart copy success: {dst_key}, parts={len(parts)}, bytes={size}")
+            return dst_key
+        except oss2.exceptions.OssError as e:
+            logger.error(f"Copy failed: {e}")
+            raise
+
     def delete_file(self, oss_path: str) -> None:
         """
         删除 OSS 中的文件
@@ -2,7 +2,8 @@
 数据库模型
 """
 
-from .task import Task, TaskStatus, SubtitleMode
+from .task import Task, TaskStatus, SubtitleMode, OutputFormat
 from .segment import Segment
+from .asr_cache import ASRCache
 
-__all__ = ["Task", "TaskStatus", "SubtitleMode", "Segment"]
+__all__ = ["Task", "TaskStatus", "SubtitleMode", "OutputFormat", "Segment", "ASRCache"]
@@ -0,0 +1,47 @@
+"""
+ASR 结果缓存数据库模型
+"""
+
+from datetime import datetime
+from uuid import uuid4
+
+from sqlalchemy import DateTime, Index, String
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class ASRCache(Base):
+    """跨任务共享的 ASR 识别结果（按音频内容哈希索引）"""
+
+    __tablename__ = "asr_cache"
+
+    # 主键
+    id: Mapped[UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid4
+    )
+
+    # 缓存键：音频内容哈希 + 模型 + 语言提示
+    audio_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    model: Mapped[str] = mapped_column(String(100), nullable=False)
+    language_hints: Mapped[str] = mapped_column(String(100), nullable=False)
+
+    # ASRResult.to_dict() 序列化结果（分段、说话人、置信度等）
+    result: Mapped[dict] = mapped_column(JSONB, nullable=False)
+
+    # 时间戳
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, default=datetime.utcnow
+    )
+
+    # 索引
+    __table_args__ = (
+        Index("idx_asr_cache_key", "audio_hash", "model", "language_hints", unique=True),
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<ASRCache(audio_hash={self.audio_hash[:12]}, model={self.model}, "
+            f"language_hints={self.language_hints})>"
+        )
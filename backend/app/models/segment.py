@@ -6,8 +6,8 @@ from datetime import datetime
 from typing import Optional
 from uuid import uuid4
 
-from sqlalchemy import String, Integer, Text, DateTime, Float, ForeignKey, Index
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import String, Integer, Text, DateTime, Float, ForeignKey, Index, Boolean
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -44,9 +44,14 @@ class Segment(Base):
     emotion: Mapped[Optional[str]] = mapped_column(String(20), nullable=True)
     confidence: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
 
+    # 合并前的原始 ASR 片段（[{start_time_ms, end_time_ms, text}]，仅合并单元有值，用于原文字幕）
+    source_spans: Mapped[Optional[list]] = mapped_column(JSONB, nullable=True)
+
     # TTS 配置
     voice_id: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)  # 声音复刻 ID（可复用）
+    voice_overridden: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)  # 编辑分段时单独指定的音色（不代表说话人）
     audio_path: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)  # TTS 音频路径
+    audio_duration_ms: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)  # TTS 音频实际时长（合成时计算）
 
     # 时间戳
     created_at: Mapped[datetime] = mapped_column(
@@ -64,6 +69,11 @@ class Segment(Base):
         Index("idx_task_segment", "task_id", "segment_index", unique=True),
     )
 
+    @property
+    def needs_synthesis(self) -> bool:
+        """是否需要（重新）合成：有译文但没有音频（编辑译文 / 说话人 / 音色后音频被清空）"""
+        return bool(self.translated_text) and not self.audio_path
+
     def __repr__(self) -> str:
         return (
             f"<Segment(id={self.id}, task_id={self.task_id}, "
@@ -7,8 +7,8 @@ from datetime import datetime
 from typing import Optional
 from uuid import uuid4
 
-from sqlalchemy import String, Integer, Text, DateTime, Enum, Boolean
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import String, Integer, Text, DateTime, Enum, Boolean, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -33,6 +33,21 @@ class SubtitleMode(str, enum.Enum):
     NONE = "NONE"              # 不生成字幕
     EXTERNAL = "EXTERNAL"      # 外挂字幕文件
     BURN = "BURN"              # 烧录到视频中
+    SOFT = "SOFT"              # 软字幕轨道（封装进输出容器，不重编码视频）
+
+
+class OutputFormat(str, enum.Enum):
+    """输出格式"""
+
+    MP4 = "MP4"                # 单个 MP4 文件
+    HLS = "HLS"                # HLS 播放列表 + fMP4 分片（边生成边上传，可渐进播放）
+    M4A = "M4A"                # 仅配音音轨（AAC），不下载、不封装视频
+    OPUS = "OPUS"              # 仅配音音轨（Opus），不下载、不封装视频
+
+    @property
+    def is_audio_only(self) -> bool:
+        """是否为仅音频输出"""
+        return self in (OutputFormat.M4A, OutputFormat.OPUS)
 
 
 class Task(Base):
@@ -45,6 +60,26 @@ class Task(Base):
         UUID(as_uuid=True), primary_key=True, default=uuid4, index=True
     )
 
+    # 多语言配音：共享提取/识别/复刻阶段的主任务 ID（主任务自身为空）
+    parent_task_id: Mapped[Optional[UUID]] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("tasks.id", ondelete="SET NULL"), nullable=True, index=True
+    )
+
+    # 快速预览：只处理开头 preview_duration_ms 的内容（完整任务为空）
+    preview_duration_ms: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    # 完整任务：复用译文 / voice_id / 分段音频的预览任务 ID
+    preview_task_id: Mapped[Optional[UUID]] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("tasks.id", ondelete="SET NULL"), nullable=True
+    )
+
+    # 分片流水线：分片任务处理原视频的 [shard_start_ms, shard_end_ms) 时间窗口
+    shard_parent_id: Mapped[Optional[UUID]] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("tasks.id", ondelete="CASCADE"), nullable=True, index=True
+    )
+    shard_index: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    shard_start_ms: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    shard_end_ms: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+
     # 基本信息
     title: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
     source_language: Mapped[str] = mapped_column(String(10), nullable=False)
@@ -64,14 +99,22 @@ class Task(Base):
     )
     burn_subtitles: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
 
+    # 输出格式
+    output_format: Mapped[OutputFormat] = mapped_column(
+        Enum(OutputFormat), nullable=False, default=OutputFormat.MP4
+    )
+
     # 文件路径 (OSS 相对路径)
     input_video_path: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
     extracted_audio_path: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
-    output_video_path: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
+    audio_hash: Mapped[Optional[str]] = mapped_column(String(64), nullable=True, index=True)  # 提取音频的 SHA-256
+    output_video_path: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)  # HLS 输出时为播放列表路径
+    output_audio_path: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)  # 混音后的配音音轨
     subtitle_file_path: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
 
     # 元数据
     video_duration_ms: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    media_info: Mapped[Optional[dict]] = mapped_column(JSONB, nullable=True)  # 输入视频探测结果（MediaInfo.to_dict）
     segment_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
 
     # 时间戳
@@ -107,6 +150,16 @@ class Task(Base):
         """任务是否失败"""
         return self.status == TaskStatus.FAILED
 
+    @property
+    def is_preview(self) -> bool:
+        """是否为预览任务"""
+        return self.preview_duration_ms is not None
+
+    @property
+    def is_shard(self) -> bool:
+        """是否为分片任务"""
+        return self.shard_parent_id is not None
+
     @property
     def is_processing(self) -> bool:
         """任务是否正在处理"""
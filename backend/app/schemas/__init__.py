@@ -9,7 +9,7 @@ from .task import (
     TaskListResponse,
     TaskDetail,
 )
-from .segment import SegmentResponse, SegmentCreate
+from .segment import SegmentResponse, SegmentCreate, SegmentUpdate
 
 __all__ = [
     "TaskCreate",
@@ -19,4 +19,5 @@ __all__ = [
     "TaskDetail",
     "SegmentResponse",
     "SegmentCreate",
+    "SegmentUpdate",
 ]
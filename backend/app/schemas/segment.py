@@ -9,6 +9,14 @@ from uuid import UUID
 from pydantic import BaseModel, Field, ConfigDict
 
 
+class SourceSpan(BaseModel):
+    """合并前的原始 ASR 片段"""
+
+    start_time_ms: int = Field(..., ge=0, description="开始时间（毫秒）")
+    end_time_ms: int = Field(..., ge=0, description="结束时间（毫秒）")
+    text: str = Field(..., description="原始文本")
+
+
 class SegmentBase(BaseModel):
     """Segment 基础 schema"""
 
@@ -29,10 +37,11 @@ class SegmentCreate(SegmentBase):
 
 
 class SegmentUpdate(BaseModel):
-    """更新分段请求"""
+    """编辑分段请求（只更新提供的字段，变化后分段待重新合成）"""
 
-    translated_text: Optional[str] = None
-    audio_path: Optional[str] = None
+    translated_text: Optional[str] = Field(None, min_length=1, description="翻译文本")
+    speaker_id: Optional[str] = Field(None, max_length=50, description="说话人 ID")
+    voice_id: Optional[str] = Field(None, max_length=100, description="声音复刻 ID（voice_id）")
 
 
 class SegmentResponse(SegmentBase):
@@ -43,7 +52,10 @@ class SegmentResponse(SegmentBase):
     id: UUID
     task_id: UUID
     voice_id: Optional[str] = Field(None, description="声音复刻 ID（voice_id）")
+    source_spans: Optional[list[SourceSpan]] = Field(None, description="合并前的原始 ASR 片段")
     audio_path: Optional[str] = None
+    audio_duration_ms: Optional[int] = Field(None, description="配音音频时长（毫秒）")
+    needs_synthesis: bool = Field(False, description="是否待重新合成（已编辑，尚未重新配音）")
     created_at: datetime
     updated_at: datetime
 
@@ -8,7 +8,7 @@ from uuid import UUID
 
 from pydantic import BaseModel, Field, ConfigDict
 
-from app.models.task import TaskStatus, SubtitleMode
+from app.models.task import TaskStatus, SubtitleMode, OutputFormat
 from .segment import SegmentResponse
 
 
@@ -25,7 +25,14 @@ class TaskCreate(TaskBase):
 
     subtitle_mode: SubtitleMode = Field(
         default=SubtitleMode.BURN,
-        description="字幕模式: burn=烧录到视频(推荐,默认), external=外挂字幕文件, none=不生成"
+        description="字幕模式: burn=烧录到视频(推荐,默认), soft=软字幕轨道(不重编码), external=外挂字幕文件, none=不生成"
+    )
+    preview_duration_ms: Optional[int] = Field(
+        default=None, gt=0, description="预览时长（毫秒），设置时只处理开头的这段内容"
+    )
+    output_format: OutputFormat = Field(
+        default=OutputFormat.MP4,
+        description="输出格式: mp4=单个视频文件(默认), hls=HLS 分片(合成过程中即可播放), m4a/opus=仅配音音轨"
     )
 
 
@@ -45,8 +52,12 @@ class TaskResponse(TaskBase):
     model_config = ConfigDict(from_attributes=True)
 
     id: UUID
+    parent_task_id: Optional[UUID] = Field(None, description="多语言配音的主任务 ID")
+    preview_duration_ms: Optional[int] = Field(None, description="预览时长（毫秒，预览任务才有）")
+    preview_task_id: Optional[UUID] = Field(None, description="完整任务复用的预览任务 ID")
     status: TaskStatus
     subtitle_mode: SubtitleMode = Field(default=SubtitleMode.BURN, description="字幕模式")
+    output_format: OutputFormat = Field(default=OutputFormat.MP4, description="输出格式")
     progress: int = Field(..., ge=0, le=100, description="进度百分比")
     current_step: Optional[str] = None
     error_message: Optional[str] = None
@@ -63,6 +74,7 @@ class TaskDetail(TaskResponse):
     input_video_path: Optional[str] = None
     extracted_audio_path: Optional[str] = None
     output_video_path: Optional[str] = None
+    output_audio_path: Optional[str] = Field(None, description="配音音轨 OSS 路径")
     subtitle_file_path: Optional[str] = Field(None, description="字幕文件 OSS 路径")
     celery_task_id: Optional[str] = None
     segments: list[SegmentResponse] = Field(default_factory=list, description="分段列表")
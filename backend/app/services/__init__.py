@@ -6,5 +6,11 @@ from .task_service import TaskService
 from .storage_service import StorageService
 from .voice_service import VoiceService
 from .translation_chunker import TranslationChunker
+from .translation_service import TranslationService
+from .asr_cache_service import ASRCacheService
+from .asr_batcher import ASRBatcher
+from .translation_batcher import TranslationBatcher
+from .segment_coalescer import SegmentCoalescer
+from .speech_rate_planner import SpeechRatePlanner
 
-__all__ = ["TaskService", "StorageService", "VoiceService", "TranslationChunker"]
+__all__ = ["TaskService", "StorageService", "VoiceService", "TranslationChunker", "TranslationService", "ASRCacheService", "ASRBatcher", "TranslationBatcher", "SegmentCoalescer", "SpeechRatePlanner"]
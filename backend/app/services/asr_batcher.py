@@ -0,0 +1,76 @@
+"""
+ASR 跨任务批处理服务
+把多个任务的短音频合并为一个多文件转写任务，减少任务提交和轮询次数
+"""
+
+from typing import Optional
+
+from loguru import logger
+
+from app.config import settings
+from app.integrations.dashscope import ASRClient
+from app.integrations.dashscope.asr_client import ASRResult
+
+from .micro_batcher import RedisMicroBatcher
+
+
+class ASRBatcher(RedisMicroBatcher):
+    """ASR 多文件批处理器（按模型 + 语言提示分批）"""
+
+    NAMESPACE = "asr_batch"
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("window_ms", settings.asr_batch_window_ms)
+        kwargs.setdefault("max_items", settings.asr_batch_max_files)
+        super().__init__(**kwargs)
+
+    def transcribe(
+        self,
+        audio_url: str,
+        language_hints: list[str],
+        model: Optional[str] = None,
+        timeout: int = 300,
+    ) -> ASRResult:
+        """
+        通过批处理识别单个音频
+
+        Args:
+            audio_url: 音频文件 URL（公网可访问）
+            language_hints: 语言提示
+            model: ASR 模型（可选，默认使用配置）
+            timeout: 识别超时（秒），会额外加上收集窗口
+
+        Returns:
+            ASRResult 识别结果
+
+        Raises:
+            TimeoutError: 超时（调用方应降级为单独识别）
+            RuntimeError: 识别失败
+        """
+        model = model or settings.asr_model
+        batch_key = f"{model}|{','.join(sorted(language_hints))}"
+
+        result = self.submit(
+            batch_key,
+            {"audio_url": audio_url, "model": model, "language_hints": language_hints},
+            timeout=timeout + self.window_ms / 1000,
+        )
+        return ASRResult.from_dict(result)
+
+    def process_batch(self, batch_key: str, payloads: list[dict]) -> list[dict]:
+        """提交一个多文件转写任务，并把结果按 URL 分发回各请求"""
+        model = payloads[0]["model"]
+        language_hints = payloads[0]["language_hints"]
+        audio_urls = list(dict.fromkeys(p["audio_url"] for p in payloads))
+
+        logger.info(f"Submitting batched ASR job: {len(audio_urls)} files, key={batch_key}")
+
+        asr_client = ASRClient(model=model, language_hints=language_hints)
+        results = asr_client.transcribe_batch(audio_urls)
+
+        return [
+            results[p["audio_url"]].to_dict()
+            if p["audio_url"] in results
+            else {"error": f"ASR failed for {p['audio_url']}"}
+            for p in payloads
+        ]
@@ -0,0 +1,112 @@
+"""
+ASR 结果缓存服务
+同一段音频（按内容哈希）只做一次语音识别，跨任务复用识别结果
+"""
+
+import hashlib
+from typing import Optional
+
+from loguru import logger
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.integrations.dashscope.asr_client import ASRResult
+from app.models import ASRCache
+
+
+class ASRCacheService:
+    """ASR 结果缓存服务"""
+
+    # 计算哈希时的读取块大小
+    HASH_CHUNK_SIZE = 1024 * 1024  # 1MB
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @classmethod
+    def compute_audio_hash(cls, audio_file: str) -> str:
+        """
+        计算音频文件内容的 SHA-256（流式读取，不整体载入内存）
+
+        Args:
+            audio_file: 本地音频文件路径
+
+        Returns:
+            十六进制哈希字符串
+        """
+        digest = hashlib.sha256()
+        with open(audio_file, "rb") as f:
+            for block in iter(lambda: f.read(cls.HASH_CHUNK_SIZE), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    @staticmethod
+    def normalize_language_hints(language_hints: list[str]) -> str:
+        """语言提示归一化为缓存键（去重、排序，顺序无关）"""
+        return ",".join(sorted({hint for hint in language_hints if hint}))
+
+    async def get(
+        self, audio_hash: str, model: str, language_hints: list[str]
+    ) -> Optional[ASRResult]:
+        """
+        查询缓存的识别结果
+
+        Args:
+            audio_hash: 音频内容哈希
+            model: ASR 模型名称
+            language_hints: 语言提示
+
+        Returns:
+            命中返回 ASRResult，未命中返回 None
+        """
+        query = select(ASRCache).where(
+            ASRCache.audio_hash == audio_hash,
+            ASRCache.model == model,
+            ASRCache.language_hints == self.normalize_language_hints(language_hints),
+        )
+        result = await self.db.execute(query)
+        entry = result.scalar_one_or_none()
+
+        if not entry:
+            logger.info(f"ASR cache miss: hash={audio_hash[:12]}, model={model}")
+            return None
+
+        logger.info(f"ASR cache hit: hash={audio_hash[:12]}, model={model}")
+        return ASRResult.from_dict(entry.result)
+
+    async def save(
+        self,
+        audio_hash: str,
+        model: str,
+        language_hints: list[str],
+        asr_result: ASRResult,
+    ) -> None:
+        """
+        写入识别结果（并发写入同一键时保留先写入的结果）
+
+        Args:
+            audio_hash: 音频内容哈希
+            model: ASR 模型名称
+            language_hints: 语言提示
+            asr_result: 识别结果
+        """
+        stmt = (
+            insert(ASRCache)
+            .values(
+                audio_hash=audio_hash,
+                model=model,
+                language_hints=self.normalize_language_hints(language_hints),
+                result=asr_result.to_dict(),
+            )
+            .on_conflict_do_nothing(
+                index_elements=["audio_hash", "model", "language_hints"]
+            )
+        )
+        await self.db.execute(stmt)
+        await self.db.commit()
+
+        logger.info(
+            f"ASR result cached: hash={audio_hash[:12]}, model={model}, "
+            f"segments={len(asr_result.segments)}"
+        )
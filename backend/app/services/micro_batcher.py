@@ -0,0 +1,186 @@
+"""
+跨任务微批处理基础设施
+多个 Celery worker 进程通过 Redis 汇集短时间窗口内的请求，合并为一次外部调用
+"""
+
+import json
+import time
+from typing import Optional
+from uuid import uuid4
+
+import redis
+from loguru import logger
+
+from app.config import settings
+
+
+class RedisMicroBatcher:
+    """
+    基于 Redis 的跨进程微批处理器
+
+    工作方式：
+    1. 提交者把请求写入 batch_key 对应的 Redis 队列
+    2. 抢到 leader 锁的提交者等待一个时间窗口，取出队列中的请求，
+       调用 process_batch 一次性处理，并把结果按请求 ID 写回 Redis
+    3. 其他提交者只轮询 Redis 中自己的结果键（不访问外部服务）
+
+    leader 在处理期间崩溃时，其他提交者会在超时后抛出 TimeoutError，
+    调用方应降级为单独处理。
+
+    子类需实现 process_batch。
+    """
+
+    # Redis 键命名空间（子类覆盖）
+    NAMESPACE = "micro_batch"
+
+    # 提交者轮询自身结果的间隔（秒）
+    POLL_INTERVAL = 0.5
+
+    def __init__(
+        self,
+        window_ms: int,
+        max_items: int,
+        redis_client: Optional[redis.Redis] = None,
+        result_ttl: int = 600,
+    ):
+        """
+        初始化微批处理器
+
+        Args:
+            window_ms: 收集窗口（毫秒）
+            max_items: 单批最大请求数
+            redis_client: Redis 客户端（可选，默认按配置创建）
+            result_ttl: 结果在 Redis 中的保留时间（秒）
+        """
+        self.window_ms = window_ms
+        self.max_items = max_items
+        self.redis = redis_client or redis.from_url(settings.redis_url)
+        self.result_ttl = result_ttl
+
+    def process_batch(self, batch_key: str, payloads: list[dict]) -> list[dict]:
+        """
+        处理一批请求（子类实现）
+
+        Args:
+            batch_key: 批次键（同一批次内的请求可以合并处理）
+            payloads: 请求数据列表
+
+        Returns:
+            与 payloads 一一对应的结果列表；单个请求失败时返回 {"error": "..."}
+        """
+        raise NotImplementedError
+
+    def submit(self, batch_key: str, payload: dict, timeout: float) -> dict:
+        """
+        提交请求并等待批处理结果
+
+        Args:
+            batch_key: 批次键
+            payload: 请求数据（需可 JSON 序列化）
+            timeout: 等待超时（秒）
+
+        Returns:
+            该请求的处理结果
+
+        Raises:
+            TimeoutError: 超时未获得结果
+            RuntimeError: 该请求处理失败
+        """
+        request_id = uuid4().hex
+        raw_request = json.dumps({"id": request_id, "payload": payload})
+        self.redis.rpush(self._queue_key(batch_key), raw_request)
+
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            result = self._pop_result(request_id)
+            if result is not None:
+                return self._unwrap(result)
+
+            if not self._try_lead(batch_key):
+                time.sleep(self.POLL_INTERVAL)
+
+        # 超时：仍在队列中的请求撤回，避免之后的 leader 处理无人等待的请求
+        if self.redis.lrem(self._queue_key(batch_key), 1, raw_request):
+            raise TimeoutError(f"Micro-batch request timed out after {timeout}s: {batch_key}")
+
+        # 已被 leader 取走：结果可能在最后一次轮询之后才写入，再读取一次
+        # （仍未写入时放弃，迟到的结果随 result_ttl 过期）
+        result = self._pop_result(request_id)
+        if result is not None:
+            return self._unwrap(result)
+
+        raise TimeoutError(f"Micro-batch request timed out after {timeout}s: {batch_key}")
+
+    @staticmethod
+    def _unwrap(result: dict) -> dict:
+        """单个请求失败时抛出 RuntimeError"""
+        if "error" in result:
+            raise RuntimeError(result["error"])
+        return result
+
+    def _try_lead(self, batch_key: str) -> bool:
+        """
+        尝试成为 leader：收集窗口内的请求并处理一批
+
+        Returns:
+            是否处理了一批请求
+        """
+        token = uuid4().hex
+        lock_key = self._lock_key(batch_key)
+        lease_ms = self.window_ms + 5000
+
+        if not self.redis.set(lock_key, token, nx=True, px=lease_ms):
+            return False
+
+        try:
+            # 等待窗口期内的其他请求
+            time.sleep(self.window_ms / 1000)
+            raw_items = self.redis.lpop(self._queue_key(batch_key), self.max_items) or []
+        finally:
+            # 只释放自己持有的锁（窗口结束即释放，处理期间允许下一批开始收集）
+            if self.redis.get(lock_key) == token.encode():
+                self.redis.delete(lock_key)
+
+        if not raw_items:
+            return False
+
+        items = [json.loads(raw) for raw in raw_items]
+        logger.info(f"Processing micro-batch: key={batch_key}, size={len(items)}")
+
+        try:
+            results = self.process_batch(batch_key, [item["payload"] for item in items])
+        except Exception as e:
+            logger.error(f"Micro-batch failed: key={batch_key}, error={e}")
+            results = [{"error": str(e)}] * len(items)
+
+        if len(results) != len(items):
+            logger.error(
+                f"Micro-batch returned {len(results)} results for {len(items)} requests: "
+                f"key={batch_key}"
+            )
+            results = [{"error": "Batch result count mismatch"}] * len(items)
+
+        pipe = self.redis.pipeline()
+        for item, result in zip(items, results, strict=True):
+            pipe.set(self._result_key(item["id"]), json.dumps(result), ex=self.result_ttl)
+        pipe.execute()
+
+        return True
+
+    def _pop_result(self, request_id: str) -> Optional[dict]:
+        """读取并删除请求结果"""
+        key = self._result_key(request_id)
+        raw = self.redis.get(key)
+        if raw is None:
+            return None
+        self.redis.delete(key)
+        return json.loads(raw)
+
+    def _queue_key(self, batch_key: str) -> str:
+        return f"{self.NAMESPACE}:queue:{batch_key}"
+
+    def _lock_key(self, batch_key: str) -> str:
+        return f"{self.NAMESPACE}:leader:{batch_key}"
+
+    def _result_key(self, request_id: str) -> str:
+        return f"{self.NAMESPACE}:result:{request_id}"
@@ -0,0 +1,159 @@
+"""
+ASR 分段合并服务
+把同一说话人的相邻短片段合并为句子级配音单元，减少 TTS 调用、OSS 对象和混音输入
+"""
+
+from typing import Optional
+
+from loguru import logger
+
+from app.config import settings
+from app.integrations.dashscope.asr_client import ASRSegment
+
+
+class SegmentCoalescer:
+    """
+    ASR 分段合并器
+
+    合并规则（相邻片段需全部满足）：
+    1. 说话人相同
+    2. 间隔不超过 max_gap_ms
+    3. 合并后时长不超过 max_duration_ms、字符数不超过 max_chars
+    4. 当前单元已以句末标点结尾且时长达到 min_duration_ms 时不再合并（保持句子边界）
+
+    合并后的单元保留各原始片段（source_spans），用于按原始时间轴生成原文字幕。
+    """
+
+    SENTENCE_ENDINGS = tuple("。！？!?.…")
+
+    def __init__(
+        self,
+        max_gap_ms: Optional[int] = None,
+        max_duration_ms: Optional[int] = None,
+        max_chars: Optional[int] = None,
+        min_duration_ms: Optional[int] = None,
+    ):
+        """
+        初始化合并器
+
+        Args:
+            max_gap_ms: 允许合并的最大间隔（毫秒）
+            max_duration_ms: 合并单元的最大时长（毫秒）
+            max_chars: 合并单元的最大字符数
+            min_duration_ms: 句末标点处允许断开的最小单元时长（毫秒）
+        """
+        self.max_gap_ms = max_gap_ms if max_gap_ms is not None else settings.segment_coalesce_max_gap_ms
+        self.max_duration_ms = max_duration_ms or settings.segment_coalesce_max_duration_ms
+        self.max_chars = max_chars or settings.segment_coalesce_max_chars
+        self.min_duration_ms = (
+            min_duration_ms if min_duration_ms is not None
+            else settings.segment_coalesce_min_duration_ms
+        )
+
+    def coalesce(self, segments: list[ASRSegment]) -> list[dict]:
+        """
+        合并 ASR 分段
+
+        Args:
+            segments: ASR 分段列表（按时间排序）
+
+        Returns:
+            分段数据列表（字段同 TaskService.create_segments），
+            由多个片段合并而来的单元带有 source_spans
+        """
+        units: list[list[ASRSegment]] = []
+
+        for segment in sorted(segments, key=lambda s: s.start_time_ms):
+            if not segment.text:
+                continue
+            if units and self._can_merge(units[-1], segment):
+                units[-1].append(segment)
+            else:
+                units.append([segment])
+
+        result = [self._build_unit(i, unit) for i, unit in enumerate(units)]
+
+        logger.info(
+            f"Coalesced {len(segments)} ASR segments into {len(result)} dubbing units "
+            f"(max_gap={self.max_gap_ms}ms, max_duration={self.max_duration_ms}ms, "
+            f"max_chars={self.max_chars})"
+        )
+
+        return result
+
+    def _can_merge(self, unit: list[ASRSegment], segment: ASRSegment) -> bool:
+        """判断片段能否并入当前单元"""
+        last = unit[-1]
+        unit_duration = last.end_time_ms - unit[0].start_time_ms
+
+        if segment.speaker_id != unit[0].speaker_id:
+            return False
+        if segment.start_time_ms - last.end_time_ms > self.max_gap_ms:
+            return False
+        if segment.end_time_ms - unit[0].start_time_ms > self.max_duration_ms:
+            return False
+        if sum(len(s.text) for s in unit) + len(segment.text) > self.max_chars:
+            return False
+        if last.text.rstrip().endswith(self.SENTENCE_ENDINGS) and unit_duration >= self.min_duration_ms:
+            return False
+        return True
+
+    def _build_unit(self, index: int, unit: list[ASRSegment]) -> dict:
+        """构建合并单元的分段数据"""
+        text = unit[0].text
+        for segment in unit[1:]:
+            text = self.join_text(text, segment.text)
+
+        durations = [max(s.end_time_ms - s.start_time_ms, 1) for s in unit]
+        confidences = [(s.confidence, d) for s, d in zip(unit, durations, strict=True) if s.confidence is not None]
+        confidence = (
+            sum(c * d for c, d in confidences) / sum(d for _, d in confidences)
+            if confidences else None
+        )
+
+        return {
+            "segment_index": index,
+            "start_time_ms": unit[0].start_time_ms,
+            "end_time_ms": unit[-1].end_time_ms,
+            "original_text": text,
+            "speaker_id": unit[0].speaker_id,
+            "confidence": confidence,
+            "emotion": next((s.emotion for s in unit if s.emotion), None),
+            "source_spans": [
+                {
+                    "start_time_ms": s.start_time_ms,
+                    "end_time_ms": s.end_time_ms,
+                    "text": s.text,
+                }
+                for s in unit
+            ] if len(unit) > 1 else None,
+        }
+
+    @staticmethod
+    def join_text(left: str, right: str) -> str:
+        """
+        拼接两段文本：CJK 之间不加空格，其他情况用空格分隔
+
+        Examples:
+            >>> SegmentCoalescer.join_text("你好", "世界")
+            '你好世界'
+            >>> SegmentCoalescer.join_text("Hello", "world")
+            'Hello world'
+        """
+        left, right = left.rstrip(), right.lstrip()
+        if not left or not right:
+            return left + right
+        if _is_cjk(left[-1]) or _is_cjk(right[0]):
+            return left + right
+        return f"{left} {right}"
+
+
+def _is_cjk(char: str) -> bool:
+    """是否为 CJK 字符或全角标点"""
+    return (
+        "\u4e00" <= char <= "\u9fff"
+        or "\u3040" <= char <= "\u30ff"
+        or "\uac00" <= char <= "\ud7af"
+        or "\u3000" <= char <= "\u303f"
+        or "\uff00" <= char <= "\uffef"
+    )
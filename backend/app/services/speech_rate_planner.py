@@ -0,0 +1,176 @@
+"""
+语速规划服务
+合成前根据译文长度和目标语言估算朗读时长，为超出时间槽的分段提高 TTS 语速，
+避免合成后再用 ffmpeg atempo 逐段修正
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+from app.config import settings
+
+
+@dataclass
+class SpeechRatePlan:
+    """单个分段的语速规划结果"""
+
+    speech_rate: float        # 传给 TTS 的语速（1.0 为默认语速）
+    estimated_ms: int         # 按该语速估算的朗读时长（毫秒）
+    slot_ms: int              # 可用时间槽（毫秒）
+
+    @property
+    def fits(self) -> bool:
+        """估算时长是否落在时间槽内"""
+        return self.estimated_ms <= self.slot_ms
+
+
+class SpeechRatePlanner:
+    """
+    语速规划器
+
+    时长模型：朗读时长 ≈ 发音单元数 / 语速(单元/秒) + 标点停顿。
+    CJK 语言按字计数，其他语言按字母数字计数。
+    """
+
+    # 默认语速（speech_rate=1.0）下每秒朗读的发音单元数
+    UNITS_PER_SECOND = {
+        "zh": 4.5,
+        "ja": 7.0,
+        "ko": 5.5,
+        "en": 14.0,
+        "es": 15.0,
+        "fr": 14.0,
+        "de": 13.0,
+        "ru": 13.0,
+    }
+    DEFAULT_UNITS_PER_SECOND = 13.0
+
+    # 标点停顿（毫秒）
+    SHORT_PAUSE_MS = 150
+    LONG_PAUSE_MS = 300
+    _SHORT_PAUSE = re.compile(r"[,，、;；:：]")
+    _LONG_PAUSE = re.compile(r"[.。!！?？…]+")
+    _CJK = re.compile(r"[\u4e00-\u9fff\u3040-\u30ff\uac00-\ud7af]")
+    _WORD_CHAR = re.compile(r"\w")
+
+    def __init__(
+        self,
+        language: str,
+        max_rate: Optional[float] = None,
+        fill_ratio: Optional[float] = None,
+    ):
+        """
+        初始化语速规划器
+
+        Args:
+            language: 目标语言代码
+            max_rate: 最大语速（可选，默认 settings.tts_max_speech_rate）
+            fill_ratio: 目标填充比例（可选，默认 settings.tts_slot_fill_ratio），
+                语速按 时间槽 × fill_ratio 计算，为估算误差留余量
+        """
+        self.language = language
+        self.max_rate = max_rate or settings.tts_max_speech_rate
+        self.fill_ratio = fill_ratio or settings.tts_slot_fill_ratio
+        self.units_per_second = self.UNITS_PER_SECOND.get(
+            language, self.DEFAULT_UNITS_PER_SECOND
+        )
+
+    def estimate_duration_ms(self, text: str, speech_rate: float = 1.0) -> int:
+        """
+        估算文本朗读时长
+
+        Args:
+            text: 文本
+            speech_rate: 语速
+
+        Returns:
+            估算时长（毫秒）
+        """
+        if not text:
+            return 0
+
+        cjk_units = len(self._CJK.findall(text))
+        other_units = len(self._WORD_CHAR.findall(text)) - cjk_units
+        units = cjk_units + max(other_units, 0)
+
+        speech_ms = units / self.units_per_second * 1000
+        pause_ms = (
+            len(self._SHORT_PAUSE.findall(text)) * self.SHORT_PAUSE_MS
+            + len(self._LONG_PAUSE.findall(text.rstrip(".。!！?？… "))) * self.LONG_PAUSE_MS
+        )
+
+        return int((speech_ms + pause_ms) / speech_rate)
+
+    def plan(self, text: str, slot_ms: int) -> SpeechRatePlan:
+        """
+        为单个分段规划语速
+
+        Args:
+            text: 译文
+            slot_ms: 可用时间槽（毫秒）
+
+        Returns:
+            SpeechRatePlan
+        """
+        natural_ms = self.estimate_duration_ms(text)
+        target_ms = slot_ms * self.fill_ratio
+
+        speech_rate = 1.0
+        if slot_ms > 0 and natural_ms > target_ms:
+            speech_rate = min(natural_ms / target_ms, self.max_rate)
+            speech_rate = round(speech_rate, 2)
+
+        return SpeechRatePlan(
+            speech_rate=speech_rate,
+            estimated_ms=int(natural_ms / speech_rate),
+            slot_ms=slot_ms,
+        )
+
+    @staticmethod
+    def slots(segments, total_duration_ms: Optional[int] = None) -> dict[int, int]:
+        """
+        计算各分段的可用时间槽（到下一个分段开始或视频结束）
+
+        Args:
+            segments: Segment 列表（只考虑有文本的分段）
+            total_duration_ms: 视频总时长（可选，默认取最后一个分段的结束时间）
+
+        Returns:
+            segment_index -> 时间槽（毫秒）
+        """
+        ordered = sorted(
+            (seg for seg in segments if seg.original_text or seg.translated_text),
+            key=lambda s: s.start_time_ms,
+        )
+        if not ordered:
+            return {}
+
+        end_ms = total_duration_ms or max(seg.end_time_ms for seg in ordered)
+
+        slots = {}
+        for i, seg in enumerate(ordered):
+            next_start = ordered[i + 1].start_time_ms if i + 1 < len(ordered) else end_ms
+            slots[seg.segment_index] = max(next_start - seg.start_time_ms, 0)
+
+        return slots
+
+    def plan_segments(
+        self, segments, total_duration_ms: Optional[int] = None
+    ) -> dict[int, SpeechRatePlan]:
+        """
+        为所有已翻译分段规划语速
+
+        Args:
+            segments: Segment 列表（使用 segment_index/start_time_ms/end_time_ms/translated_text）
+            total_duration_ms: 视频总时长（可选）
+
+        Returns:
+            segment_index -> SpeechRatePlan
+        """
+        slots = self.slots(segments, total_duration_ms)
+        return {
+            seg.segment_index: self.plan(seg.translated_text, slots[seg.segment_index])
+            for seg in segments
+            if seg.translated_text and seg.segment_index in slots
+        }
@@ -11,6 +11,7 @@ from uuid import UUID
 
 from loguru import logger
 
+from app.config import settings
 from app.integrations.oss import OSSClient
 
 
@@ -58,6 +59,26 @@ class StorageService:
 
         return oss_path
 
+    def copy_input_video(self, src_path: str, task_id: UUID) -> str:
+        """
+        复制其他任务的输入视频到本任务（预览转完整任务时服务端复制，不重新上传）
+
+        复制而不是直接引用，删除预览任务时不影响完整任务。
+
+        Args:
+            src_path: 源输入视频 OSS 路径
+            task_id: 目标任务 ID
+
+        Returns:
+            OSS 相对路径
+        """
+        oss_path = self.build_task_path(task_id, f"input{Path(src_path).suffix}")
+        self.oss.copy_file(src_path, oss_path)
+
+        logger.info(f"Copied input video: task_id={task_id}, path={oss_path}")
+
+        return oss_path
+
     def upload_extracted_audio(
         self, task_id: UUID, audio_file: str
     ) -> str:
@@ -99,6 +120,27 @@ class StorageService:
 
         return oss_path
 
+    def copy_segment_audio(
+        self, src_path: str, task_id: UUID, segment_index: int
+    ) -> str:
+        """
+        复制其他任务的分段音频到本任务（预览转完整任务时复用已合成的音频）
+
+        复制而不是直接引用，删除预览任务时不影响完整任务。
+
+        Args:
+            src_path: 源分段音频 OSS 路径
+            task_id: 目标任务 ID
+            segment_index: 目标分段索引
+
+        Returns:
+            OSS 相对路径
+        """
+        oss_path = self.build_task_path(task_id, f"segments/segment_{segment_index:04d}.mp3")
+        self.oss.copy_file(src_path, oss_path)
+
+        return oss_path
+
     def upload_subtitle_file(
         self, task_id: UUID, subtitle_file: str
     ) -> str:
@@ -139,6 +181,100 @@ class StorageService:
 
         return oss_path
 
+    def upload_output_audio(
+        self, task_id: UUID, audio_file: str
+    ) -> str:
+        """
+        上传混音后的配音音轨
+
+        Args:
+            task_id: 任务 ID
+            audio_file: 本地音频文件路径（.m4a / .opus）
+
+        Returns:
+            OSS 相对路径
+        """
+        ext = Path(audio_file).suffix.lower()
+        oss_path = self.build_task_path(task_id, f"output{ext}")
+        content_type = {".m4a": "audio/mp4", ".opus": "audio/ogg"}.get(ext, "audio/mpeg")
+        self.oss.upload_file(audio_file, oss_path, content_type=content_type)
+
+        logger.info(f"Uploaded output audio: task_id={task_id}, path={oss_path}")
+
+        return oss_path
+
+    def upload_output_video_stream(
+        self, task_id: UUID, stream: BinaryIO
+    ) -> str:
+        """
+        以流方式上传输出视频（边编码边上传）
+
+        Args:
+            task_id: 任务 ID
+            stream: 视频字节流（如 FFmpeg 的标准输出管道）
+
+        Returns:
+            OSS 相对路径
+        """
+        oss_path = self.build_task_path(task_id, "output.mp4")
+        self.oss.upload_stream_multipart(
+            stream,
+            oss_path,
+            content_type="video/mp4",
+            part_size=settings.mux_upload_part_size,
+        )
+
+        logger.info(f"Uploaded output video (streamed): task_id={task_id}, path={oss_path}")
+
+        return oss_path
+
+    def upload_hls_file(self, task_id: UUID, local_file: str) -> str:
+        """
+        上传 HLS 输出文件（播放列表 / 初始化分片 / 媒体分片）
+
+        文件保存在任务目录的 hls/ 下，文件名保持不变，播放列表中的相对 URI 因此仍然有效。
+
+        Args:
+            task_id: 任务 ID
+            local_file: 本地文件路径
+
+        Returns:
+            OSS 相对路径
+        """
+        filename = Path(local_file).name
+        oss_path = self.build_task_path(task_id, f"hls/{filename}")
+        self.oss.upload_file(
+            local_file, oss_path, content_type=self._get_hls_content_type(Path(filename).suffix)
+        )
+
+        logger.debug(f"Uploaded HLS file: task_id={task_id}, path={oss_path}")
+
+        return oss_path
+
+    def get_hls_playlist(self, playlist_path: str, expires: int = 3600) -> Optional[str]:
+        """
+        读取 HLS 播放列表，并把分片 URI 改写为签名 URL（Bucket 为私有读）
+
+        Args:
+            playlist_path: 播放列表 OSS 路径
+            expires: 分片签名 URL 过期时间（秒）
+
+        Returns:
+            改写后的播放列表内容；播放列表尚未生成时返回 None
+        """
+        from app.utils.hls import rewrite_playlist
+
+        if not self.oss.file_exists(playlist_path):
+            return None
+
+        content = self.oss.download_bytes(playlist_path).decode("utf-8")
+        hls_dir = playlist_path.rsplit("/", 1)[0]
+
+        return rewrite_playlist(
+            content,
+            lambda name: self.oss.generate_presigned_url(f"{hls_dir}/{name}", expires),
+        )
+
     def download_file(self, oss_path: str, local_dir: Optional[str] = None) -> str:
         """
         下载文件到本地
@@ -219,3 +355,13 @@ class StorageService:
             ".flv": "video/x-flv",
         }
         return content_types.get(ext.lower(), "video/mp4")
+
+    @staticmethod
+    def _get_hls_content_type(ext: str) -> str:
+        """根据扩展名获取 HLS 文件 MIME 类型"""
+        content_types = {
+            ".m3u8": "application/vnd.apple.mpegurl",
+            ".m4s": "video/iso.segment",
+            ".mp4": "video/mp4",
+        }
+        return content_types.get(ext.lower(), "application/octet-stream")
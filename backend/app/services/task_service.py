@@ -6,11 +6,11 @@ from typing import Optional
 from uuid import UUID
 
 from loguru import logger
-from sqlalchemy import select, func
+from sqlalchemy import select, func, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.models import Task, TaskStatus, SubtitleMode, Segment
+from app.models import Task, TaskStatus, SubtitleMode, OutputFormat, Segment
 from app.schemas import TaskCreate, TaskUpdate
 
 
@@ -20,21 +20,32 @@ class TaskService:
     def __init__(self, db: AsyncSession):
         self.db = db
 
-    async def create_task(self, task_data: TaskCreate) -> Task:
+    async def create_task(
+        self,
+        task_data: TaskCreate,
+        parent_task_id: Optional[UUID] = None,
+        preview_task_id: Optional[UUID] = None,
+    ) -> Task:
         """
         创建任务
 
         Args:
             task_data: 任务创建数据
+            parent_task_id: 多语言配音的主任务 ID（可选）
+            preview_task_id: 复用产物的预览任务 ID（可选，预览转完整任务时使用）
 
         Returns:
             创建的任务对象
         """
         task = Task(
+            parent_task_id=parent_task_id,
+            preview_task_id=preview_task_id,
+            preview_duration_ms=getattr(task_data, 'preview_duration_ms', None),
             title=task_data.title,
             source_language=task_data.source_language,
             target_language=task_data.target_language,
             subtitle_mode=getattr(task_data, 'subtitle_mode', SubtitleMode.BURN),
+            output_format=getattr(task_data, 'output_format', OutputFormat.MP4),
             status=TaskStatus.PENDING,
             progress=0,
         )
@@ -47,6 +58,58 @@ class TaskService:
 
         return task
 
+    async def create_shard_tasks(
+        self, parent: Task, windows: list[tuple[int, int]]
+    ) -> list[Task]:
+        """
+        为分片流水线创建分片任务（单次提交）
+
+        分片复用主任务的输入视频（无法按 URL 读取的容器由 plan_shards 切好窗口后替换）、
+        探测结果和预览任务（按窗口复用预览产物）；画面字幕只在烧录模式下由分片各自烧录，
+        字幕文件在拼接后按主任务的完整分段统一生成。
+
+        Args:
+            parent: 主任务
+            windows: 各分片的时间窗口 [(start_ms, end_ms)]
+
+        Returns:
+            分片任务列表（按分片序号排序）
+        """
+        subtitle_mode = (
+            SubtitleMode.BURN
+            if (parent.subtitle_mode or SubtitleMode.BURN) == SubtitleMode.BURN
+            else SubtitleMode.NONE
+        )
+        shards = [
+            Task(
+                shard_parent_id=parent.id,
+                preview_task_id=parent.preview_task_id,
+                shard_index=index,
+                shard_start_ms=start_ms,
+                shard_end_ms=end_ms,
+                title=parent.title,
+                source_language=parent.source_language,
+                target_language=parent.target_language,
+                subtitle_mode=subtitle_mode,
+                output_format=OutputFormat.MP4,
+                input_video_path=parent.input_video_path,
+                media_info=parent.media_info,
+                video_duration_ms=end_ms - start_ms,
+                status=TaskStatus.PENDING,
+                progress=0,
+            )
+            for index, (start_ms, end_ms) in enumerate(windows)
+        ]
+
+        self.db.add_all(shards)
+        await self.db.commit()
+        for shard in shards:
+            await self.db.refresh(shard)
+
+        logger.info(f"Shard tasks created: parent={parent.id}, count={len(shards)}")
+
+        return shards
+
     async def get_task(self, task_id: UUID, with_segments: bool = False) -> Optional[Task]:
         """
         获取任务
@@ -68,6 +131,45 @@ class TaskService:
 
         return task
 
+    async def list_child_tasks(self, parent_task_id: UUID) -> list[Task]:
+        """
+        获取多语言配音的子任务（其他目标语言）
+
+        Args:
+            parent_task_id: 主任务 ID
+
+        Returns:
+            子任务列表（按创建时间排序）
+        """
+        query = (
+            select(Task)
+            .where(Task.parent_task_id == parent_task_id)
+            .order_by(Task.created_at)
+        )
+        result = await self.db.execute(query)
+        return list(result.scalars().all())
+
+    async def list_shard_tasks(self, shard_parent_id: UUID, with_segments: bool = False) -> list[Task]:
+        """
+        获取分片流水线的分片任务
+
+        Args:
+            shard_parent_id: 主任务 ID
+            with_segments: 是否加载分段数据
+
+        Returns:
+            分片任务列表（按分片序号排序）
+        """
+        query = (
+            select(Task)
+            .where(Task.shard_parent_id == shard_parent_id)
+            .order_by(Task.shard_index)
+        )
+        if with_segments:
+            query = query.options(selectinload(Task.segments))
+        result = await self.db.execute(query)
+        return list(result.scalars().all())
+
     async def list_tasks(
         self,
         page: int = 1,
@@ -85,8 +187,8 @@ class TaskService:
         Returns:
             (任务列表, 总数量)
         """
-        # 构建查询
-        query = select(Task)
+        # 构建查询（分片任务属于主任务内部，不在列表中展示）
+        query = select(Task).where(Task.shard_parent_id.is_(None))
 
         if status:
             query = query.where(Task.status == status)
@@ -95,7 +197,7 @@ class TaskService:
         query = query.order_by(Task.created_at.desc())
 
         # 获取总数
-        count_query = select(func.count()).select_from(Task)
+        count_query = select(func.count()).select_from(Task).where(Task.shard_parent_id.is_(None))
         if status:
             count_query = count_query.where(Task.status == status)
 
@@ -190,6 +292,35 @@ class TaskService:
 
         return task
 
+    async def start_redub(self, task: Task) -> bool:
+        """
+        把已结束的任务标记为重新配音中（条件更新，单次提交）
+
+        状态与错误信息在同一次提交中更新；并发的重复请求只有一个能成功，避免重复执行。
+
+        Args:
+            task: 任务（已完成或失败）
+
+        Returns:
+            是否成功标记（任务已在处理中时返回 False）
+        """
+        values = {"status": TaskStatus.PENDING, "error_message": None, "completed_at": None}
+        if not (task.output_format or OutputFormat.MP4).is_audio_only:
+            # 提前发布的配音音轨已过期，重新封装时再次发布
+            values["output_audio_path"] = None
+
+        result = await self.db.execute(
+            update(Task)
+            .where(
+                Task.id == task.id,
+                Task.status.in_((TaskStatus.COMPLETED, TaskStatus.FAILED)),
+            )
+            .values(**values)
+        )
+        await self.db.commit()
+
+        return result.rowcount == 1
+
     async def delete_task(self, task_id: UUID) -> bool:
         """
         删除任务
@@ -255,11 +386,71 @@ class TaskService:
 
         return segment
 
+    async def create_segments(
+        self, task_id: UUID, segments: list[dict]
+    ) -> int:
+        """
+        批量创建分段（单次提交）
+
+        Args:
+            task_id: 任务 ID
+            segments: 分段数据列表，字段同 create_segment 的参数
+                （segment_index, start_time_ms, end_time_ms, original_text, ...）
+
+        Returns:
+            创建的分段数量
+        """
+        self.db.add_all([Segment(task_id=task_id, **data) for data in segments])
+        await self.db.commit()
+
+        logger.info(f"Segments created: task_id={task_id}, count={len(segments)}")
+
+        return len(segments)
+
+    @staticmethod
+    def match_reusable_segments(
+        source_segments, segments, tolerance_ms: int = 300, offset_ms: int = 0
+    ) -> list[tuple]:
+        """
+        匹配可复用产物的分段（如预览任务 -> 完整任务）
+
+        原文完全相同且起止时间相差不超过 tolerance_ms 的分段视为同一分段；
+        预览窗口末尾被截断的分段原文不同，自然不会匹配。
+
+        Args:
+            source_segments: 产物来源的分段列表（需已翻译）
+            segments: 目标分段列表
+            tolerance_ms: 起止时间容差（毫秒）
+            offset_ms: 目标分段时间轴在来源时间轴上的起点（如分片窗口起点）
+
+        Returns:
+            [(目标分段, 来源分段)]
+        """
+        candidates: dict[str, list] = {}
+        for source in source_segments:
+            if source.original_text and source.translated_text:
+                candidates.setdefault(source.original_text.strip(), []).append(source)
+
+        matches = []
+        for segment in segments:
+            if not segment.original_text:
+                continue
+            for source in candidates.get(segment.original_text.strip(), []):
+                if (
+                    abs(source.start_time_ms - segment.start_time_ms - offset_ms) <= tolerance_ms
+                    and abs(source.end_time_ms - segment.end_time_ms - offset_ms) <= tolerance_ms
+                ):
+                    matches.append((segment, source))
+                    candidates[segment.original_text.strip()].remove(source)
+                    break
+
+        return matches
+
     async def update_segment_translation(
         self, segment_id: UUID, translated_text: str
     ) -> Optional[Segment]:
         """
-        更新分段翻译
+        更新分段翻译（译文变化时清空已合成的音频路径，避免音频与译文不一致）
 
         Args:
             segment_id: 分段 ID
@@ -275,14 +466,74 @@ class TaskService:
         if not segment:
             return None
 
+        if segment.translated_text != translated_text:
+            segment.audio_path = None
+            segment.audio_duration_ms = None
         segment.translated_text = translated_text
         await self.db.commit()
         await self.db.refresh(segment)
 
         return segment
 
+    async def edit_segment(
+        self,
+        task_id: UUID,
+        segment_id: UUID,
+        translated_text: Optional[str] = None,
+        speaker_id: Optional[str] = None,
+        voice_id: Optional[str] = None,
+    ) -> Optional[Segment]:
+        """
+        编辑分段（译文 / 说话人 / 音色，None 表示不修改）
+
+        任一字段变化时清空已合成的音频，分段标记为待重新合成；
+        更换说话人且未指定音色时清空 voice_id，重新合成时使用新说话人的音色；
+        指定的音色只属于该分段，不作为说话人的音色被其他分段复用。
+
+        Args:
+            task_id: 任务 ID
+            segment_id: 分段 ID
+            translated_text: 翻译文本
+            speaker_id: 说话人 ID
+            voice_id: 声音复刻 ID
+
+        Returns:
+            更新后的分段对象，不存在（或不属于该任务）则返回 None
+        """
+        query = select(Segment).where(Segment.id == segment_id, Segment.task_id == task_id)
+        result = await self.db.execute(query)
+        segment = result.scalar_one_or_none()
+
+        if not segment:
+            return None
+
+        changed = False
+        if translated_text is not None and translated_text != segment.translated_text:
+            segment.translated_text = translated_text
+            changed = True
+        if speaker_id is not None and speaker_id != segment.speaker_id:
+            segment.speaker_id = speaker_id
+            if voice_id is None:
+                segment.voice_id = None
+                segment.voice_overridden = False
+            changed = True
+        if voice_id is not None and voice_id != segment.voice_id:
+            segment.voice_id = voice_id
+            segment.voice_overridden = True
+            changed = True
+
+        if changed:
+            segment.audio_path = None
+            segment.audio_duration_ms = None
+            await self.db.commit()
+            await self.db.refresh(segment)
+
+            logger.info(f"Segment edited: task_id={task_id}, segment_index={segment.segment_index}")
+
+        return segment
+
     async def update_segment_audio(
-        self, segment_id: UUID, audio_path: str
+        self, segment_id: UUID, audio_path: str, audio_duration_ms: Optional[int] = None
     ) -> Optional[Segment]:
         """
         更新分段音频路径
@@ -290,6 +541,7 @@ class TaskService:
         Args:
             segment_id: 分段 ID
             audio_path: 音频文件路径
+            audio_duration_ms: 音频实际时长（毫秒，可选）
 
         Returns:
             更新后的分段对象
@@ -302,6 +554,7 @@ class TaskService:
             return None
 
         segment.audio_path = audio_path
+        segment.audio_duration_ms = audio_duration_ms
         await self.db.commit()
         await self.db.refresh(segment)
 
@@ -0,0 +1,108 @@
+"""
+翻译跨任务批处理服务
+把多个短视频任务的分段合并为少量 LLM 请求，分摊系统提示词和请求开销
+"""
+
+from types import SimpleNamespace
+from typing import Optional
+
+from loguru import logger
+
+from app.config import settings
+from app.integrations.dashscope import LLMClient
+from app.utils.async_runner import run_async
+
+from .micro_batcher import RedisMicroBatcher
+from .translation_service import TranslationService
+
+
+class TranslationBatcher(RedisMicroBatcher):
+    """翻译批处理器（按模型 + 源语言 + 目标语言分批）"""
+
+    NAMESPACE = "translation_batch"
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("window_ms", settings.llm_batch_window_ms)
+        kwargs.setdefault("max_items", settings.llm_batch_max_tasks)
+        super().__init__(**kwargs)
+
+    def translate(
+        self,
+        texts: list[str],
+        source_lang: str,
+        target_lang: str,
+        model: Optional[str] = None,
+        timeout: int = 120,
+    ) -> list[Optional[str]]:
+        """
+        通过批处理翻译一个任务的全部分段
+
+        Args:
+            texts: 待翻译文本列表（按分段顺序）
+            source_lang: 源语言代码
+            target_lang: 目标语言代码
+            model: LLM 模型（可选，默认使用配置）
+            timeout: 翻译超时（秒），会额外加上收集窗口
+
+        Returns:
+            与 texts 一一对应的译文；批内未能翻译的位置为 None
+
+        Raises:
+            TimeoutError: 超时（调用方应降级为单独翻译）
+            RuntimeError: 翻译失败
+        """
+        model = model or settings.llm_model
+        batch_key = f"{model}|{source_lang}|{target_lang}"
+
+        result = self.submit(
+            batch_key,
+            {
+                "texts": texts,
+                "source_lang": source_lang,
+                "target_lang": target_lang,
+                "model": model,
+            },
+            timeout=timeout + self.window_ms / 1000,
+        )
+        return result["translations"]
+
+    def process_batch(self, batch_key: str, payloads: list[dict]) -> list[dict]:
+        """
+        合并各任务的文本统一翻译，再按任务拆分结果
+
+        各任务的分段被重新编号为连续的批内索引（批内索引 -> (请求序号, 分段序号)），
+        沿用 TranslationService 的 token 预算分块和局部失败恢复。
+        """
+        source_lang = payloads[0]["source_lang"]
+        target_lang = payloads[0]["target_lang"]
+        model = payloads[0]["model"]
+
+        pseudo_segments = []
+        index_map: dict[int, tuple[int, int]] = {}
+        for payload_idx, payload in enumerate(payloads):
+            for text_idx, text in enumerate(payload["texts"]):
+                batch_index = len(pseudo_segments)
+                pseudo_segments.append(
+                    SimpleNamespace(segment_index=batch_index, original_text=text)
+                )
+                index_map[batch_index] = (payload_idx, text_idx)
+
+        logger.info(
+            f"Translating batched segments: {len(payloads)} tasks, "
+            f"{len(pseudo_segments)} segments, key={batch_key}"
+        )
+
+        service = TranslationService(
+            source_lang=source_lang,
+            target_lang=target_lang,
+            llm_client=LLMClient(model=model),
+            stream=False,
+        )
+        translations = run_async(service.translate_segments(pseudo_segments))
+
+        results = [{"translations": [None] * len(p["texts"])} for p in payloads]
+        for batch_index, translated in translations.items():
+            payload_idx, text_idx = index_map[batch_index]
+            results[payload_idx]["translations"][text_idx] = translated
+
+        return results
@@ -1,12 +1,13 @@
 """
 翻译分块服务
-根据字符数限制智能分块，避免 LLM 超限并保持上下文连贯性
+根据 token 预算智能分块，避免 LLM 输出截断并保持上下文连贯性
 """
 
 import re
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 
 from loguru import logger
+from app.config import settings
 from app.models.segment import Segment
 
 
@@ -14,28 +15,54 @@ class TranslationChunker:
     """
     翻译分块服务
 
-    将大量分段智能分块为多个批次，每个批次不超过字符数限制，
-    同时通过重叠机制保持上下文连贯性。
+    将大量分段智能分块为多个批次，每个批次的预估输出 token 数不超过
+    LLM 输出上限（settings.llm_max_tokens），同时通过重叠机制保持上下文连贯性。
     """
 
     # 配置常量
-    MAX_CHARS_PER_CHUNK = 2000  # 单个翻译块的最大字符数
-    OVERLAP_SEGMENTS = 2        # 翻译块间重叠的句子数量
+    MAX_INPUT_TOKENS_PER_CHUNK = 6000  # 单个翻译块的最大输入 token 数（控制上下文长度）
+    OUTPUT_SAFETY_MARGIN = 0.8          # 输出预算只使用 max_tokens 的 80%，预留估算误差
+    OVERLAP_SEGMENTS = 2                # 翻译块间重叠的句子数量
+    SEGMENT_MARKER_TOKENS = 3           # 每行 "[index] " 标记的 token 开销
     SEGMENT_FORMAT = "[{index}] {text}"  # Output format for LLM input
 
+    # 表达相同内容所需 token 的相对系数（以英文为 1.0，按 _estimate_tokens 口径）
+    # 用于由源文本 token 数推算译文 token 数
+    LANGUAGE_TOKEN_FACTORS = {
+        "en": 1.0,
+        "es": 1.15,
+        "fr": 1.2,
+        "de": 1.2,
+        "ru": 1.3,
+        "zh": 2.0,
+        "ja": 2.2,
+        "ko": 1.8,
+    }
+
+    # 截断自适应：按语言对缩放输出预算（进程内共享）
+    TRUNCATION_BACKOFF = 0.7   # 出现截断后预算缩小为 70%
+    SUCCESS_RECOVERY = 1.05    # 每次成功后预算恢复 5%
+    MIN_BUDGET_SCALE = 0.3
+    _budget_scales: Dict[Tuple[str, str], float] = {}
+
     # 正则模式：匹配 [数字] 前缀（与 translate_segments_task 保持一致）
     SEGMENT_PATTERN = re.compile(r'\[(\d+)\]\s*(.+)')
 
+    # CJK 表意文字 / 日文假名 / 韩文音节（按字计 token）
+    _CJK_RANGES = (
+        ('\u4e00', '\u9fff'),
+        ('\u3040', '\u30ff'),
+        ('\uac00', '\ud7af'),
+    )
+
     @classmethod
     def _estimate_tokens(cls, text: str) -> int:
         """
-        估算文本的 token 数量（内部方法，已废弃，仅供参考）
+        估算文本的 token 数量
 
-        使用简单启发式：中文约 1 字符 = 1.5 tokens，英文约 4 字符 = 1 token
+        使用简单启发式：CJK 约 1 字符 = 1.5 tokens，其他文字约 4 字符 = 1 token
         这是保守估计，实际 token 数可能略少
 
-        注意：当前实现改用字符数限制，此方法保留仅供参考。
-
         Args:
             text: 待估算文本
 
@@ -44,36 +71,118 @@ class TranslationChunker:
 
         Examples:
             >>> TranslationChunker._estimate_tokens("Hello world")
-            3
+            2
             >>> TranslationChunker._estimate_tokens("你好世界")
             6
         """
         if not text:
             return 0
 
-        # 统计中文字符（CJK 统一表意文字）
-        cjk_chars = sum(1 for c in text if '\u4e00' <= c <= '\u9fff')
+        # 统计 CJK 字符
+        cjk_chars = sum(
+            1 for c in text if any(lo <= c <= hi for lo, hi in cls._CJK_RANGES)
+        )
 
-        # 统计非中文字符
+        # 统计非 CJK 字符
         other_chars = len(text) - cjk_chars
 
-        # 中文：1 字符 ≈ 1.5 tokens，英文：4 字符 ≈ 1 token
+        # CJK：1 字符 ≈ 1.5 tokens，其他：4 字符 ≈ 1 token
         estimated_tokens = int(cjk_chars * 1.5 + other_chars / 4)
 
         return max(estimated_tokens, 1)  # 至少 1 token
 
     @classmethod
-    def chunk_segments(cls, segments: List[Segment]) -> List[List[Segment]]:
+    def estimate_output_tokens(
+        cls,
+        text: str,
+        source_lang: Optional[str] = None,
+        target_lang: Optional[str] = None,
+    ) -> int:
+        """
+        估算一行文本翻译后的输出 token 数（含 [index] 标记）
+
+        Args:
+            text: 原文
+            source_lang: 源语言代码（未知时按 1:1 估算）
+            target_lang: 目标语言代码
+
+        Returns:
+            预估输出 token 数
+        """
+        source_factor = cls.LANGUAGE_TOKEN_FACTORS.get(source_lang, 1.0)
+        target_factor = cls.LANGUAGE_TOKEN_FACTORS.get(target_lang, source_factor)
+        ratio = target_factor / source_factor
+
+        return int(cls._estimate_tokens(text) * ratio) + cls.SEGMENT_MARKER_TOKENS
+
+    @classmethod
+    def output_token_budget(
+        cls,
+        source_lang: Optional[str] = None,
+        target_lang: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+    ) -> int:
+        """
+        单个翻译块允许的预估输出 token 数
+
+        Args:
+            source_lang: 源语言代码
+            target_lang: 目标语言代码
+            max_tokens: LLM 输出上限（可选，默认 settings.llm_max_tokens）
+
+        Returns:
+            输出 token 预算
+        """
+        max_tokens = max_tokens or settings.llm_max_tokens
+        scale = cls._budget_scales.get((source_lang, target_lang), 1.0)
+        return max(int(max_tokens * cls.OUTPUT_SAFETY_MARGIN * scale), 1)
+
+    @classmethod
+    def record_truncation(cls, source_lang: Optional[str], target_lang: Optional[str]) -> None:
+        """记录一次输出截断：缩小该语言对的分块预算"""
+        key = (source_lang, target_lang)
+        scale = max(
+            cls._budget_scales.get(key, 1.0) * cls.TRUNCATION_BACKOFF, cls.MIN_BUDGET_SCALE
+        )
+        cls._budget_scales[key] = scale
+        logger.warning(
+            f"Translation truncated ({source_lang}->{target_lang}), "
+            f"chunk budget scale -> {scale:.2f}"
+        )
+
+    @classmethod
+    def record_success(cls, source_lang: Optional[str], target_lang: Optional[str]) -> None:
+        """记录一次完整输出：逐步恢复该语言对的分块预算"""
+        key = (source_lang, target_lang)
+        if key in cls._budget_scales:
+            scale = min(cls._budget_scales[key] * cls.SUCCESS_RECOVERY, 1.0)
+            if scale >= 1.0:
+                del cls._budget_scales[key]
+            else:
+                cls._budget_scales[key] = scale
+
+    @classmethod
+    def chunk_segments(
+        cls,
+        segments: List[Segment],
+        source_lang: Optional[str] = None,
+        target_lang: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+    ) -> List[List[Segment]]:
         """
-        将分段列表按字符数智能分块（带重叠上下文）
+        将分段列表按 token 预算智能分块（带重叠上下文）
 
         策略：
-        1. 逐段累加字符数，超过 MAX_CHARS_PER_CHUNK 时创建新块
+        1. 逐段累加预估输出 token（按语言对换算），超过输出预算或
+           输入 token 超过 MAX_INPUT_TOKENS_PER_CHUNK 时创建新块
         2. 新块保留上一块最后 OVERLAP_SEGMENTS 个分段作为上下文
         3. 空文本分段跳过
 
         Args:
             segments: Segment 对象列表
+            source_lang: 源语言代码（可选）
+            target_lang: 目标语言代码（可选）
+            max_tokens: LLM 输出上限（可选，默认 settings.llm_max_tokens）
 
         Returns:
             分块后的 Segment 列表（二维列表）
@@ -96,9 +205,18 @@ class TranslationChunker:
         if not segments:
             raise ValueError("segments cannot be empty")
 
+        output_budget = cls.output_token_budget(source_lang, target_lang, max_tokens)
+
+        def input_cost(seg: Segment) -> int:
+            return cls._estimate_tokens(seg.original_text) + cls.SEGMENT_MARKER_TOKENS
+
+        def output_cost(seg: Segment) -> int:
+            return cls.estimate_output_tokens(seg.original_text, source_lang, target_lang)
+
         chunks = []
         current_chunk = []
-        current_chars = 0
+        current_input = 0
+        current_output = 0
 
         for segment in segments:
             # 跳过空文本
@@ -106,45 +224,57 @@ class TranslationChunker:
                 logger.debug(f"Skipping segment {segment.segment_index} with empty text")
                 continue
 
-            text_len = len(segment.original_text)
+            seg_input = input_cost(segment)
+            seg_output = output_cost(segment)
 
-            # Critical Fix 1: Warn if single segment exceeds MAX_CHARS_PER_CHUNK
-            if text_len > cls.MAX_CHARS_PER_CHUNK:
+            # 单个分段超过预算时单独成块并告警
+            if seg_output > output_budget:
                 logger.warning(
-                    f"Segment {segment.segment_index} exceeds MAX_CHARS_PER_CHUNK: "
-                    f"{text_len} chars > {cls.MAX_CHARS_PER_CHUNK}. "
-                    f"This segment will be processed alone and may cause translation issues."
+                    f"Segment {segment.segment_index} exceeds output token budget: "
+                    f"~{seg_output} tokens > {output_budget}. "
+                    f"This segment will be processed alone and may be truncated."
                 )
 
             # 检查加入当前段后是否超限
-            if current_chars + text_len > cls.MAX_CHARS_PER_CHUNK and current_chunk:
+            over_budget = (
+                current_output + seg_output > output_budget
+                or current_input + seg_input > cls.MAX_INPUT_TOKENS_PER_CHUNK
+            )
+            if over_budget and current_chunk:
                 # 当前块已满，保存并开始新块
                 chunks.append(current_chunk)
                 logger.debug(
                     f"Chunk {len(chunks)} created: {len(current_chunk)} segments, "
-                    f"{current_chars} chars"
+                    f"~{current_input} input / ~{current_output} output tokens"
                 )
 
                 # 新块从最后 OVERLAP_SEGMENTS 个分段开始（保持上下文）
                 overlap_start = max(0, len(current_chunk) - cls.OVERLAP_SEGMENTS)
                 current_chunk = current_chunk[overlap_start:]
-                current_chars = sum(len(s.original_text) for s in current_chunk)
+
+                # 重叠分段与新分段无法同时容纳时放弃重叠
+                if sum(output_cost(s) for s in current_chunk) + seg_output > output_budget:
+                    current_chunk = []
+
+                current_input = sum(input_cost(s) for s in current_chunk)
+                current_output = sum(output_cost(s) for s in current_chunk)
 
                 logger.debug(
                     f"Starting new chunk with {len(current_chunk)} overlap segments "
-                    f"({current_chars} chars)"
+                    f"(~{current_output} output tokens)"
                 )
 
             # 加入当前段
             current_chunk.append(segment)
-            current_chars += text_len
+            current_input += seg_input
+            current_output += seg_output
 
         # 添加最后一块
         if current_chunk:
             chunks.append(current_chunk)
             logger.debug(
                 f"Final chunk created: {len(current_chunk)} segments, "
-                f"{current_chars} chars"
+                f"~{current_input} input / ~{current_output} output tokens"
             )
 
         # Critical Fix 2: Validate non-empty chunks
@@ -155,6 +285,7 @@ class TranslationChunker:
         logger.info(
             f"Chunking completed: {len(segments)} segments -> {len(chunks)} chunks, "
             f"avg {len(segments) / len(chunks):.1f} segments/chunk, "
+            f"output_budget={output_budget} tokens ({source_lang}->{target_lang}), "
             f"overlap={cls.OVERLAP_SEGMENTS}"
         )
 
@@ -260,6 +391,63 @@ class TranslationChunker:
         return translation_map
 
 
+class StreamingTranslationParser:
+    """
+    流式译文解析器
+
+    累积 LLM 的增量输出，每当一行 "[index] text" 完整到达时立即产出，
+    不等待整个分块生成完毕。无 [index] 标记的行会被忽略（由缺失补译处理）。
+
+    Examples:
+        >>> parser = StreamingTranslationParser()
+        >>> parser.feed("[0] Hel")
+        []
+        >>> parser.feed("lo\\n[1] Wor")
+        [(0, 'Hello')]
+        >>> parser.close()
+        [(1, 'Wor')]
+    """
+
+    def __init__(self):
+        self._buffer = ""
+
+    def feed(self, delta: str) -> List[Tuple[int, str]]:
+        """
+        追加增量文本，返回本次新完成的分段译文
+
+        Args:
+            delta: 增量文本
+
+        Returns:
+            [(segment_index, 译文), ...]
+        """
+        self._buffer += delta
+        if "\n" not in self._buffer:
+            return []
+
+        *complete, self._buffer = self._buffer.split("\n")
+        return self._parse_lines(complete)
+
+    def close(self) -> List[Tuple[int, str]]:
+        """
+        结束解析，返回缓冲区中最后一行（仅在流正常结束时调用；截断时最后一行不完整应丢弃）
+
+        Returns:
+            [(segment_index, 译文), ...]
+        """
+        remaining, self._buffer = self._buffer, ""
+        return self._parse_lines([remaining])
+
+    @staticmethod
+    def _parse_lines(lines: List[str]) -> List[Tuple[int, str]]:
+        results = []
+        for line in lines:
+            match = TranslationChunker.SEGMENT_PATTERN.match(line.strip())
+            if match and match.group(2).strip():
+                results.append((int(match.group(1)), match.group(2).strip()))
+        return results
+
+
 # ==================== 自测代码 ====================
 
 if __name__ == "__main__":
@@ -274,7 +462,7 @@ if __name__ == "__main__":
     print("=" * 60)
 
     # ==================== 测试 1: _estimate_tokens (内部方法) ====================
-    print("\n[Test 1] _estimate_tokens (deprecated, for reference)")
+    print("\n[Test 1] _estimate_tokens")
     print("-" * 60)
 
     test_cases_tokens = [
@@ -290,8 +478,8 @@ if __name__ == "__main__":
         tokens = TranslationChunker._estimate_tokens(text)
         print(f"  {description:20s} | len={len(text):3d} | tokens≈{tokens:3d} | text: {text[:30]}")
 
-    # ==================== 测试 2: chunk_segments (字符数限制 + 重叠) ====================
-    print("\n[Test 2] chunk_segments (character-based with overlap)")
+    # ==================== 测试 2: chunk_segments (token 预算 + 重叠) ====================
+    print("\n[Test 2] chunk_segments (token-budget with overlap)")
     print("-" * 60)
 
     # 创建 Mock Segment 对象
@@ -324,12 +512,12 @@ if __name__ == "__main__":
     print("\n  Scenario 2: Long text (chunking with overlap)")
     long_segments = []
     for i in range(10):
-        # 每段约 250 字符，总共 2500 字符，需要分成 2 块（MAX_CHARS_PER_CHUNK=2000）
+        # 每段约 250 个中文字符（≈375 tokens），按 zh->en 预算需要分成多块
         text = f"这是第{i}句话。" * 50  # 约 250 字符
         long_segments.append(create_mock_segment(i, text))
 
     try:
-        chunks = TranslationChunker.chunk_segments(long_segments)
+        chunks = TranslationChunker.chunk_segments(long_segments, "zh", "en", max_tokens=1000)
         print(f"  Result: {len(chunks)} chunk(s) created")
         for i, chunk in enumerate(chunks):
             total_chars = sum(len(s.original_text) for s in chunk)
@@ -514,7 +702,7 @@ if __name__ == "__main__":
 
     oversized_segments = [
         create_mock_segment(0, "Regular text"),
-        create_mock_segment(1, "X" * 2500),  # Exceeds MAX_CHARS_PER_CHUNK (2000)
+        create_mock_segment(1, "X" * 20000),  # Exceeds output token budget
         create_mock_segment(2, "Another regular text"),
     ]
 
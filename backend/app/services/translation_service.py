@@ -0,0 +1,302 @@
+"""
+分段翻译服务
+按 token 预算分块翻译，失败只在局部恢复（二分失败块、补译缺失索引），
+不影响已完成的翻译
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from loguru import logger
+
+from app.config import settings
+from app.integrations.dashscope import LLMClient
+from app.integrations.dashscope.llm_client import TranslationTruncatedError
+from app.models.segment import Segment
+
+from .translation_chunker import StreamingTranslationParser, TranslationChunker
+
+# 分段译文就绪回调：(segment_index, 译文)
+SegmentCallback = Callable[[int, str], Awaitable[None]]
+
+
+class TranslationService:
+    """分段翻译服务（分块 + 局部失败恢复）"""
+
+    MISSING_BATCH_SIZE = 8  # 补译缺失索引时每批的分段数
+
+    def __init__(
+        self,
+        source_lang: str,
+        target_lang: str,
+        llm_client: Optional[LLMClient] = None,
+        on_segment: Optional[SegmentCallback] = None,
+        stream: Optional[bool] = None,
+        concurrency: Optional[int] = None,
+    ):
+        """
+        初始化翻译服务
+
+        Args:
+            source_lang: 源语言代码
+            target_lang: 目标语言代码
+            llm_client: LLM 客户端（可选，默认新建）
+            on_segment: 分段译文首次就绪时的回调（可选），每个分段只回调一次
+            stream: 是否使用流式翻译（可选，默认 settings.llm_stream_translation）
+            concurrency: 并发翻译的分块数（可选，默认 settings.llm_translation_concurrency）
+        """
+        self.source_lang = source_lang
+        self.target_lang = target_lang
+        self.llm = llm_client or LLMClient()
+        self.on_segment = on_segment
+        self.stream = settings.llm_stream_translation if stream is None else stream
+        self.concurrency = max(concurrency or settings.llm_translation_concurrency, 1)
+        self._emitted: Dict[int, str] = {}  # 已回调的分段译文
+
+    async def translate_segments(self, segments: List[Segment]) -> Dict[int, str]:
+        """
+        翻译分段列表
+
+        流程：
+        1. 按 token 预算分块，各块并发翻译（受 concurrency 限制）
+        2. 失败或截断的块二分后重试，只有单个分段仍失败时才放弃该分段
+        3. 结果中缺失的索引按小批次补译，仍缺失的再逐段翻译
+
+        Args:
+            segments: Segment 对象列表
+
+        Returns:
+            segment_index -> 译文 映射；无法翻译的分段不在结果中，由调用方决定降级方式
+        """
+        chunks = TranslationChunker.chunk_segments(
+            segments, self.source_lang, self.target_lang
+        )
+        logger.info(
+            f"Translating {len(segments)} segments in {len(chunks)} chunks "
+            f"({self.source_lang} -> {self.target_lang})"
+        )
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def translate_one(chunk_idx: int, chunk: List[Segment]) -> Dict[int, str]:
+            async with semaphore:
+                chunk_translations = await self._translate_chunk(chunk)
+            logger.info(
+                f"Chunk {chunk_idx}/{len(chunks)}: "
+                f"{len(chunk_translations)}/{len(chunk)} segments translated"
+            )
+            return chunk_translations
+
+        # 各块并发翻译，按块顺序合并
+        results = await asyncio.gather(
+            *(translate_one(i, chunk) for i, chunk in enumerate(chunks, start=1))
+        )
+
+        translations: Dict[int, str] = {}
+        for chunk_translations in results:
+            # 重叠分段使用后一块的版本（上下文更完整）；已回调过的分段保持回调时的译文
+            for idx, text in chunk_translations.items():
+                translations[idx] = self._emitted.get(idx, text)
+
+        missing = [
+            seg for seg in segments
+            if seg.original_text and seg.segment_index not in translations
+        ]
+        if missing:
+            translations.update(await self._recover_missing(missing))
+
+        return translations
+
+    async def _translate_chunk(self, chunk: List[Segment]) -> Dict[int, str]:
+        """
+        翻译单个块，失败时二分递归
+
+        Args:
+            chunk: 分段列表
+
+        Returns:
+            该块内分段的译文映射（只接受块内索引）
+        """
+        if self.stream:
+            return await self._translate_chunk_stream(chunk)
+
+        own_indices = {seg.segment_index for seg in chunk}
+
+        try:
+            translated = await self.llm.translate_async(
+                text=TranslationChunker.build_chunk_text(chunk),
+                source_lang=self.source_lang,
+                target_lang=self.target_lang,
+            )
+            parsed = TranslationChunker.parse_translation_result(translated)
+
+        except TranslationTruncatedError:
+            TranslationChunker.record_truncation(self.source_lang, self.target_lang)
+            if len(chunk) <= 1:
+                logger.error(
+                    f"Segment {chunk[0].segment_index} truncated even when translated alone"
+                )
+                return {}
+            sub_chunks = TranslationChunker.chunk_segments(
+                chunk, self.source_lang, self.target_lang
+            )
+            if len(sub_chunks) <= 1:
+                sub_chunks = self._bisect(chunk)
+            logger.info(f"Chunk truncated, re-split into {len(sub_chunks)} chunks")
+            return await self._translate_sub_chunks(sub_chunks)
+
+        except Exception as e:
+            if len(chunk) <= 1:
+                logger.error(f"Segment {chunk[0].segment_index} translation failed: {e}")
+                return {}
+            logger.warning(
+                f"Chunk translation failed ({len(chunk)} segments): {e}, bisecting"
+            )
+            return await self._translate_sub_chunks(self._bisect(chunk))
+
+        TranslationChunker.record_success(self.source_lang, self.target_lang)
+
+        # 只接受本块的索引：LLM 编造或错位的索引直接丢弃，按缺失处理
+        result = {idx: text for idx, text in parsed.items() if idx in own_indices and text}
+        foreign = set(parsed) - own_indices
+        if foreign:
+            logger.warning(f"Dropped {len(foreign)} translations with unexpected indices")
+
+        for idx, text in result.items():
+            await self._emit(idx, text)
+
+        return result
+
+    async def _translate_chunk_stream(self, chunk: List[Segment]) -> Dict[int, str]:
+        """
+        流式翻译单个块：每行译文完整到达即回调
+
+        失败或截断时保留已收到的行，只对剩余分段拆分重译。
+
+        Args:
+            chunk: 分段列表
+
+        Returns:
+            该块内分段的译文映射（只接受块内索引）
+        """
+        own_indices = {seg.segment_index for seg in chunk}
+        received: Dict[int, str] = {}
+        parser = StreamingTranslationParser()
+
+        async def accept(lines):
+            for idx, text in lines:
+                if idx in own_indices and idx not in received:
+                    received[idx] = text
+                    await self._emit(idx, text)
+
+        try:
+            async for delta in self.llm.translate_stream_async(
+                text=TranslationChunker.build_chunk_text(chunk),
+                source_lang=self.source_lang,
+                target_lang=self.target_lang,
+            ):
+                await accept(parser.feed(delta))
+            await accept(parser.close())
+
+        except TranslationTruncatedError:
+            TranslationChunker.record_truncation(self.source_lang, self.target_lang)
+            remaining = [seg for seg in chunk if seg.segment_index not in received]
+            if not remaining:
+                return received
+            if len(remaining) == 1 and len(chunk) == 1:
+                logger.error(
+                    f"Segment {chunk[0].segment_index} truncated even when translated alone"
+                )
+                return received
+            sub_chunks = TranslationChunker.chunk_segments(
+                remaining, self.source_lang, self.target_lang
+            )
+            if len(sub_chunks) <= 1 and len(remaining) == len(chunk):
+                sub_chunks = self._bisect(remaining)
+            logger.info(
+                f"Stream truncated after {len(received)}/{len(chunk)} segments, "
+                f"re-translating the rest in {len(sub_chunks)} chunks"
+            )
+            received.update(await self._translate_sub_chunks(sub_chunks))
+            return received
+
+        except Exception as e:
+            remaining = [seg for seg in chunk if seg.segment_index not in received]
+            if not remaining:
+                return received
+            if len(chunk) <= 1:
+                logger.error(f"Segment {chunk[0].segment_index} translation failed: {e}")
+                return received
+            logger.warning(
+                f"Stream failed after {len(received)}/{len(chunk)} segments: {e}, "
+                f"retrying the remaining {len(remaining)}"
+            )
+            sub_chunks = [remaining] if len(remaining) < len(chunk) else self._bisect(remaining)
+            received.update(await self._translate_sub_chunks(sub_chunks))
+            return received
+
+        TranslationChunker.record_success(self.source_lang, self.target_lang)
+
+        return received
+
+    async def _translate_sub_chunks(self, sub_chunks: List[List[Segment]]) -> Dict[int, str]:
+        """依次翻译拆分后的子块"""
+        result: Dict[int, str] = {}
+        for sub_chunk in sub_chunks:
+            result.update(await self._translate_chunk(sub_chunk))
+        return result
+
+    async def _recover_missing(self, missing: List[Segment]) -> Dict[int, str]:
+        """
+        补译缺失的分段
+
+        先按 MISSING_BATCH_SIZE 小批次重发，仍缺失的分段逐段翻译（不带索引标记）
+
+        Args:
+            missing: 缺失译文的分段列表
+
+        Returns:
+            补译成功的译文映射
+        """
+        logger.warning(
+            f"Recovering {len(missing)} missing translations: "
+            f"indices={[seg.segment_index for seg in missing]}"
+        )
+
+        recovered: Dict[int, str] = {}
+        for start in range(0, len(missing), self.MISSING_BATCH_SIZE):
+            batch = missing[start:start + self.MISSING_BATCH_SIZE]
+            recovered.update(await self._translate_chunk(batch))
+
+        for seg in missing:
+            if seg.segment_index in recovered:
+                continue
+            try:
+                translated = await self.llm.translate_async(
+                    text=seg.original_text,
+                    source_lang=self.source_lang,
+                    target_lang=self.target_lang,
+                )
+            except Exception as e:
+                logger.error(f"Segment {seg.segment_index} translation failed: {e}")
+                continue
+            if translated:
+                recovered[seg.segment_index] = translated
+                await self._emit(seg.segment_index, translated)
+
+        logger.info(f"Recovered {len(recovered)}/{len(missing)} missing translations")
+
+        return recovered
+
+    async def _emit(self, segment_index: int, text: str) -> None:
+        """首次得到分段译文时触发回调（没有回调时不记录，重叠分段仍使用后一块的版本）"""
+        if not self.on_segment or segment_index in self._emitted:
+            return
+        self._emitted[segment_index] = text
+        await self.on_segment(segment_index, text)
+
+    @staticmethod
+    def _bisect(chunk: List[Segment]) -> List[List[Segment]]:
+        """将分块一分为二"""
+        mid = len(chunk) // 2
+        return [chunk[:mid], chunk[mid:]]
@@ -2,6 +2,9 @@
 工具函数模块
 """
 
+from .async_runner import run_async
+from .audio_duration import audio_bytes_duration_ms
 from .ffmpeg import FFmpegHelper
+from .media_info import AudioStreamInfo, MediaInfo
 
-__all__ = ["FFmpegHelper"]
+__all__ = ["FFmpegHelper", "MediaInfo", "AudioStreamInfo", "audio_bytes_duration_ms", "run_async"]
@@ -0,0 +1,31 @@
+"""
+同步代码中执行异步协程
+Celery 任务和线程池中的批处理复用长期存在的事件循环，而不是每次 asyncio.run 新建再关闭
+"""
+
+import asyncio
+import threading
+
+_thread_local = threading.local()
+
+
+def run_async(coro):
+    """
+    在当前线程复用事件循环执行协程
+
+    每个线程保留一个长期事件循环（Celery prefork worker 进程只有一个执行线程，
+    即每个进程一个循环）。按事件循环共享的资源（如 LLM 的 httpx 连接池）跨调用复用，
+    不会因为事件循环被关闭而遗留未关闭的连接池。
+
+    Args:
+        coro: 协程对象
+
+    Returns:
+        协程的返回值
+    """
+    loop = getattr(_thread_local, "loop", None)
+    if loop is None or loop.is_closed():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        _thread_local.loop = loop
+    return loop.run_until_complete(coro)
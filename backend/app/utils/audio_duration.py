@@ -0,0 +1,175 @@
+"""
+音频时长计算
+直接从内存中的音频字节（MP3 / WAV / 裸 PCM）计算时长，无需落盘和 ffprobe
+"""
+
+import struct
+from typing import Optional
+
+from loguru import logger
+
+# MPEG 音频帧头查表
+# 比特率（kbps），按 [版本类别][层] 索引：版本类别 0=MPEG1，1=MPEG2/2.5
+_MP3_BITRATES = {
+    (0, 1): [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+    (0, 2): [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+    (0, 3): [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    (1, 1): [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+    (1, 2): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    (1, 3): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+# 采样率（Hz），按版本位索引：3=MPEG1，2=MPEG2，0=MPEG2.5
+_MP3_SAMPLE_RATES = {
+    3: [44100, 48000, 32000],
+    2: [22050, 24000, 16000],
+    0: [11025, 12000, 8000],
+}
+
+
+def audio_bytes_duration_ms(
+    data: bytes,
+    pcm_sample_rate: int = 24000,
+    pcm_channels: int = 1,
+    pcm_sample_width: int = 2,
+) -> Optional[int]:
+    """
+    计算音频字节的时长
+
+    按文件头识别格式：RIFF 为 WAV，ID3 标签或 MPEG 帧同步字为 MP3，其余按裸 PCM 计算。
+
+    Args:
+        data: 音频数据
+        pcm_sample_rate: 裸 PCM 的采样率
+        pcm_channels: 裸 PCM 的声道数
+        pcm_sample_width: 裸 PCM 的采样字节数
+
+    Returns:
+        时长（毫秒）；无法解析时返回 None（调用方应回退到 ffprobe 实测）
+    """
+    if not data:
+        return None
+
+    try:
+        if data[:4] == b"RIFF" and data[8:12] == b"WAVE":
+            return _wav_duration_ms(data)
+        if data[:3] == b"ID3" or (len(data) > 1 and data[0] == 0xFF and data[1] & 0xE0 == 0xE0):
+            return _mp3_duration_ms(data)
+        return int(len(data) / (pcm_sample_rate * pcm_channels * pcm_sample_width) * 1000)
+    except (struct.error, IndexError, ValueError) as e:
+        logger.warning(f"Failed to parse audio duration from bytes: {e}")
+        return None
+
+
+def _wav_duration_ms(data: bytes) -> Optional[int]:
+    """遍历 RIFF 块，按 fmt 块的字节率和 data 块大小计算时长"""
+    offset = 12
+    byte_rate = None
+    while offset + 8 <= len(data):
+        chunk_id = data[offset:offset + 4]
+        chunk_size = struct.unpack_from("<I", data, offset + 4)[0]
+        if chunk_id == b"fmt ":
+            byte_rate = struct.unpack_from("<I", data, offset + 16)[0]
+        elif chunk_id == b"data" and byte_rate:
+            # 流式写出的 WAV 可能把 data 大小写成 0 或 0xFFFFFFFF，以实际剩余字节为准
+            available = len(data) - offset - 8
+            size = chunk_size if 0 < chunk_size <= available else available
+            return int(size / byte_rate * 1000)
+        offset += 8 + chunk_size + (chunk_size & 1)
+    return None
+
+
+def _mp3_duration_ms(data: bytes) -> Optional[int]:
+    """逐帧解析 MPEG 音频帧头累加时长（兼容 CBR 与 VBR）"""
+    offset = 0
+    if data[:3] == b"ID3":
+        # ID3v2 标签大小为 4 字节 syncsafe 整数
+        size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+        offset = 10 + size + (10 if data[5] & 0x10 else 0)
+
+    total_samples = 0.0
+    sample_rate = None
+    frames = 0
+    while offset + 4 <= len(data):
+        header = struct.unpack_from(">I", data, offset)[0]
+        if header & 0xFFE00000 != 0xFFE00000:
+            # 失步（如尾部 ID3v1 标签）：向后搜索下一个同步字
+            offset += 1
+            continue
+
+        version_bits = (header >> 19) & 0x3
+        layer_bits = (header >> 17) & 0x3
+        bitrate_index = (header >> 12) & 0xF
+        sample_rate_index = (header >> 10) & 0x3
+        padding = (header >> 9) & 0x1
+
+        if version_bits == 1 or layer_bits == 0 or bitrate_index in (0, 15) or sample_rate_index == 3:
+            offset += 1
+            continue
+
+        layer = 4 - layer_bits
+        version_class = 0 if version_bits == 3 else 1
+        bitrate = _MP3_BITRATES[(version_class, layer)][bitrate_index] * 1000
+        sample_rate = _MP3_SAMPLE_RATES[version_bits][sample_rate_index]
+
+        if layer == 1:
+            samples = 384
+            frame_length = (12 * bitrate // sample_rate + padding) * 4
+        elif layer == 3 and version_class == 1:
+            samples = 576
+            frame_length = 72 * bitrate // sample_rate + padding
+        else:
+            samples = 1152
+            frame_length = 144 * bitrate // sample_rate + padding
+
+        if frames == 0:
+            # 首帧可能是 Xing/Info 元数据帧：直接给出总帧数和编码器延迟/填充
+            mono = (header >> 6) & 0x3 == 3
+            side_info = (17 if mono else 32) if version_class == 0 else (9 if mono else 17)
+            exact = _xing_samples(data, offset + 4 + side_info, samples)
+            if exact is not None:
+                return int(exact / sample_rate * 1000)
+
+        total_samples += samples
+        frames += 1
+        offset += frame_length
+
+    if not frames or not sample_rate:
+        return None
+
+    return int(total_samples / sample_rate * 1000)
+
+
+def _xing_samples(data: bytes, offset: int, samples_per_frame: int) -> Optional[int]:
+    """
+    解析 Xing/Info 标签
+
+    Returns:
+        有效采样数（总帧数 × 每帧采样数 - LAME 编码延迟与填充）；无标签或无帧数时返回 None
+    """
+    tag = data[offset:offset + 4]
+    if tag not in (b"Xing", b"Info"):
+        return None
+
+    flags = struct.unpack_from(">I", data, offset + 4)[0]
+    if not flags & 0x1:
+        return None
+    frame_count = struct.unpack_from(">I", data, offset + 8)[0]
+
+    # 跳过可选字段（字节数 / TOC / 质量），定位 LAME 扩展标签
+    lame_offset = offset + 8 + 4
+    if flags & 0x2:
+        lame_offset += 4
+    if flags & 0x4:
+        lame_offset += 100
+    if flags & 0x8:
+        lame_offset += 4
+
+    gap = 0
+    if data[lame_offset:lame_offset + 4] in (b"LAME", b"Lavc"):
+        delay_padding = data[lame_offset + 21:lame_offset + 24]
+        if len(delay_padding) == 3:
+            delay = (delay_padding[0] << 4) | (delay_padding[1] >> 4)
+            padding = ((delay_padding[1] & 0x0F) << 8) | delay_padding[2]
+            gap = delay + padding
+
+    return max(frame_count * samples_per_frame - gap, 0)
@@ -3,14 +3,61 @@ FFmpeg 工具类
 视频/音频处理 + 字幕生成
 """
 
+import json
+import os
 import re
 import subprocess
 import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import BinaryIO, Callable, Optional
 
 from loguru import logger
 
+from .hls import playlist_files
+from .media_info import MediaInfo
+from .video_split import ass_event_intervals, plan_smart_render, plan_split_points, shift_ass_events
+
+# 关键帧间隔估算只读取开头的若干秒
+KEYFRAME_PROBE_SECONDS = 30
+
+# 远程输入（HTTP Range 读取）断线重连参数
+HTTP_INPUT_OPTIONS = [
+    "-reconnect", "1",
+    "-reconnect_on_network_error", "1",
+    "-reconnect_delay_max", "10",
+]
+
+# 可以可靠地通过 HTTP Range 读取的容器（其余格式先完整下载再处理）
+URL_FRIENDLY_CONTAINERS = {".mp4", ".m4v", ".mov", ".mkv", ".webm"}
+
+# 混音输出的音频编码参数（按扩展名，未列出的格式使用 FFmpeg 默认编码器）
+AUDIO_OUTPUT_CODECS = {
+    ".m4a": ["-c:a", "aac", "-b:a", "192k", "-movflags", "+faststart"],
+    ".opus": ["-c:a", "libopus", "-b:a", "96k"],
+}
+
+# ffprobe 的 H.264 档次名称 -> libx264 -profile:v 参数
+H264_PROFILES = {
+    "constrained baseline": "baseline",
+    "baseline": "baseline",
+    "main": "main",
+    "high": "high",
+    "high 10": "high10",
+    "high 4:2:2": "high422",
+    "high 4:4:4 predictive": "high444",
+}
+
+# 探测结果缓存（按文件路径 + 大小 + 修改时间），超出容量时淘汰最早的条目
+PROBE_CACHE_SIZE = 64
+_probe_cache: dict[tuple, MediaInfo] = {}
+
+
+def is_url(path: str) -> bool:
+    """是否为 HTTP(S) URL"""
+    return path.startswith(("http://", "https://"))
+
 
 class FFmpegHelper:
     """FFmpeg 工具类"""
@@ -35,15 +82,17 @@ class FFmpegHelper:
         output_path: Optional[str] = None,
         sample_rate: int = 16000,
         channels: int = 1,
+        duration_ms: Optional[int] = None,
     ) -> str:
         """
-        从视频中提取音频
+        从视频中提取音频（第一条音频流）
 
         Args:
-            video_path: 视频文件路径
-            output_path: 输出音频路径（可选，默认自动生成）
+            video_path: 视频文件路径或 HTTP(S) URL（如 OSS 签名 URL，FFmpeg 按需 Range 读取）
+            output_path: 输出音频路径（可选，默认自动生成；输入为 URL 时必须指定）
             sample_rate: 采样率（Hz）
             channels: 声道数（1=单声道，2=立体声）
+            duration_ms: 只提取开头的这段时长（可选，毫秒；输入为 URL 时只读取对应的字节范围）
 
         Returns:
             输出音频文件路径
@@ -56,12 +105,18 @@ class FFmpegHelper:
                 Path(video_path).parent / f"{Path(video_path).stem}_audio.wav"
             )
 
-        logger.info(f"Extracting audio: {video_path} -> {output_path}")
+        if is_url(video_path):
+            logger.info("Extracting audio from remote URL (no local video copy)")
+        else:
+            logger.info(f"Extracting audio: {video_path} -> {output_path}")
 
         cmd = [
             "ffmpeg",
+            *(HTTP_INPUT_OPTIONS if is_url(video_path) else []),
             "-i",
             video_path,
+            "-map",
+            "0:a:0",  # 只读取第一条音频流
             "-vn",  # 不处理视频
             "-acodec",
             "pcm_s16le",  # PCM 16-bit
@@ -69,6 +124,7 @@ class FFmpegHelper:
             str(sample_rate),  # 采样率
             "-ac",
             str(channels),  # 声道数
+            *(["-t", f"{duration_ms / 1000}"] if duration_ms else []),
             "-y",  # 覆盖输出文件
             output_path,
         ]
@@ -81,29 +137,42 @@ class FFmpegHelper:
             return output_path
         except subprocess.CalledProcessError as e:
             logger.error(f"FFmpeg extraction failed: {e.stderr.decode()}")
-            raise RuntimeError(f"Audio extraction failed: {e.stderr.decode()}")
+            raise RuntimeError(f"Audio extraction failed: {e.stderr.decode()}") from e
 
-    def get_duration_ms(self, media_path: str) -> int:
+    def probe(self, media_path: str) -> MediaInfo:
         """
-        获取媒体文件时长（毫秒）
+        探测媒体文件信息（单次 ffprobe，按文件缓存）
+
+        一次 ffprobe 同时读取 format、全部流和开头片段的视频包标记（用于估算关键帧间隔）。
+        结果按 (路径, 大小, 修改时间) 缓存在进程内存中，同一文件的后续查询不再启动 ffprobe。
 
         Args:
             media_path: 媒体文件路径
 
         Returns:
-            时长（毫秒）
+            MediaInfo
 
         Raises:
             RuntimeError: FFprobe 执行失败
         """
+        cache_key = None
+        if not is_url(media_path):
+            # 远程 URL（签名参数每次不同）不缓存
+            stat = os.stat(media_path)
+            cache_key = (os.path.realpath(media_path), stat.st_size, stat.st_mtime_ns)
+            cached = _probe_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
         cmd = [
             "ffprobe",
-            "-v",
-            "error",
-            "-show_entries",
-            "format=duration",
-            "-of",
-            "default=noprint_wrappers=1:nokey=1",
+            "-v", "error",
+            *(HTTP_INPUT_OPTIONS if is_url(media_path) else []),
+            "-print_format", "json",
+            "-show_format",
+            "-show_streams",
+            "-show_entries", "packet=stream_index,pts_time,flags",
+            "-read_intervals", f"%+{KEYFRAME_PROBE_SECONDS}",
             media_path,
         ]
 
@@ -111,24 +180,43 @@ class FFmpegHelper:
             result = subprocess.run(
                 cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE
             )
-            duration_sec = float(result.stdout.decode().strip())
-            duration_ms = int(duration_sec * 1000)
-            logger.info(f"Media duration: {duration_ms}ms ({media_path})")
-            return duration_ms
+            info = MediaInfo.from_ffprobe(json.loads(result.stdout.decode() or "{}"))
         except subprocess.CalledProcessError as e:
             logger.error(f"FFprobe failed: {e.stderr.decode()}")
-            raise RuntimeError(f"Failed to get duration: {e.stderr.decode()}")
+            raise RuntimeError(f"Failed to probe media: {e.stderr.decode()}") from e
+
+        logger.info(
+            f"Media probed: {media_path} duration={info.duration_ms}ms "
+            f"video={info.video_codec} {info.width}x{info.height} "
+            f"audio_streams={len(info.audio_streams)} keyframe_interval={info.keyframe_interval_s}s"
+        )
+
+        if cache_key is not None:
+            if len(_probe_cache) >= PROBE_CACHE_SIZE:
+                _probe_cache.pop(next(iter(_probe_cache)))
+            _probe_cache[cache_key] = info
+
+        return info
+
+    def get_duration_ms(self, media_path: str) -> int:
+        """
+        获取媒体文件时长（毫秒）
+
+        Args:
+            media_path: 媒体文件路径
+
+        Returns:
+            时长（毫秒）
+
+        Raises:
+            RuntimeError: FFprobe 执行失败
+        """
+        return self.probe(media_path).duration_ms
 
     def get_audio_duration_ms(self, audio_path: str) -> int:
         """获取音频文件时长（毫秒）"""
-        cmd = [
-            "ffprobe", "-v", "error", "-show_entries", "format=duration",
-            "-of", "default=noprint_wrappers=1:nokey=1", audio_path
-        ]
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            duration_sec = float(result.stdout.strip())
-            return int(duration_sec * 1000)
+            return self.probe(audio_path).duration_ms
         except Exception as e:
             logger.warning(f"Failed to get audio duration: {e}")
             return 0
@@ -234,26 +322,36 @@ class FFmpegHelper:
         segments: list[dict],
         output_path: Optional[str] = None,
         total_duration_ms: Optional[int] = None,
+        check_margin: float = 0.85,
+        max_lead_ms: int = 200,
+        max_lag_ms: int = 600,
+        max_speed: float = 4.0,
     ) -> str:
         """
-        合并多个音频分段（按时间轴，智能加速避免重叠）
+        合并多个音频分段（全局时间轴求解 + 单次 FFmpeg 混音）
 
         Args:
             segments: 分段列表，每个元素包含:
                 - path: 音频文件路径
                 - start_ms: 开始时间（毫秒）
                 - end_ms: 结束时间（毫秒）（原始分段结束时间，仅供参考）
-            output_path: 输出音频路径（可选）
+                - duration_ms: 音频实际时长（可选，提供时不再实测）
+                - estimated_ms: 合成前估算的音频时长（可选）
+            output_path: 输出音频路径（可选，默认 MP3；按扩展名选择编码，见 AUDIO_OUTPUT_CODECS）
             total_duration_ms: 目标总时长（可选，用于补齐/静音）
+            check_margin: 估算时长不超过可用时长的该比例时，视为不会超时，跳过 ffprobe 实测
+            max_lead_ms: 片段允许提前的最大偏移（毫秒）
+            max_lag_ms: 片段允许推迟的最大偏移（毫秒）
+            max_speed: 最大加速倍数
 
         Returns:
             输出音频文件路径
 
         策略：
-            1. 按 start_ms 排序
-            2. 计算每个分段的最大可用时长（到下一个分段开始或视频结束）
-            3. 如果 TTS 音频超过可用时长，加速使其刚好填满
-            4. 如果不超过，保持原样
+            1. 按 start_ms 排序，确定每个分段的音频时长（已知 / 估算 / 实测）
+            2. solve_timeline 在允许的偏移范围内整体安排起点，把压缩分摊到相邻空隙，
+               使最大加速倍数最低；多数分段保持原速
+            3. 所有分段的 atempo/atrim/adelay 在同一个滤镜图中完成，一次 FFmpeg 调用输出
         """
         if not segments:
             raise ValueError("No segments provided")
@@ -266,109 +364,432 @@ class FFmpegHelper:
         if total_duration_ms is None:
             total_duration_ms = max(seg.get("end_ms", 0) for seg in segments)
 
+        sorted_segments, placements = self._plan_mix(
+            segments, total_duration_ms, check_margin, max_lead_ms, max_lag_ms, max_speed
+        )
+        inputs, filters = self._mix_filter_graph(sorted_segments, placements, total_duration_ms)
+
+        cmd = [
+            "ffmpeg", "-y",
+            *inputs,
+            "-filter_complex", ";".join(filters),
+            "-map", "[mixed]",
+            *AUDIO_OUTPUT_CODECS.get(Path(output_path).suffix.lower(), []),
+            "-t", f"{total_duration_ms/1000}",
+            output_path,
+        ]
+
+        try:
+            subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            logger.info(f"Audio segments merged (timeline solver, single pass): {output_path}")
+        except subprocess.CalledProcessError as e:
+            logger.error(f"FFmpeg merge failed: {e.stderr.decode()}")
+            raise RuntimeError(f"Audio merge failed: {e.stderr.decode()}") from e
+
+        return output_path
+
+    def mux_dubbed_video(
+        self,
+        video_path: str,
+        segments: list[dict],
+        output_path: str,
+        total_duration_ms: int,
+        subtitle_path: Optional[str] = None,
+        soft_subtitle_path: Optional[str] = None,
+        check_margin: float = 0.85,
+        max_lead_ms: int = 200,
+        max_lag_ms: int = 600,
+        max_speed: float = 4.0,
+        stream_to: Optional[Callable[[BinaryIO], str]] = None,
+        hls_segment_seconds: float = 6.0,
+        on_hls_update: Optional[Callable[[list[str], str], None]] = None,
+    ) -> str:
+        """
+        一次 FFmpeg 调用完成配音混音和最终封装
+
+        配音分段直接作为输入送入最终的 FFmpeg，混音滤镜图的输出编码一次为 AAC，
+        不再先生成中间 MP3 再解码重编码（少一次有损编码和一次完整的时间轴处理）。
+        无字幕烧录时视频流直接复制；烧录模式在同一滤镜图中叠加 ASS 字幕。
+
+        Args:
+            video_path: 原视频文件路径或 HTTP(S) URL（如预览任务的签名 URL）
+            segments: 配音分段（格式同 merge_audio_segments）
+            output_path: 输出视频路径
+            total_duration_ms: 视频总时长（毫秒）
+            subtitle_path: ASS 字幕文件路径（可选，提供时烧录字幕）
+            soft_subtitle_path: ASS 字幕文件路径（可选，提供时作为软字幕轨道封装）
+            check_margin: 同 merge_audio_segments
+            max_lead_ms: 同 merge_audio_segments
+            max_lag_ms: 同 merge_audio_segments
+            max_speed: 同 merge_audio_segments
+            stream_to: 流式消费者（可选）。提供时 FFmpeg 以分片 MP4 写到标准输出，
+                由 stream_to 边读边处理（如分片上传 OSS），不落地 output_path
+            hls_segment_seconds: HLS 分片时长（秒，output_path 为 .m3u8 时生效）
+            on_hls_update: HLS 播放列表更新回调（可选），参数为 (新完成的分片路径, 播放列表路径)，
+                编码过程中每产生新分片调用一次，结束时再调用一次（播放列表含 ENDLIST）
+
+        Returns:
+            输出视频文件路径；提供 stream_to 时返回其返回值
+
+        Raises:
+            RuntimeError: FFmpeg 执行失败
+        """
+        if not segments:
+            raise ValueError("No segments provided")
+
+        logger.info(
+            f"Muxing dubbed video in one pass: video={video_path}, "
+            f"{len(segments)} audio segments, burn_subtitles={subtitle_path is not None}"
+        )
+
+        sorted_segments, placements = self._plan_mix(
+            segments, total_duration_ms, check_margin, max_lead_ms, max_lag_ms, max_speed
+        )
+        # 输入 0 为原视频，配音分段从输入 1 开始
+        inputs, filters = self._mix_filter_graph(
+            sorted_segments, placements, total_duration_ms, input_offset=1
+        )
+
+        is_hls = Path(output_path).suffix.lower() == ".m3u8"
+
+        if subtitle_path:
+            escaped_subtitle = self._escape_filter_path(subtitle_path)
+            filters.append(f"[0:v:0]ass='{escaped_subtitle}'[video]")
+            video_args = [
+                "-map", "[video]",
+                "-c:v", "libx264",
+                "-preset", "medium",
+                "-crf", "23",
+            ]
+            if is_hls:
+                # HLS 分片只能在关键帧处切分：按分片时长强制插入关键帧
+                video_args.extend([
+                    "-force_key_frames", f"expr:gte(t,n_forced*{hls_segment_seconds})",
+                ])
+        else:
+            video_args = ["-map", "0:v:0", "-c:v", "copy"]
+
+        subtitle_args = []
+        if soft_subtitle_path and is_hls:
+            logger.warning("Soft subtitle track is not supported in HLS output, skipped")
+        elif soft_subtitle_path:
+            inputs.extend(["-i", soft_subtitle_path])
+            subtitle_args = self._soft_subtitle_args(output_path, len(sorted_segments) + 1)
+
+        cmd = [
+            "ffmpeg", "-y",
+            *(HTTP_INPUT_OPTIONS if is_url(video_path) else []),
+            "-i", video_path,
+            *inputs,
+            "-filter_complex", ";".join(filters),
+            *video_args,
+            "-map", "[mixed]",
+            "-c:a", "aac",
+            "-b:a", "192k",
+            *subtitle_args,
+            "-t", f"{total_duration_ms/1000}",
+        ]
+
+        if stream_to is not None:
+            # 分片 MP4 不需要回写 moov，可以直接写入不可 seek 的管道
+            cmd.extend([
+                "-movflags", "frag_keyframe+empty_moov+default_base_moof",
+                "-f", "mp4",
+                "pipe:1",
+            ])
+            return self._run_streaming(cmd, stream_to)
+
+        if is_hls:
+            # fMP4 分片（CMAF）的 HLS：播放列表为 EVENT 类型，编码过程中即可开始播放
+            hls_dir = Path(output_path).parent
+            hls_dir.mkdir(parents=True, exist_ok=True)
+            cmd.extend([
+                "-f", "hls",
+                "-hls_time", f"{hls_segment_seconds}",
+                "-hls_playlist_type", "event",
+                "-hls_segment_type", "fmp4",
+                "-hls_fmp4_init_filename", "init.mp4",
+                "-hls_segment_filename", str(hls_dir / "seg_%05d.m4s"),
+                "-hls_flags", "independent_segments+temp_file",
+                output_path,
+            ])
+            return self._run_hls(cmd, output_path, on_hls_update)
+
+        cmd.append(output_path)
+
+        try:
+            subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            logger.info(f"Dubbed video muxed (single pass): {output_path}")
+            return output_path
+        except subprocess.CalledProcessError as e:
+            logger.error(f"Single-pass mux failed: {e.stderr.decode()}")
+            raise RuntimeError(f"Single-pass mux failed: {e.stderr.decode()}") from e
+
+    @staticmethod
+    def _run_streaming(cmd: list[str], consumer: Callable[[BinaryIO], str]) -> str:
+        """
+        运行输出到标准输出的 FFmpeg 命令，并把输出流交给 consumer 消费
+
+        stderr 写入临时文件（避免管道写满导致 FFmpeg 阻塞）；
+        consumer 异常时终止 FFmpeg，FFmpeg 失败时即使 consumer 已完成也抛出异常。
+
+        Args:
+            cmd: FFmpeg 命令（输出为 pipe:1）
+            consumer: 流消费者
+
+        Returns:
+            consumer 的返回值
+
+        Raises:
+            RuntimeError: FFmpeg 执行失败
+        """
+        with tempfile.TemporaryFile() as stderr_file:
+            process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr_file)
+            try:
+                result = consumer(process.stdout)
+                # 消费者提前返回时读完剩余输出，避免 FFmpeg 阻塞在写管道上
+                while process.stdout.read(1024 * 1024):
+                    pass
+            except BaseException:
+                process.kill()
+                process.wait()
+                raise
+            finally:
+                process.stdout.close()
+
+            returncode = process.wait()
+            if returncode != 0:
+                stderr_file.seek(0)
+                stderr = stderr_file.read().decode(errors="replace")
+                logger.error(f"Streaming mux failed: {stderr}")
+                raise RuntimeError(f"Streaming mux failed: {stderr}")
+
+        logger.info(f"Dubbed video muxed (streamed): {result}")
+        return result
+
+    @staticmethod
+    def _run_hls(
+        cmd: list[str],
+        playlist_path: str,
+        on_update: Optional[Callable[[list[str], str], None]],
+        poll_interval: float = 0.5,
+    ) -> str:
+        """
+        运行输出 HLS 的 FFmpeg 命令，轮询播放列表，把新完成的分片交给 on_update
+
+        Args:
+            cmd: FFmpeg 命令
+            playlist_path: 播放列表路径
+            on_update: 更新回调（可选，为空时只等待完成）
+            poll_interval: 轮询间隔（秒）
+
+        Returns:
+            播放列表路径
+
+        Raises:
+            RuntimeError: FFmpeg 执行失败
+        """
+        hls_dir = Path(playlist_path).parent
+        published: set[str] = set()
+        last_mtime = None
+
+        def publish(final: bool = False) -> None:
+            nonlocal last_mtime
+            try:
+                mtime = os.path.getmtime(playlist_path)
+            except OSError:
+                return
+            if mtime == last_mtime and not final:
+                return
+            last_mtime = mtime
+
+            with open(playlist_path, "r", encoding="utf-8") as f:
+                files = playlist_files(f.read())
+            new_files = [name for name in files if name not in published]
+            if (new_files or final) and on_update is not None:
+                on_update([str(hls_dir / name) for name in new_files], playlist_path)
+            published.update(new_files)
+
+        with tempfile.TemporaryFile() as stderr_file:
+            process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=stderr_file)
+            try:
+                while process.poll() is None:
+                    time.sleep(poll_interval)
+                    publish()
+            except BaseException:
+                process.kill()
+                process.wait()
+                raise
+
+            if process.returncode != 0:
+                stderr_file.seek(0)
+                stderr = stderr_file.read().decode(errors="replace")
+                logger.error(f"HLS mux failed: {stderr}")
+                raise RuntimeError(f"HLS mux failed: {stderr}")
+
+        publish(final=True)
+        logger.info(f"Dubbed video muxed (HLS): {playlist_path}, {len(published)} files")
+        return playlist_path
+
+    @staticmethod
+    def _replacement_audio_args(audio_path: str) -> list[str]:
+        """
+        替换音轨时的音频编码参数
+
+        已混音为 M4A（AAC）的音轨直接复制，避免二次有损编码；其他格式编码为 AAC。
+
+        Args:
+            audio_path: 新音频文件路径
+
+        Returns:
+            FFmpeg 参数列表
+        """
+        if Path(audio_path).suffix.lower() == ".m4a":
+            return ["-c:a", "copy"]
+        return ["-c:a", "aac", "-b:a", "192k"]
+
+    @staticmethod
+    def _soft_subtitle_args(output_path: str, input_index: int) -> list[str]:
+        """
+        软字幕轨道的映射和编码参数
+
+        MP4 只支持 mov_text（纯文本，样式丢失）；MKV 保留 ASS 原样式。
+
+        Args:
+            output_path: 输出路径（按扩展名选择字幕编码）
+            input_index: 字幕文件在 FFmpeg 输入中的序号
+
+        Returns:
+            FFmpeg 参数列表
+        """
+        codec = "ass" if Path(output_path).suffix.lower() == ".mkv" else "mov_text"
+        return [
+            "-map", f"{input_index}:s:0",
+            "-c:s", codec,
+            "-disposition:s:0", "default",
+        ]
+
+    def _plan_mix(
+        self,
+        segments: list[dict],
+        total_duration_ms: int,
+        check_margin: float,
+        max_lead_ms: int,
+        max_lag_ms: int,
+        max_speed: float,
+    ) -> tuple[list[dict], list]:
+        """
+        确定各分段音频时长并求解时间轴放置方案
+
+        Returns:
+            (按 start_ms 排序的分段, 对应的 ClipPlacement 列表)
+        """
+        from app.utils.timeline import solve_timeline
+
         # 对分段按 start_ms 排序
         sorted_segments = sorted(segments, key=lambda x: x.get("start_ms", 0))
 
-        # 计算每个分段的最大可用时长（到下一个分段开始）
-        processed_segments = []
+        # 确定每个分段的音频时长
+        durations = []
         for i, seg in enumerate(sorted_segments):
             start_ms = seg.get("start_ms", 0)
-
-            # 下一个分段的开始时间，或者视频结束
             if i + 1 < len(sorted_segments):
                 next_start_ms = sorted_segments[i + 1].get("start_ms", total_duration_ms)
             else:
                 next_start_ms = total_duration_ms
-
             max_available_ms = next_start_ms - start_ms
 
-            # 获取实际音频时长
-            actual_duration_ms = self.get_audio_duration_ms(seg["path"])
-
-            # 决定是否需要加速
-            if actual_duration_ms > max_available_ms and max_available_ms > 0:
-                # 需要加速
-                speed_factor = actual_duration_ms / max_available_ms
-
-                # 限制最大加速倍数（例如最大 4 倍，超过则截断或接受 4 倍后依然重叠?
-                # 用户要求"尽量加速缩短"，所以这里优先满足时间约束）
-                # FFmpeg atempo filter range is [0.5, 100]
-                if speed_factor > 100.0:
-                     speed_factor = 100.0
-
-                adjusted_path = tempfile.mktemp(suffix=".wav")
-                self.adjust_audio_speed(seg["path"], speed_factor, adjusted_path)
-                processed_segments.append({
-                    "path": adjusted_path,
-                    "start_ms": start_ms,
-                    "temp": True  # 标记为临时文件，后续清理
-                })
-                logger.info(f"Segment {i}: {actual_duration_ms}ms -> {max_available_ms}ms (speed up {speed_factor:.2f}x)")
-            else:
-                processed_segments.append({
-                    "path": seg["path"],
-                    "start_ms": start_ms,
-                    "temp": False
-                })
-                logger.debug(f"Segment {i}: {actual_duration_ms}ms <= {max_available_ms}ms (no change)")
-
-        # 构建 FFmpeg 滤镜
+            duration_ms = seg.get("duration_ms")
+            estimated_ms = seg.get("estimated_ms")
+            if duration_ms is None and estimated_ms is not None and estimated_ms <= max_available_ms * check_margin:
+                # 估算时长明显短于可用时长：无需实测
+                duration_ms = estimated_ms
+                logger.debug(f"Segment {i}: estimated {estimated_ms}ms fits {max_available_ms}ms (not probed)")
+            if duration_ms is None:
+                duration_ms = self.get_audio_duration_ms(seg["path"])
+            durations.append(duration_ms)
+
+        placements = solve_timeline(
+            [(seg.get("start_ms", 0), duration) for seg, duration in zip(sorted_segments, durations, strict=True)],
+            total_duration_ms=total_duration_ms,
+            max_lead_ms=max_lead_ms,
+            max_lag_ms=max_lag_ms,
+            max_speed=max_speed,
+        )
+
+        for i, (seg, placement) in enumerate(zip(sorted_segments, placements, strict=True)):
+            if placement.speed > 1.0 or placement.start_ms != seg.get("start_ms", 0):
+                logger.debug(
+                    f"Segment {i}: {durations[i]}ms at {seg.get('start_ms', 0)}ms -> "
+                    f"{placement.duration_ms}ms at {placement.start_ms}ms "
+                    f"(speed {placement.speed:.2f}x{', trimmed' if placement.trimmed else ''})"
+                )
+
+        return sorted_segments, placements
+
+    @staticmethod
+    def _mix_filter_graph(
+        sorted_segments: list[dict],
+        placements: list,
+        total_duration_ms: int,
+        input_offset: int = 0,
+    ) -> tuple[list[str], list[str]]:
+        """
+        构建配音混音滤镜图（输出标签 [mixed]）
+
+        Args:
+            sorted_segments: 排序后的分段
+            placements: 对应的放置方案
+            total_duration_ms: 总时长（毫秒）
+            input_offset: 第一个分段在 FFmpeg 输入中的序号
+
+        Returns:
+            (FFmpeg 输入参数, 滤镜列表)
+        """
         filters = []
         inputs = []
 
-        for i, seg in enumerate(processed_segments):
+        for i, (seg, placement) in enumerate(zip(sorted_segments, placements, strict=True)):
             inputs.extend(["-i", seg["path"]])
-            delay_ms = seg["start_ms"]
-            filters.append(
-                f"[{i}:a]aresample=16000,adelay={delay_ms}|{delay_ms}[a{i}]"
-            )
+            chain = ["aresample=16000"]
+            if placement.speed > 1.0:
+                chain.append(f"atempo={placement.speed:.4f}")
+            if placement.trimmed:
+                chain.append(f"atrim=0:{placement.duration_ms / 1000:.3f}")
+            delay_ms = placement.start_ms
+            chain.append(f"adelay={delay_ms}|{delay_ms}")
+            filters.append(f"[{i + input_offset}:a]{','.join(chain)}[a{i}]")
 
         # 基准静音轨道
         filters.append(
             f"anullsrc=channel_layout=mono:sample_rate=16000:d={total_duration_ms/1000}[base]"
         )
 
-        # 混音（不会重叠，因为已经调整过时长）
-        mix_inputs = "".join([f"[a{i}]" for i in range(len(processed_segments))])
+        # 混音（不会重叠，因为已经求解过放置方案）
+        mix_inputs = "".join([f"[a{i}]" for i in range(len(sorted_segments))])
         filters.append(
-            f"[base]{mix_inputs}amix=inputs={len(processed_segments)+1}:normalize=0:dropout_transition=0[mixed]"
+            f"[base]{mix_inputs}amix=inputs={len(sorted_segments)+1}:normalize=0:dropout_transition=0[mixed]"
         )
 
-        filter_complex = ";".join(filters)
-
-        cmd = [
-            "ffmpeg", "-y",
-            *inputs,
-            "-filter_complex", filter_complex,
-            "-map", "[mixed]",
-            "-t", f"{total_duration_ms/1000}",
-            output_path,
-        ]
-
-        try:
-            subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            logger.info(f"Audio segments merged (timeline, smart speed): {output_path}")
-        except subprocess.CalledProcessError as e:
-            logger.error(f"FFmpeg merge failed: {e.stderr.decode()}")
-            raise RuntimeError(f"Audio merge failed: {e.stderr.decode()}")
-        finally:
-            # 清理临时文件
-            for seg in processed_segments:
-                if seg.get("temp") and Path(seg["path"]).exists():
-                    Path(seg["path"]).unlink(missing_ok=True)
-
-        return output_path
+        return inputs, filters
 
     def replace_audio(
-        self, video_path: str, audio_path: str, output_path: Optional[str] = None
+        self,
+        video_path: str,
+        audio_path: str,
+        output_path: Optional[str] = None,
+        soft_subtitle_path: Optional[str] = None,
+        duration_ms: Optional[int] = None,
     ) -> str:
         """
         替换视频的音轨
 
         Args:
-            video_path: 原视频文件路径
+            video_path: 原视频文件路径或 HTTP(S) URL
             audio_path: 新音频文件路径
             output_path: 输出视频路径（可选）
+            soft_subtitle_path: ASS 字幕文件路径（可选，提供时作为软字幕轨道封装）
+            duration_ms: 输出时长（可选，毫秒；封装软字幕时使用，如预览窗口时长，未提供时探测视频）
 
         Returns:
             输出视频文件路径
@@ -385,24 +806,31 @@ class FFmpegHelper:
 
         cmd = [
             "ffmpeg",
+            *(HTTP_INPUT_OPTIONS if is_url(video_path) else []),
             "-i",
             video_path,  # 输入视频
             "-i",
             audio_path,  # 输入音频
             "-c:v",
             "copy",  # 复制视频流（不重新编码）
-            "-c:a",
-            "aac",  # 音频编码为 AAC
-            "-b:a",
-            "192k",  # 音频比特率
+            *self._replacement_audio_args(audio_path),  # 音频编码为 AAC（已是 AAC 时直接复制）
             "-map",
             "0:v:0",  # 映射第一个输入的视频流
             "-map",
             "1:a:0",  # 映射第二个输入的音频流
             "-shortest",  # 使用最短流的长度
             "-y",
-            output_path,
         ]
+        if soft_subtitle_path:
+            audio_input = cmd.index(audio_path)
+            cmd[audio_input + 1:audio_input + 1] = ["-i", soft_subtitle_path]  # 输入 2：字幕
+            cmd += self._soft_subtitle_args(output_path, 2)
+            # -shortest 会把字幕流计入，输出在最后一条字幕处截断：改为按视频时长截取
+            cmd.remove("-shortest")
+            if duration_ms is None:
+                duration_ms = self.probe(video_path).duration_ms
+            cmd += ["-t", f"{duration_ms / 1000}"]
+        cmd.append(output_path)
 
         try:
             subprocess.run(
@@ -412,7 +840,7 @@ class FFmpegHelper:
             return output_path
         except subprocess.CalledProcessError as e:
             logger.error(f"FFmpeg replace failed: {e.stderr.decode()}")
-            raise RuntimeError(f"Audio replacement failed: {e.stderr.decode()}")
+            raise RuntimeError(f"Audio replacement failed: {e.stderr.decode()}") from e
 
     def adjust_audio_speed(
         self, audio_path: str, speed_factor: float, output_path: Optional[str] = None
@@ -455,7 +883,7 @@ class FFmpegHelper:
             return output_path
         except subprocess.CalledProcessError as e:
             logger.error(f"FFmpeg speed adjust failed: {e.stderr.decode()}")
-            raise RuntimeError(f"Audio speed adjustment failed: {e.stderr.decode()}")
+            raise RuntimeError(f"Audio speed adjustment failed: {e.stderr.decode()}") from e
 
     def extract_segment(
         self,
@@ -510,7 +938,7 @@ class FFmpegHelper:
             return output_path
         except subprocess.CalledProcessError as e:
             logger.error(f"FFmpeg extract failed: {e.stderr.decode()}")
-            raise RuntimeError(f"Segment extraction failed: {e.stderr.decode()}")
+            raise RuntimeError(f"Segment extraction failed: {e.stderr.decode()}") from e
 
     # ==================== 字幕相关 ====================
 
@@ -591,6 +1019,7 @@ class FFmpegHelper:
                 - end_time_ms: 结束时间（毫秒）
                 - original_text: 原文文本（可选）
                 - translated_text: 翻译文本（可选）
+                - source_spans: 合并前的原始片段（可选），有值时原文按片段各自的时间轴显示
             output_path: 输出 ASS 文件路径
             subtitle_type: 字幕类型
                 - "bilingual": 双语字幕（译文主行 + 原文副行）
@@ -637,6 +1066,20 @@ Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
             original = seg.get("original_text", "")
             translated = seg.get("translated_text", "")
 
+            # 原文行：合并单元按原始片段的时间轴逐条显示
+            if seg.get("source_spans"):
+                original_lines = [
+                    (
+                        self._ms_to_ass_time(span["start_time_ms"]),
+                        self._ms_to_ass_time(span["end_time_ms"]),
+                        span["text"],
+                    )
+                    for span in seg["source_spans"]
+                    if span.get("text")
+                ]
+            else:
+                original_lines = [(start, end, original)] if original else []
+
             if subtitle_type == "bilingual":
                 # 双语：译文在下方主行，原文在上方副行
                 if translated:
@@ -644,10 +1087,10 @@ Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
                         f"Dialogue: 0,{start},{end},Translated,,0,0,0,,"
                         f"{self._escape_ass_text(translated)}"
                     )
-                if original:
+                for line_start, line_end, text in original_lines:
                     events.append(
-                        f"Dialogue: 1,{start},{end},Original,,0,0,0,,"
-                        f"{self._escape_ass_text(original)}"
+                        f"Dialogue: 1,{line_start},{line_end},Original,,0,0,0,,"
+                        f"{self._escape_ass_text(text)}"
                     )
             elif subtitle_type == "translated":
                 if translated:
@@ -656,10 +1099,10 @@ Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
                         f"{self._escape_ass_text(translated)}"
                     )
             elif subtitle_type == "original":
-                if original:
+                for line_start, line_end, text in original_lines:
                     events.append(
-                        f"Dialogue: 0,{start},{end},Translated,,0,0,0,,"
-                        f"{self._escape_ass_text(original)}"
+                        f"Dialogue: 0,{line_start},{line_end},Translated,,0,0,0,,"
+                        f"{self._escape_ass_text(text)}"
                     )
 
         # 写入文件
@@ -681,20 +1124,8 @@ Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
         Returns:
             (width, height) 元组
         """
-        cmd = [
-            "ffprobe", "-v", "error",
-            "-select_streams", "v:0",
-            "-show_entries", "stream=width,height",
-            "-of", "csv=s=x:p=0",
-            video_path,
-        ]
         try:
-            result = subprocess.run(
-                cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE
-            )
-            output = result.stdout.decode().strip()
-            width, height = output.split("x")
-            return int(width), int(height)
+            return self.probe(video_path).resolution
         except Exception as e:
             logger.warning(f"Failed to get video resolution: {e}, using default 1920x1080")
             return 1920, 1080
@@ -749,7 +1180,7 @@ Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
             return output_path
         except subprocess.CalledProcessError as e:
             logger.error(f"Subtitle burn failed: {e.stderr.decode()}")
-            raise RuntimeError(f"Subtitle burn failed: {e.stderr.decode()}")
+            raise RuntimeError(f"Subtitle burn failed: {e.stderr.decode()}") from e
 
     def replace_audio_and_burn_subtitles(
         self,
@@ -790,8 +1221,7 @@ Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
             "-c:v", "libx264",
             "-preset", "medium",
             "-crf", "23",
-            "-c:a", "aac",
-            "-b:a", "192k",
+            *self._replacement_audio_args(audio_path),
             "-map", "0:v:0",
             "-map", "1:a:0",
             "-shortest",
@@ -806,4 +1236,442 @@ Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
             return output_path
         except subprocess.CalledProcessError as e:
             logger.error(f"Replace audio + burn subtitles failed: {e.stderr.decode()}")
-            raise RuntimeError(f"Replace audio + burn subtitles failed: {e.stderr.decode()}")
+            raise RuntimeError(f"Replace audio + burn subtitles failed: {e.stderr.decode()}") from e
+
+    def get_keyframe_times_ms(self, video_path: str) -> list[int]:
+        """
+        获取视频关键帧时间（只读取包标记，不解码）
+
+        Args:
+            video_path: 视频文件路径
+
+        Returns:
+            关键帧时间列表（毫秒，升序）
+
+        Raises:
+            RuntimeError: FFprobe 执行失败
+        """
+        packets = self._probe_video_packets(video_path)
+        return sorted({pts_ms for pts_ms, key in packets if key})
+
+    def _probe_video_packets(self, video_path: str) -> list[tuple[int, bool]]:
+        """
+        读取第一条视频流的全部包（只读取包标记，不解码）
+
+        Args:
+            video_path: 视频文件路径
+
+        Returns:
+            [(pts_ms, 是否关键帧)]，按解码顺序
+
+        Raises:
+            RuntimeError: FFprobe 执行失败
+        """
+        cmd = [
+            "ffprobe", "-v", "error",
+            *(HTTP_INPUT_OPTIONS if is_url(video_path) else []),
+            "-select_streams", "v:0",
+            "-show_entries", "packet=pts_time,flags",
+            "-of", "csv=p=0",
+            video_path,
+        ]
+
+        try:
+            result = subprocess.run(
+                cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+            )
+        except subprocess.CalledProcessError as e:
+            logger.error(f"Keyframe probe failed: {e.stderr.decode()}")
+            raise RuntimeError(f"Keyframe probe failed: {e.stderr.decode()}") from e
+
+        packets = []
+        for line in result.stdout.decode().splitlines():
+            pts_time, _, flags = line.partition(",")
+            if pts_time not in ("", "N/A"):
+                packets.append((int(float(pts_time) * 1000), "K" in flags))
+        return packets
+
+    @staticmethod
+    def _has_open_gop(packets: list[tuple[int, bool]]) -> bool:
+        """
+        是否存在开放 GOP
+
+        关键帧之后（解码顺序）出现显示时间早于它的帧，说明这些前导帧参考了上一个 GOP，
+        在该关键帧处切开后前导帧无法正确解码。
+
+        Args:
+            packets: [(pts_ms, 是否关键帧)]，按解码顺序
+
+        Returns:
+            是否存在开放 GOP
+        """
+        keyframe_pts = None
+        for pts_ms, key in packets:
+            if key:
+                keyframe_pts = pts_ms
+            elif keyframe_pts is not None and pts_ms < keyframe_pts:
+                return True
+        return False
+
+    @staticmethod
+    def _matching_h264_args(media_info: MediaInfo) -> list[str]:
+        """
+        与源视频一致的 libx264 编码参数（档次 / 级别 / 参考帧 / 像素格式 / 码率）
+
+        重编码分片与流复制分片拼接在同一条流中，参数不一致时严格的解码器（尤其硬件解码）
+        无法处理流中途的 SPS/PPS 变化，画质也会在分片边界跳变。
+
+        Args:
+            media_info: 源视频探测结果
+
+        Returns:
+            FFmpeg 参数列表
+        """
+        args = []
+        profile = H264_PROFILES.get((media_info.video_profile or "").lower())
+        if profile:
+            args += ["-profile:v", profile]
+        if media_info.video_level and media_info.video_level > 0:
+            args += ["-level:v", f"{media_info.video_level / 10:.1f}"]
+        if media_info.video_refs:
+            args += ["-refs", str(media_info.video_refs)]
+        if media_info.pix_fmt:
+            args += ["-pix_fmt", media_info.pix_fmt]
+        if media_info.video_bit_rate:
+            # 按源码率编码（而不是固定 CRF），画质与相邻的复制分片接近
+            args += [
+                "-b:v", str(media_info.video_bit_rate),
+                "-maxrate", str(media_info.video_bit_rate * 2),
+                "-bufsize", str(media_info.video_bit_rate * 4),
+            ]
+        else:
+            args += ["-crf", "23"]
+        return args
+
+    def burn_subtitles_parallel(
+        self,
+        video_path: str,
+        subtitle_path: str,
+        output_path: str,
+        duration_ms: int,
+        workers: int,
+        min_piece_ms: int = 30000,
+    ) -> str:
+        """
+        按关键帧分片并行烧录字幕（只输出视频流）
+
+        1. 在关键帧处把视频切分为约 workers 个时间范围
+        2. 每个分片使用平移后的 ASS 字幕，在独立的 FFmpeg 进程中并行重编码
+        3. concat demuxer 拼接各分片（不重新编码）
+
+        分片从关键帧开始，输入端 -ss 定位精确；各分片编码参数相同，可直接流复制拼接。
+        输出不含音频，由后续封装步骤加入配音。
+
+        Args:
+            video_path: 输入视频路径
+            subtitle_path: ASS 字幕文件路径
+            output_path: 输出视频路径
+            duration_ms: 视频时长（毫秒）
+            workers: 并行进程数
+            min_piece_ms: 最小分片时长（毫秒）
+
+        Returns:
+            输出视频文件路径
+
+        Raises:
+            RuntimeError: FFmpeg 执行失败
+        """
+        keyframes = self.get_keyframe_times_ms(video_path)
+        ranges = plan_split_points(keyframes, duration_ms, workers, min_piece_ms)
+
+        logger.info(
+            f"Burning subtitles in parallel: {len(ranges)} pieces, {workers} workers, "
+            f"{len(keyframes)} keyframes ({video_path})"
+        )
+
+        with open(subtitle_path, "r", encoding="utf-8") as f:
+            subtitle_content = f.read()
+
+        work_dir = tempfile.mkdtemp(prefix="burn_parallel_", dir=str(Path(output_path).parent))
+        # 各进程平分 CPU，避免 libx264 线程数超额
+        threads = max(1, (os.cpu_count() or 1) // len(ranges))
+
+        def burn_piece(index: int, start_ms: int, end_ms: int) -> str:
+            piece_subtitle = os.path.join(work_dir, f"piece_{index:04d}.ass")
+            with open(piece_subtitle, "w", encoding="utf-8") as f:
+                f.write(shift_ass_events(subtitle_content, start_ms, end_ms - start_ms))
+
+            piece_output = os.path.join(work_dir, f"piece_{index:04d}.mp4")
+            cmd = [
+                "ffmpeg", "-y",
+                "-ss", f"{start_ms / 1000:.3f}",
+                "-i", video_path,
+                "-t", f"{(end_ms - start_ms) / 1000:.3f}",
+                "-map", "0:v:0",
+                "-vf", f"ass='{self._escape_filter_path(piece_subtitle)}'",
+                "-c:v", "libx264",
+                "-preset", "medium",
+                "-crf", "23",
+                "-threads", str(threads),
+                "-an",
+                piece_output,
+            ]
+            try:
+                subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            except subprocess.CalledProcessError as e:
+                raise RuntimeError(
+                    f"Subtitle burn failed for piece {index} "
+                    f"({start_ms}-{end_ms}ms): {e.stderr.decode()}"
+                ) from e
+            return piece_output
+
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(burn_piece, i, start_ms, end_ms)
+                    for i, (start_ms, end_ms) in enumerate(ranges)
+                ]
+                pieces = [future.result() for future in futures]
+
+            self.concat_videos(pieces, output_path)
+        finally:
+            import shutil
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        logger.info(f"Subtitles burned in parallel: {output_path}")
+        return output_path
+
+    def smart_burn_subtitles(
+        self,
+        video_path: str,
+        subtitle_path: str,
+        output_path: str,
+        duration_ms: int,
+        media_info: Optional[MediaInfo] = None,
+        workers: int = 1,
+        max_reencode_ratio: float = 0.7,
+    ) -> Optional[str]:
+        """
+        局部重编码烧录字幕（只输出视频流，仅支持 H.264 输入）
+
+        1. 以关键帧划分 GOP，与字幕事件重叠的 GOP 需要重编码，其余流复制
+        2. segment muxer 一次性在关键帧处把视频切为 MPEG-TS 分片（流复制）
+        3. 需要重编码的分片使用平移后的 ASS 字幕重新编码（可并行），其余分片原样保留
+        4. concat demuxer 拼接全部分片
+
+        重编码分片按源视频的档次、级别、参考帧和码率编码，分片首帧强制为 IDR 且使用封闭 GOP，
+        与复制分片的 SPS/PPS 兼容、互不参考。源视频不是 H.264 或存在开放 GOP
+        （复制分片的前导帧会参考被重编码的 GOP）时不适用。
+
+        Args:
+            video_path: 输入视频路径（H.264）
+            subtitle_path: ASS 字幕文件路径
+            output_path: 输出视频路径
+            duration_ms: 视频时长（毫秒）
+            media_info: 源视频探测结果（可选，未提供时重新探测）
+            workers: 并行编码进程数
+            max_reencode_ratio: 需重编码时长占比超过该值时放弃局部重编码
+
+        Returns:
+            输出视频文件路径；不适用或失败时返回 None（调用方应回退为整体烧录）
+        """
+        with open(subtitle_path, "r", encoding="utf-8") as f:
+            subtitle_content = f.read()
+
+        try:
+            media_info = media_info or self.probe(video_path)
+            packets = self._probe_video_packets(video_path)
+        except RuntimeError as e:
+            logger.warning(f"Smart render skipped, probe failed: {e}")
+            return None
+
+        if media_info.video_codec != "h264":
+            logger.info(f"Smart render not applicable: codec {media_info.video_codec}")
+            return None
+        if self._has_open_gop(packets):
+            logger.info("Smart render not applicable: source has open GOPs")
+            return None
+
+        keyframes = sorted({pts_ms for pts_ms, key in packets if key})
+        encode_args = self._matching_h264_args(media_info)
+
+        runs = plan_smart_render(keyframes, duration_ms, ass_event_intervals(subtitle_content))
+        reencode_ms = sum(end - start for start, end, reencode in runs if reencode)
+        ratio = reencode_ms / duration_ms if duration_ms else 1.0
+
+        if not any(reencode for _, _, reencode in runs) or ratio > max_reencode_ratio:
+            logger.info(
+                f"Smart render not applicable: re-encode ratio {ratio:.0%} "
+                f"(limit {max_reencode_ratio:.0%})"
+            )
+            return None
+
+        logger.info(
+            f"Smart render: {len(runs)} runs, re-encoding {reencode_ms}ms of {duration_ms}ms "
+            f"({ratio:.0%}) ({video_path})"
+        )
+
+        work_dir = tempfile.mkdtemp(prefix="smart_render_", dir=str(Path(output_path).parent))
+        try:
+            # 在各分片起点（均为关键帧）切分，流复制
+            split_times = ",".join(f"{start / 1000:.3f}" for start, _, _ in runs[1:])
+            split_cmd = [
+                "ffmpeg", "-y",
+                "-i", video_path,
+                "-map", "0:v:0",
+                "-c", "copy",
+                "-bsf:v", "h264_mp4toannexb",
+                "-f", "segment",
+                "-segment_format", "mpegts",
+                "-reset_timestamps", "1",
+            ]
+            if split_times:
+                split_cmd += ["-segment_times", split_times]
+            split_cmd.append(os.path.join(work_dir, "run_%04d.ts"))
+            subprocess.run(split_cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+            pieces = sorted(
+                os.path.join(work_dir, name)
+                for name in os.listdir(work_dir)
+                if name.startswith("run_") and name.endswith(".ts")
+            )
+            if len(pieces) != len(runs):
+                raise RuntimeError(
+                    f"Segment split produced {len(pieces)} pieces, expected {len(runs)}"
+                )
+
+            def burn_run(index: int, start_ms: int, end_ms: int) -> str:
+                run_subtitle = os.path.join(work_dir, f"run_{index:04d}.ass")
+                with open(run_subtitle, "w", encoding="utf-8") as f:
+                    f.write(shift_ass_events(subtitle_content, start_ms, end_ms - start_ms))
+
+                run_output = os.path.join(work_dir, f"run_{index:04d}_burned.ts")
+                cmd = [
+                    "ffmpeg", "-y",
+                    "-i", pieces[index],
+                    "-vf", f"ass='{self._escape_filter_path(run_subtitle)}'",
+                    "-c:v", "libx264",
+                    "-preset", "medium",
+                    *encode_args,
+                    # 首帧强制 IDR、封闭 GOP：重编码分片不参考、也不被相邻的复制分片参考
+                    "-forced-idr", "1",
+                    "-force_key_frames", "expr:eq(n,0)",
+                    "-x264-params", "open-gop=0",
+                    "-bsf:v", "h264_mp4toannexb",
+                    "-f", "mpegts",
+                    run_output,
+                ]
+                subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+                return run_output
+
+            with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+                futures = {
+                    i: executor.submit(burn_run, i, start_ms, end_ms)
+                    for i, (start_ms, end_ms, reencode) in enumerate(runs)
+                    if reencode
+                }
+                for i, future in futures.items():
+                    pieces[i] = future.result()
+
+            self.concat_videos(pieces, output_path)
+        except (subprocess.CalledProcessError, RuntimeError) as e:
+            stderr = e.stderr.decode() if isinstance(e, subprocess.CalledProcessError) else str(e)
+            logger.warning(f"Smart render failed, falling back to full burn: {stderr}")
+            return None
+        finally:
+            import shutil
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        logger.info(f"Subtitles burned with smart render: {output_path}")
+        return output_path
+
+    def cut_video(
+        self, video_path: str, output_path: str, start_ms: int, duration_ms: int
+    ) -> str:
+        """
+        截取视频的一段（流复制，不重新编码）
+
+        起点应为关键帧（如 plan_shards 的切点），否则流复制会从之前的关键帧开始。
+
+        Args:
+            video_path: 视频文件路径或 HTTP(S) URL（只读取该时间段对应的字节范围）
+            output_path: 输出视频路径
+            start_ms: 起点（毫秒）
+            duration_ms: 时长（毫秒）
+
+        Returns:
+            输出视频文件路径
+
+        Raises:
+            RuntimeError: FFmpeg 执行失败
+        """
+        cmd = [
+            "ffmpeg", "-y",
+            *(HTTP_INPUT_OPTIONS if is_url(video_path) else []),
+            # 关键帧时间按毫秒向下取整，多偏移 1ms 保证定位到该关键帧而不是前一个
+            *(["-ss", f"{(start_ms + 1) / 1000}"] if start_ms else []),
+            "-i", video_path,
+            "-t", f"{duration_ms / 1000}",
+            "-map", "0:v:0",
+            "-map", "0:a:0?",
+            "-c", "copy",
+            "-avoid_negative_ts", "make_zero",
+            output_path,
+        ]
+
+        try:
+            subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            logger.info(f"Video cut: [{start_ms}, {start_ms + duration_ms})ms -> {output_path}")
+            return output_path
+        except subprocess.CalledProcessError as e:
+            logger.error(f"Video cut failed: {e.stderr.decode()}")
+            raise RuntimeError(f"Video cut failed: {e.stderr.decode()}") from e
+
+    def concat_videos(
+        self,
+        video_paths: list[str],
+        output_path: str,
+        soft_subtitle_path: Optional[str] = None,
+    ) -> str:
+        """
+        使用 concat demuxer 拼接视频（流复制，不重新编码）
+
+        Args:
+            video_paths: 待拼接视频路径（编码参数需一致）
+            output_path: 输出视频路径
+            soft_subtitle_path: ASS 字幕文件路径（可选，提供时在同一次拼接中封装为软字幕轨道）
+
+        Returns:
+            输出视频文件路径
+
+        Raises:
+            RuntimeError: FFmpeg 执行失败
+        """
+        list_path = f"{output_path}.concat.txt"
+        with open(list_path, "w", encoding="utf-8") as f:
+            for path in video_paths:
+                escaped = os.path.abspath(path).replace("'", "'\\''")
+                f.write(f"file '{escaped}'\n")
+
+        cmd = [
+            "ffmpeg", "-y",
+            "-f", "concat",
+            "-safe", "0",
+            "-i", list_path,
+        ]
+        if soft_subtitle_path:
+            cmd += ["-i", soft_subtitle_path, "-map", "0:v:0", "-map", "0:a?"]
+        cmd += ["-c", "copy"]
+        if soft_subtitle_path:
+            cmd += self._soft_subtitle_args(output_path, 1)
+        cmd.append(output_path)
+
+        try:
+            subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            logger.info(f"Videos concatenated: {len(video_paths)} pieces -> {output_path}")
+            return output_path
+        except subprocess.CalledProcessError as e:
+            logger.error(f"Concat failed: {e.stderr.decode()}")
+            raise RuntimeError(f"Concat failed: {e.stderr.decode()}") from e
+        finally:
+            os.unlink(list_path)
@@ -0,0 +1,60 @@
+"""
+HLS 播放列表工具
+解析 FFmpeg 生成的 m3u8（fMP4 分片），以及把分片 URI 改写为可直接访问的签名 URL
+"""
+
+import re
+from typing import Callable
+
+_MAP_URI = re.compile(r'URI="([^"]+)"')
+
+
+def playlist_files(content: str) -> list[str]:
+    """
+    列出播放列表引用的文件（初始化分片 + 媒体分片，按出现顺序）
+
+    FFmpeg 只在分片写完后才把它加入播放列表，因此列表中的文件都是完整的。
+
+    Args:
+        content: m3u8 内容
+
+    Returns:
+        文件名列表
+    """
+    files = []
+    for line in content.splitlines():
+        line = line.strip()
+        if line.startswith("#EXT-X-MAP:"):
+            match = _MAP_URI.search(line)
+            if match:
+                files.append(match.group(1))
+        elif line and not line.startswith("#"):
+            files.append(line)
+    return list(dict.fromkeys(files))
+
+
+def is_playlist_complete(content: str) -> bool:
+    """播放列表是否已结束（包含 #EXT-X-ENDLIST）"""
+    return "#EXT-X-ENDLIST" in content
+
+
+def rewrite_playlist(content: str, url_for: Callable[[str], str]) -> str:
+    """
+    把播放列表中的相对 URI 改写为 url_for 返回的 URL
+
+    Args:
+        content: m3u8 内容
+        url_for: 文件名 -> URL（如 OSS 签名 URL）
+
+    Returns:
+        改写后的 m3u8 内容
+    """
+    lines = []
+    for line in content.splitlines():
+        stripped = line.strip()
+        if stripped.startswith("#EXT-X-MAP:"):
+            line = _MAP_URI.sub(lambda m: f'URI="{url_for(m.group(1))}"', stripped)
+        elif stripped and not stripped.startswith("#"):
+            line = url_for(stripped)
+        lines.append(line)
+    return "\n".join(lines) + "\n"
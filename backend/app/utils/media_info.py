@@ -0,0 +1,156 @@
+"""
+媒体文件信息
+一次 ffprobe JSON 探测的结构化结果，可序列化后存入 Task 行供后续阶段复用
+"""
+
+from dataclasses import asdict, dataclass, field
+from typing import Optional
+
+
+@dataclass
+class AudioStreamInfo:
+    """音频流信息"""
+
+    index: int                       # 流索引（ffmpeg -map 0:<index>）
+    codec: Optional[str] = None
+    sample_rate: Optional[int] = None
+    channels: Optional[int] = None
+    language: Optional[str] = None
+
+
+@dataclass
+class MediaInfo:
+    """媒体文件信息"""
+
+    duration_ms: int
+    format_name: Optional[str] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    video_codec: Optional[str] = None
+    pix_fmt: Optional[str] = None
+    video_profile: Optional[str] = None   # 编码档次（如 High）
+    video_level: Optional[int] = None     # 编码级别（ffprobe 格式，如 40 表示 4.0）
+    video_refs: Optional[int] = None      # 参考帧数
+    video_bit_rate: Optional[int] = None  # 视频码率（bps）
+    frame_rate: Optional[float] = None
+    keyframe_interval_s: Optional[float] = None  # 关键帧间隔（秒，取开头片段的中位数）
+    audio_streams: list[AudioStreamInfo] = field(default_factory=list)
+
+    @property
+    def has_video(self) -> bool:
+        """是否包含视频流"""
+        return self.video_codec is not None
+
+    @property
+    def resolution(self) -> tuple[int, int]:
+        """(width, height)，无视频流时返回 1920x1080"""
+        if self.width and self.height:
+            return self.width, self.height
+        return 1920, 1080
+
+    @classmethod
+    def from_ffprobe(cls, data: dict) -> "MediaInfo":
+        """
+        解析 ffprobe -print_format json -show_format -show_streams [-show_entries packet] 的输出
+
+        Args:
+            data: ffprobe JSON
+
+        Returns:
+            MediaInfo
+        """
+        fmt = data.get("format", {})
+        streams = data.get("streams", [])
+
+        duration_sec = _to_float(fmt.get("duration"))
+        video = next(
+            (
+                s for s in streams
+                if s.get("codec_type") == "video"
+                and not s.get("disposition", {}).get("attached_pic")
+            ),
+            None,
+        )
+
+        if duration_sec is None:
+            # 部分容器没有 format.duration：取各流时长的最大值
+            durations = [_to_float(s.get("duration")) for s in streams]
+            duration_sec = max((d for d in durations if d is not None), default=0.0)
+
+        audio_streams = [
+            AudioStreamInfo(
+                index=s["index"],
+                codec=s.get("codec_name"),
+                sample_rate=_to_int(s.get("sample_rate")),
+                channels=_to_int(s.get("channels")),
+                language=s.get("tags", {}).get("language"),
+            )
+            for s in streams
+            if s.get("codec_type") == "audio"
+        ]
+
+        keyframe_interval_s = None
+        if video is not None:
+            keyframe_times = sorted(
+                t for t in (
+                    _to_float(p.get("pts_time"))
+                    for p in data.get("packets", [])
+                    if p.get("stream_index") == video["index"] and "K" in p.get("flags", "")
+                )
+                if t is not None
+            )
+            gaps = sorted(b - a for a, b in zip(keyframe_times, keyframe_times[1:], strict=False) if b > a)
+            if gaps:
+                keyframe_interval_s = round(gaps[len(gaps) // 2], 3)
+
+        return cls(
+            duration_ms=int((duration_sec or 0.0) * 1000),
+            format_name=fmt.get("format_name"),
+            width=_to_int(video.get("width")) if video else None,
+            height=_to_int(video.get("height")) if video else None,
+            video_codec=video.get("codec_name") if video else None,
+            pix_fmt=video.get("pix_fmt") if video else None,
+            video_profile=video.get("profile") if video else None,
+            video_level=_to_int(video.get("level")) if video else None,
+            video_refs=_to_int(video.get("refs")) if video else None,
+            video_bit_rate=_to_int(video.get("bit_rate")) if video else None,
+            frame_rate=_parse_rate(video.get("avg_frame_rate") or video.get("r_frame_rate")) if video else None,
+            keyframe_interval_s=keyframe_interval_s,
+            audio_streams=audio_streams,
+        )
+
+    def to_dict(self) -> dict:
+        """序列化为 JSON 可存储的字典"""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "MediaInfo":
+        """从 to_dict 的结果恢复"""
+        data = dict(data)
+        data["audio_streams"] = [AudioStreamInfo(**s) for s in data.get("audio_streams", [])]
+        return cls(**data)
+
+
+def _to_float(value) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_int(value) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_rate(value: Optional[str]) -> Optional[float]:
+    """解析 ffprobe 的帧率分数（如 30000/1001）"""
+    if not value:
+        return None
+    num, _, den = value.partition("/")
+    num_f, den_f = _to_float(num), _to_float(den or "1")
+    if not num_f or not den_f:
+        return None
+    return round(num_f / den_f, 3)
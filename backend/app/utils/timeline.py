@@ -0,0 +1,159 @@
+"""
+配音时间轴求解
+已知各片段的实际时长，在允许的起点偏移范围内整体安排片段位置和加速倍数，
+使最大加速倍数尽可能低（而不是每段各自压缩到下一段开始前）
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+from loguru import logger
+
+
+@dataclass
+class ClipPlacement:
+    """单个片段的放置方案"""
+
+    start_ms: int        # 实际开始时间（毫秒）
+    speed: float         # 加速倍数（1.0 表示不变）
+    duration_ms: int     # 放置后的时长（加速/截断后，毫秒）
+    trimmed: bool        # 是否因超过最大加速倍数仍放不下而截断
+
+
+def solve_timeline(
+    clips: list[tuple[int, int]],
+    total_duration_ms: int,
+    max_lead_ms: int = 200,
+    max_lag_ms: int = 600,
+    min_gap_ms: int = 0,
+    max_speed: float = 4.0,
+    precision: float = 0.01,
+) -> list[ClipPlacement]:
+    """
+    求解片段放置方案
+
+    约束：片段 i 的开始时间位于 [原始开始 - max_lead_ms, 原始开始 + max_lag_ms]，
+    相邻片段不重叠（间隔至少 min_gap_ms），全部在 total_duration_ms 内结束。
+
+    求解：
+    1. 二分查找满足约束的最小最大加速倍数 S
+    2. 以 S 下的压缩时长反向计算每个片段的最晚开始时间
+    3. 正向放置：开始时间尽量贴近原始开始；每个片段只加速到刚好放进
+       "到下一片段最晚开始时间" 的窗口，多数片段保持原速
+
+    Args:
+        clips: [(原始开始时间, 音频时长)]（毫秒），按输入顺序返回结果
+        total_duration_ms: 时间轴总长（毫秒）
+        max_lead_ms: 允许提前的最大偏移（毫秒）
+        max_lag_ms: 允许推迟的最大偏移（毫秒）
+        min_gap_ms: 相邻片段的最小间隔（毫秒）
+        max_speed: 最大加速倍数（仍放不下的片段会被截断）
+        precision: 二分查找精度
+
+    Returns:
+        与 clips 一一对应的 ClipPlacement 列表
+    """
+    if not clips:
+        return []
+
+    order = sorted(range(len(clips)), key=lambda i: clips[i][0])
+    starts = [clips[i][0] for i in order]
+    durations = [max(clips[i][1], 1) for i in order]
+
+    if _latest_starts(starts, durations, 1.0, total_duration_ms, max_lag_ms, min_gap_ms, max_lead_ms) is not None:
+        speed_cap = 1.0
+    elif _latest_starts(starts, durations, max_speed, total_duration_ms, max_lag_ms, min_gap_ms, max_lead_ms) is None:
+        speed_cap = max_speed
+        logger.warning(
+            f"Timeline infeasible even at {max_speed}x, overflowing clips will be trimmed"
+        )
+    else:
+        low, high = 1.0, max_speed
+        while high - low > precision:
+            mid = (low + high) / 2
+            feasible = _latest_starts(
+                starts, durations, mid, total_duration_ms, max_lag_ms, min_gap_ms, max_lead_ms
+            )
+            if feasible is not None:
+                high = mid
+            else:
+                low = mid
+        speed_cap = high
+
+    latest = _latest_starts(
+        starts, durations, speed_cap, total_duration_ms, max_lag_ms, min_gap_ms, max_lead_ms,
+        strict=False,
+    )
+
+    placements: list[Optional[ClipPlacement]] = [None] * len(clips)
+    prev_end = 0
+    for k, original_index in enumerate(order):
+        earliest = max(starts[k] - max_lead_ms, prev_end + (min_gap_ms if k else 0), 0)
+        start = min(max(starts[k], earliest), max(latest[k], earliest))
+
+        window_end = latest[k + 1] - min_gap_ms if k + 1 < len(order) else total_duration_ms
+        window = max(window_end - start, 1)
+
+        speed = max(1.0, durations[k] / window)
+        trimmed = speed > speed_cap + 1e-9
+        speed = min(speed, speed_cap) if trimmed else speed
+        duration = int(durations[k] / speed)
+        if trimmed:
+            duration = min(duration, window)
+
+        placements[original_index] = ClipPlacement(
+            start_ms=int(start),
+            speed=round(speed, 4),
+            duration_ms=duration,
+            trimmed=trimmed,
+        )
+        prev_end = start + duration
+
+    stretched = sum(1 for p in placements if p.speed > 1.0)
+    logger.info(
+        f"Timeline solved: {len(clips)} clips, max speed {speed_cap:.2f}x, "
+        f"{stretched} clips stretched"
+    )
+
+    return placements
+
+
+def _latest_starts(
+    starts: list[int],
+    durations: list[int],
+    speed: float,
+    total_duration_ms: int,
+    max_lag_ms: int,
+    min_gap_ms: int,
+    max_lead_ms: int,
+    strict: bool = True,
+) -> Optional[list[float]]:
+    """
+    以统一加速倍数 speed 反向计算最晚开始时间，并检查正向最早放置是否可行
+
+    Args:
+        strict: True 时不可行返回 None；False 时总是返回最晚开始时间
+
+    Returns:
+        各片段（按开始时间排序）的最晚开始时间；strict 且不可行时返回 None
+    """
+    n = len(starts)
+    compressed = [d / speed for d in durations]
+
+    latest = [0.0] * n
+    bound = float(total_duration_ms) + min_gap_ms
+    for k in range(n - 1, -1, -1):
+        latest[k] = min(starts[k] + max_lag_ms, bound - min_gap_ms - compressed[k])
+        bound = latest[k]
+
+    if not strict:
+        return latest
+
+    prev_end = 0.0
+    for k in range(n):
+        earliest = max(starts[k] - max_lead_ms, prev_end + (min_gap_ms if k else 0), 0)
+        if earliest > latest[k] + 1e-6:
+            return None
+        prev_end = earliest + compressed[k]
+
+    return latest
@@ -0,0 +1,260 @@
+"""
+视频分片工具
+按关键帧切分时间范围、按分片平移 ASS 字幕事件，供并行烧录、局部重编码和分片流水线使用
+"""
+
+import re
+from typing import Optional
+
+_ASS_TIME = re.compile(r"(\d+):(\d{2}):(\d{2})\.(\d{2})")
+
+
+def plan_split_points(
+    keyframe_times_ms: list[int],
+    duration_ms: int,
+    pieces: int,
+    min_piece_ms: int = 0,
+) -> list[tuple[int, int]]:
+    """
+    在关键帧处把视频切分为约 pieces 个等长时间范围
+
+    每个切点取最接近理想等分位置的关键帧，短于 min_piece_ms 的分片与前一片合并。
+
+    Args:
+        keyframe_times_ms: 关键帧时间（毫秒，升序）
+        duration_ms: 视频总时长（毫秒）
+        pieces: 目标分片数
+        min_piece_ms: 最小分片时长（毫秒）
+
+    Returns:
+        [(start_ms, end_ms)]，首尾相接覆盖 [0, duration_ms)
+    """
+    candidates = sorted(t for t in keyframe_times_ms if 0 < t < duration_ms)
+    if pieces <= 1 or not candidates:
+        return [(0, duration_ms)]
+
+    cuts: list[int] = []
+    for k in range(1, pieces):
+        target = duration_ms * k / pieces
+        cut = min(candidates, key=lambda t: abs(t - target))
+        last = cuts[-1] if cuts else 0
+        if cut - last >= min_piece_ms and cut not in cuts:
+            cuts.append(cut)
+
+    # 最后一片过短时并入前一片
+    while cuts and duration_ms - cuts[-1] < min_piece_ms:
+        cuts.pop()
+
+    bounds = [0, *cuts, duration_ms]
+    return list(zip(bounds[:-1], bounds[1:], strict=True))
+
+
+def ass_time_to_ms(value: str) -> int:
+    """
+    ASS 时间格式 H:MM:SS.cc 转毫秒
+
+    Examples:
+        >>> ass_time_to_ms("0:01:23.45")
+        83450
+    """
+    match = _ASS_TIME.fullmatch(value.strip())
+    if not match:
+        raise ValueError(f"Invalid ASS time: {value}")
+    hours, minutes, seconds, centiseconds = (int(g) for g in match.groups())
+    return ((hours * 60 + minutes) * 60 + seconds) * 1000 + centiseconds * 10
+
+
+def ms_to_ass_time(ms: int) -> str:
+    """毫秒转 ASS 时间格式 H:MM:SS.cc"""
+    centiseconds = ms // 10
+    hours, rest = divmod(centiseconds, 360000)
+    minutes, rest = divmod(rest, 6000)
+    seconds, centiseconds = divmod(rest, 100)
+    return f"{hours}:{minutes:02d}:{seconds:02d}.{centiseconds:02d}"
+
+
+def ass_event_intervals(content: str) -> list[tuple[int, int]]:
+    """
+    提取 ASS 字幕中所有 Dialogue 事件的时间区间
+
+    Args:
+        content: ASS 文件内容
+
+    Returns:
+        [(start_ms, end_ms)]，按开始时间排序
+    """
+    intervals = []
+    for line in content.splitlines():
+        parsed = _parse_dialogue(line)
+        if parsed:
+            _, start_ms, end_ms, _ = parsed
+            intervals.append((start_ms, end_ms))
+    return sorted(intervals)
+
+
+def shift_ass_events(content: str, offset_ms: int, duration_ms: int) -> str:
+    """
+    把 ASS 字幕平移到某个分片的时间轴
+
+    只保留与 [offset_ms, offset_ms + duration_ms) 重叠的 Dialogue 事件，
+    时间减去 offset_ms 并裁剪到分片范围内；其他行（头部、样式）原样保留。
+
+    Args:
+        content: ASS 文件内容
+        offset_ms: 分片开始时间（毫秒）
+        duration_ms: 分片时长（毫秒）
+
+    Returns:
+        平移后的 ASS 内容
+    """
+    lines = []
+    for line in content.splitlines():
+        parsed = _parse_dialogue(line)
+        if parsed is None:
+            lines.append(line)
+            continue
+
+        prefix, start_ms, end_ms, rest = parsed
+        if end_ms <= offset_ms or start_ms >= offset_ms + duration_ms:
+            continue
+
+        new_start = max(start_ms - offset_ms, 0)
+        new_end = min(end_ms - offset_ms, duration_ms)
+        lines.append(f"{prefix}{ms_to_ass_time(new_start)},{ms_to_ass_time(new_end)},{rest}")
+
+    return "\n".join(lines) + "\n"
+
+
+def _parse_dialogue(line: str) -> Optional[tuple[str, int, int, str]]:
+    """
+    解析 Dialogue 行
+
+    Returns:
+        (行首到 Start 之前的前缀, start_ms, end_ms, End 之后的剩余部分)；非 Dialogue 行返回 None
+    """
+    if not line.startswith("Dialogue:"):
+        return None
+    head, _, body = line.partition(":")
+    fields = body.split(",", 3)
+    if len(fields) < 4:
+        return None
+    layer, start, end, rest = fields
+    return f"{head}:{layer},", ass_time_to_ms(start), ass_time_to_ms(end), rest
+
+
+def plan_smart_render(
+    keyframe_times_ms: list[int],
+    duration_ms: int,
+    event_intervals: list[tuple[int, int]],
+) -> list[tuple[int, int, bool]]:
+    """
+    按字幕事件规划局部重编码
+
+    以关键帧把视频划分为 GOP，与任一字幕事件重叠的 GOP 需要重编码，其余流复制；
+    相邻同类 GOP 合并为一个分片。
+
+    Args:
+        keyframe_times_ms: 关键帧时间（毫秒，升序）
+        duration_ms: 视频总时长（毫秒）
+        event_intervals: 字幕事件区间 [(start_ms, end_ms)]
+
+    Returns:
+        [(start_ms, end_ms, reencode)]，首尾相接覆盖 [0, duration_ms)
+    """
+    bounds = sorted({0, *(t for t in keyframe_times_ms if 0 < t < duration_ms), duration_ms})
+    events = sorted(event_intervals)
+
+    runs: list[list] = []
+    event_idx = 0
+    for start, end in zip(bounds[:-1], bounds[1:], strict=True):
+        # 跳过已在当前 GOP 之前结束的事件
+        while event_idx < len(events) and events[event_idx][1] <= start:
+            event_idx += 1
+        reencode = event_idx < len(events) and events[event_idx][0] < end
+        if runs and runs[-1][2] == reencode:
+            runs[-1][1] = end
+        else:
+            runs.append([start, end, reencode])
+
+    return [tuple(run) for run in runs]
+
+
+def plan_shards(
+    duration_ms: int,
+    keyframe_times_ms: list[int],
+    silences: list[tuple[int, int]],
+    target_shard_ms: int,
+    min_shard_ms: int = 0,
+    require_silence: bool = False,
+) -> list[tuple[int, int]]:
+    """
+    规划分片流水线的时间窗口
+
+    切点必须落在关键帧上（分片视频流复制后可无缝拼接）；在理想切点附近
+    （±target_shard_ms / 4）优先选择落在静音区间内的关键帧，避免把一句话切成两半，
+    附近没有静音关键帧时取最接近理想切点的关键帧。
+    require_silence 时切点只能落在静音区间内：附近没有时取最接近的静音关键帧，
+    完全没有静音关键帧时不切分（相邻窗口合并）。
+
+    Args:
+        duration_ms: 视频总时长（毫秒）
+        keyframe_times_ms: 关键帧时间（毫秒，升序）
+        silences: 静音区间 [(start_ms, end_ms)]
+        target_shard_ms: 目标分片时长（毫秒）
+        min_shard_ms: 最小分片时长（毫秒），更短的分片与前一片合并
+        require_silence: 切点是否必须落在静音区间内（静音区间为语音分段间隙时使用，
+            保证每个分段完整落在一个窗口内）
+
+    Returns:
+        [(start_ms, end_ms)]，首尾相接覆盖 [0, duration_ms)
+    """
+    candidates = sorted(t for t in keyframe_times_ms if 0 < t < duration_ms)
+    pieces = round(duration_ms / target_shard_ms) if target_shard_ms > 0 else 1
+    if pieces <= 1 or not candidates:
+        return [(0, duration_ms)]
+
+    def in_silence(t: int) -> bool:
+        return any(start <= t <= end for start, end in silences)
+
+    search_ms = target_shard_ms // 4
+    fallback = [t for t in candidates if in_silence(t)] if require_silence else candidates
+    cuts: list[int] = []
+    for k in range(1, pieces):
+        target = duration_ms * k / pieces
+        nearby = [t for t in candidates if abs(t - target) <= search_ms]
+        quiet = [t for t in nearby if in_silence(t)]
+        if not (quiet or fallback):
+            continue
+        cut = min(quiet or fallback, key=lambda t: abs(t - target))
+        last = cuts[-1] if cuts else 0
+        if cut - last >= min_shard_ms and cut > last:
+            cuts.append(cut)
+
+    # 最后一片过短时并入前一片
+    while cuts and duration_ms - cuts[-1] < min_shard_ms:
+        cuts.pop()
+
+    bounds = [0, *cuts, duration_ms]
+    return list(zip(bounds[:-1], bounds[1:], strict=True))
+
+
+def speech_gaps(intervals: list[tuple[int, int]], duration_ms: int) -> list[tuple[int, int]]:
+    """
+    语音分段之间的空白区间（用作 plan_shards 的静音区间）
+
+    Args:
+        intervals: 语音分段区间 [(start_ms, end_ms)]（可重叠、无需排序）
+        duration_ms: 总时长（毫秒）
+
+    Returns:
+        [(start_ms, end_ms)]，按时间排序，包含开头和结尾的空白
+    """
+    gaps = []
+    covered_until = 0
+    for start, end in sorted(intervals):
+        if start > covered_until:
+            gaps.append((covered_until, start))
+        covered_until = max(covered_until, end)
+    if covered_until < duration_ms:
+        gaps.append((covered_until, duration_ms))
+    return gaps
@@ -6,8 +6,11 @@ Celery Workers
 from .celery_app import celery_app
 from .tasks import (
     process_video_pipeline,
+    process_multilang_pipeline,
     extract_audio_task,
     transcribe_audio_task,
+    enroll_voices_task,
+    fan_out_languages_task,
     translate_segments_task,
     synthesize_audio_task,
     mux_video_task,
@@ -16,8 +19,11 @@ from .tasks import (
 __all__ = [
     "celery_app",
     "process_video_pipeline",
+    "process_multilang_pipeline",
     "extract_audio_task",
     "transcribe_audio_task",
+    "enroll_voices_task",
+    "fan_out_languages_task",
     "translate_segments_task",
     "synthesize_audio_task",
     "mux_video_task",
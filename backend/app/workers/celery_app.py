@@ -41,11 +41,19 @@ celery_app.autodiscover_tasks(["workers"])
 # 任务路由配置
 celery_app.conf.task_routes = {
     "process_video_pipeline": {"queue": "default"},
+    "process_multilang_pipeline": {"queue": "default"},
+    "process_redub_pipeline": {"queue": "default"},
+    "fan_out_languages": {"queue": "default"},
+    "fail_tasks": {"queue": "default"},
     "extract_audio": {"queue": "media"},
     "transcribe_audio": {"queue": "ai"},
     "translate_segments": {"queue": "ai"},
+    "enroll_voices": {"queue": "ai"},
     "synthesize_audio": {"queue": "ai"},
     "mux_video": {"queue": "media"},
+    "plan_shards": {"queue": "media"},
+    "fan_out_shards": {"queue": "default"},
+    "stitch_shards": {"queue": "media"},
     "workers.tasks.*": {"queue": "default"},
     "workers.steps.extract_audio.*": {"queue": "media"},
     "workers.steps.asr.*": {"queue": "ai"},
@@ -4,39 +4,44 @@ Celery 任务定义
 """
 
 import asyncio
+import os
 import tempfile
 from pathlib import Path
 from typing import Optional
 from uuid import UUID
 
-from celery import chain, group
+from celery import chain, chord, group
 from loguru import logger
 
 from app.config import settings
 from app.database import get_db_context
-from app.integrations.dashscope import ASRClient, LLMClient, TTSClient
+from app.integrations.dashscope import ASRClient, TTSClient
+from app.integrations.dashscope.asr_client import ASRResult
 from app.integrations.oss import OSSClient
-from app.models import TaskStatus, SubtitleMode
-from app.services import TaskService, StorageService, TranslationChunker
-from app.utils.ffmpeg import FFmpegHelper
+from app.models import OutputFormat, TaskStatus, SubtitleMode
+from app.services import (
+    TaskService,
+    StorageService,
+    TranslationService,
+    ASRCacheService,
+    ASRBatcher,
+    TranslationBatcher,
+    SegmentCoalescer,
+    SpeechRatePlanner,
+)
+from app.utils.async_runner import run_async
+from app.utils.audio_duration import audio_bytes_duration_ms
+from app.utils.ffmpeg import URL_FRIENDLY_CONTAINERS, FFmpegHelper
+from app.utils.media_info import MediaInfo
+from app.utils.video_split import plan_shards, speech_gaps
 from .celery_app import celery_app
 
 
-def _run_async(coro):
-    """在 Celery worker 进程内复用事件循环执行异步协程。"""
-    loop = getattr(_run_async, "_loop", None)
-    if loop is None or loop.is_closed():
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        _run_async._loop = loop
-    return loop.run_until_complete(coro)
-
-
 # ==================== 任务链主入口 ====================
 
 
 @celery_app.task(name="process_video_pipeline", bind=True)
-def process_video_pipeline(self, task_id: str):
+def process_video_pipeline(self, task_id: str, queue: Optional[str] = None):
     """
     视频配音处理主流程
 
@@ -47,19 +52,19 @@ def process_video_pipeline(self, task_id: str):
     4. synthesize_audio - 语音合成（并行）
     5. mux_video - 合成最终视频
 
+    启用分片流水线时（预览任务除外），识别完成后交给 plan_shards 判断是否按时间窗口
+    分片执行 3-5 步。
+
     Args:
         task_id: 任务 ID（字符串格式）
+        queue: 所有步骤使用的队列（可选，如预览任务的高优先级队列；默认按 task_routes 路由）
     """
-    logger.info(f"Starting video processing pipeline: task_id={task_id}")
+    logger.info(f"Starting video processing pipeline: task_id={task_id}, queue={queue}")
 
     try:
         # 构建任务链
-        pipeline = chain(
-            extract_audio_task.s(task_id),
-            transcribe_audio_task.s(task_id),
-            translate_segments_task.s(task_id),
-            synthesize_audio_task.s(task_id),
-            mux_video_task.s(task_id),
+        pipeline = _build_pipeline(
+            task_id, queue, shard_pipeline=settings.shard_pipeline_enabled and not queue
         )
 
         # 执行任务链
@@ -76,6 +81,130 @@ def process_video_pipeline(self, task_id: str):
         raise
 
 
+def _build_pipeline(
+    task_id: str, queue: Optional[str] = None, shard_pipeline: bool = False
+):
+    """
+    构建单个任务的完整处理链（extract -> transcribe -> translate -> synthesize -> mux）
+
+    Args:
+        task_id: 任务 ID
+        queue: 所有步骤使用的队列（可选）
+        shard_pipeline: 识别之后交给 plan_shards（由其决定分片或继续执行后续步骤）
+
+    Returns:
+        Celery chain
+    """
+    steps = [
+        extract_audio_task.s(task_id),
+        transcribe_audio_task.s(task_id),
+    ]
+    if shard_pipeline:
+        steps.append(plan_shards_task.s(task_id))
+    else:
+        steps += [
+            translate_segments_task.s(task_id),
+            synthesize_audio_task.s(task_id),
+            mux_video_task.s(task_id),
+        ]
+    if queue:
+        steps = [step.set(queue=queue) for step in steps]
+    return chain(*steps)
+
+
+def _build_dub_chain(task_id: str):
+    """
+    构建识别之后的子链（translate -> synthesize -> mux），用于分片和多语言分支
+
+    Args:
+        task_id: 任务 ID
+
+    Returns:
+        Celery chain
+    """
+    return chain(
+        translate_segments_task.s(task_id, task_id),
+        synthesize_audio_task.s(task_id),
+        mux_video_task.s(task_id),
+    )
+
+
+@celery_app.task(name="process_redub_pipeline", bind=True)
+def process_redub_pipeline(self, task_id: str):
+    """
+    增量重新配音（编辑分段后）
+
+    流程:
+    1. synthesize_audio - 只合成音频已清空的分段，其余分段复用已有音频
+    2. mux_video - 重新混音 / 封装
+
+    Args:
+        task_id: 任务 ID
+    """
+    logger.info(f"Starting re-dub pipeline: task_id={task_id}")
+
+    try:
+        pipeline = chain(
+            synthesize_audio_task.s(task_id, task_id),
+            mux_video_task.s(task_id),
+        )
+        result = pipeline.apply_async()
+
+        logger.info(f"Re-dub pipeline started: task_id={task_id}, chain_id={result.id}")
+
+        return {"task_id": task_id, "chain_id": result.id, "status": "started"}
+
+    except Exception as e:
+        logger.error(f"Failed to start re-dub pipeline: task_id={task_id}, error={e}")
+        _update_task_status(task_id, TaskStatus.FAILED, error_message=str(e))
+        raise
+
+
+@celery_app.task(name="process_multilang_pipeline", bind=True)
+def process_multilang_pipeline(self, task_id: str, sibling_task_ids: list[str]):
+    """
+    多目标语言配音主流程（共享阶段只执行一次）
+
+    流程:
+    1. extract_audio / transcribe_audio / enroll_voices - 在主任务上执行一次
+    2. fan_out_languages - 复制共享产物到各语言任务
+    3. 每种语言并行执行 translate -> synthesize -> mux 子链
+
+    Args:
+        task_id: 主任务 ID（第一个目标语言）
+        sibling_task_ids: 其他目标语言的任务 ID 列表
+    """
+    logger.info(
+        f"Starting multi-language pipeline: task_id={task_id}, "
+        f"siblings={sibling_task_ids}"
+    )
+
+    try:
+        pipeline = chain(
+            extract_audio_task.s(task_id),
+            transcribe_audio_task.s(task_id),
+            enroll_voices_task.s(task_id),
+            fan_out_languages_task.s(task_id, sibling_task_ids),
+        )
+
+        # 共享阶段失败时，同步标记各语言任务失败
+        result = pipeline.apply_async(
+            link_error=fail_tasks.si(
+                sibling_task_ids, f"Shared stage failed on task {task_id}"
+            )
+        )
+
+        logger.info(f"Multi-language pipeline started: task_id={task_id}, chain_id={result.id}")
+
+        return {"task_id": task_id, "chain_id": result.id, "status": "started"}
+
+    except Exception as e:
+        logger.error(f"Failed to start multi-language pipeline: task_id={task_id}, error={e}")
+        for tid in [task_id, *sibling_task_ids]:
+            _update_task_status(tid, TaskStatus.FAILED, error_message=str(e))
+        raise
+
+
 # ==================== Step 1: 提取音频 ====================
 
 
@@ -108,25 +237,60 @@ def extract_audio_task(self, task_id: str):
                 if not task or not task.input_video_path:
                     raise ValueError(f"Task {task_id} not found or missing input video")
 
-                # 下载视频到临时目录
                 temp_dir = tempfile.mkdtemp(prefix=f"task_{task_id}_")
-                local_video = storage_service.download_file(
-                    task.input_video_path, temp_dir
-                )
+                ffmpeg = FFmpegHelper()
+                media_source = None
+                audio_file = None
+                # 预览任务只提取开头一段
+                extract_duration_ms = task.preview_duration_ms
+
+                # 优先通过签名 URL 直接读取音频流，不把视频下载到本地
+                if (
+                    settings.extract_audio_from_url
+                    and Path(task.input_video_path).suffix.lower() in URL_FRIENDLY_CONTAINERS
+                ):
+                    try:
+                        media_source = storage_service.get_download_url(
+                            task.input_video_path, expires=settings.extract_url_expires
+                        )
+                        audio_file = ffmpeg.extract_audio(
+                            media_source,
+                            output_path=f"{temp_dir}/audio.wav",
+                            duration_ms=extract_duration_ms,
+                        )
+                    except Exception as e:
+                        logger.warning(
+                            f"Audio extraction from URL failed, falling back to download: {e}"
+                        )
+                        audio_file = None
 
-                logger.info(f"Downloaded video: {local_video}")
+                if audio_file is None:
+                    # 下载视频到临时目录
+                    media_source = storage_service.download_file(
+                        task.input_video_path, temp_dir
+                    )
+                    logger.info(f"Downloaded video: {media_source}")
 
-                # 提取音频
-                ffmpeg = FFmpegHelper()
-                audio_file = ffmpeg.extract_audio(
-                    local_video, output_path=f"{temp_dir}/audio.wav"
-                )
+                    audio_file = ffmpeg.extract_audio(
+                        media_source,
+                        output_path=f"{temp_dir}/audio.wav",
+                        duration_ms=extract_duration_ms,
+                    )
 
                 logger.info(f"Extracted audio: {audio_file}")
 
-                # 获取视频时长
-                duration_ms = ffmpeg.get_duration_ms(local_video)
+                # 计算音频内容哈希（用于跨任务复用 ASR 结果）
+                task.audio_hash = ASRCacheService.compute_audio_hash(audio_file)
+                logger.info(f"Audio hash: {task.audio_hash}")
+
+                # 探测输入视频（单次 ffprobe），结果存入任务供后续阶段复用
+                media_info = ffmpeg.probe(media_source)
+                duration_ms = media_info.duration_ms
+                if task.is_preview:
+                    # 预览任务的时间轴（混音 / 封装时长）截止到预览窗口
+                    duration_ms = min(duration_ms, task.preview_duration_ms)
                 task.video_duration_ms = duration_ms
+                task.media_info = media_info.to_dict()
 
                 # 上传音频到 OSS
                 audio_path = storage_service.upload_extracted_audio(
@@ -145,7 +309,7 @@ def extract_audio_task(self, task_id: str):
                 import shutil
                 shutil.rmtree(temp_dir)
 
-        _run_async(_extract())
+        run_async(_extract())
 
         # 更新进度
         _update_task_status(task_id, TaskStatus.EXTRACTING, progress=20)
@@ -185,56 +349,74 @@ def transcribe_audio_task(self, previous_result, task_id: str):
             async with get_db_context() as db:
                 task_service = TaskService(db)
                 storage_service = StorageService()
+                cache_service = ASRCacheService(db)
 
                 # 获取任务
                 task = await task_service.get_task(UUID(task_id))
                 if not task or not task.extracted_audio_path:
                     raise ValueError(f"Task {task_id} missing extracted audio")
 
-                # 下载音频
-                temp_dir = tempfile.mkdtemp(prefix=f"task_{task_id}_asr_")
-                local_audio = storage_service.download_file(
-                    task.extracted_audio_path, temp_dir
-                )
+                # 使用任务的源语言作为 language_hints
+                language_hints = [task.source_language]
+                use_cache = settings.asr_cache_enabled and bool(task.audio_hash)
 
-                logger.info(f"Downloaded audio for ASR: {local_audio}")
+                # 优先复用相同音频的识别结果（多语言配音 / 失败重提交）
+                result = None
+                if use_cache:
+                    result = await cache_service.get(
+                        task.audio_hash, settings.asr_model, language_hints
+                    )
 
-                # 语音识别（使用任务的源语言作为 language_hints）
-                asr_client = ASRClient(language_hints=[task.source_language])
-                audio_url = storage_service.get_download_url(
-                    task.extracted_audio_path, expires=3600
-                )
-                result = asr_client.transcribe(audio_url)
+                if result is None:
+                    # 语音识别（ASR 直接读取 OSS 签名 URL，无需下载到本地）
+                    audio_url = storage_service.get_download_url(
+                        task.extracted_audio_path, expires=3600
+                    )
+                    result = _transcribe(
+                        audio_url, language_hints, task.video_duration_ms
+                    )
 
-                logger.info(
-                    f"ASR completed: {len(result.segments)} segments, "
-                    f"duration={result.duration_ms}ms"
-                )
+                    logger.info(
+                        f"ASR completed: {len(result.segments)} segments, "
+                        f"duration={result.duration_ms}ms"
+                    )
 
-                # 创建分段
-                for i, segment in enumerate(result.segments):
-                    await task_service.create_segment(
-                        task_id=UUID(task_id),
-                        segment_index=i,
-                        start_time_ms=segment.start_time_ms,
-                        end_time_ms=segment.end_time_ms,
-                        original_text=segment.text,
-                        speaker_id=getattr(segment, "speaker_id", None),
-                        confidence=getattr(segment, "confidence", None),
-                        emotion=getattr(segment, "emotion", None),
+                    if use_cache:
+                        await cache_service.save(
+                            task.audio_hash, settings.asr_model, language_hints, result
+                        )
+                else:
+                    logger.info(
+                        f"Reusing cached ASR result: {len(result.segments)} segments"
                     )
 
+                # 合并同一说话人的相邻短片段为配音单元（保留原始片段用于字幕）
+                if settings.segment_coalesce_enabled:
+                    segment_data = SegmentCoalescer().coalesce(result.segments)
+                else:
+                    segment_data = [
+                        {
+                            "segment_index": i,
+                            "start_time_ms": segment.start_time_ms,
+                            "end_time_ms": segment.end_time_ms,
+                            "original_text": segment.text,
+                            "speaker_id": segment.speaker_id,
+                            "confidence": segment.confidence,
+                            "emotion": segment.emotion,
+                        }
+                        for i, segment in enumerate(result.segments)
+                    ]
+
+                # 批量创建分段
+                await task_service.create_segments(UUID(task_id), segment_data)
+
                 # 更新分段数量
-                task.segment_count = len(result.segments)
+                task.segment_count = len(segment_data)
                 await db.commit()
 
-                logger.info(f"Created {len(result.segments)} segments")
-
-                # 清理临时文件
-                import shutil
-                shutil.rmtree(temp_dir)
+                logger.info(f"Created {len(segment_data)} segments")
 
-        _run_async(_transcribe())
+        run_async(_transcribe())
 
         # 更新进度
         _update_task_status(task_id, TaskStatus.TRANSCRIBING, progress=40)
@@ -247,13 +429,15 @@ def transcribe_audio_task(self, previous_result, task_id: str):
         raise
 
 
-# ==================== Step 3: 翻译 ====================
+# ==================== 多语言共享阶段 ====================
 
 
-@celery_app.task(name="translate_segments", bind=True)
-def translate_segments_task(self, previous_result, task_id: str):
+@celery_app.task(name="enroll_voices", bind=True)
+def enroll_voices_task(self, previous_result, task_id: str):
     """
-    翻译所有分段
+    为任务的所有说话人复刻声音，并将 voice_id 写入分段
+
+    非声音复刻模型下直接跳过。
 
     Args:
         previous_result: 上一步结果（task_id）
@@ -262,151 +446,235 @@ def translate_segments_task(self, previous_result, task_id: str):
     Returns:
         task_id
     """
-    logger.info(f"[Step 3] Translating segments: task_id={task_id}")
+    if settings.tts_model not in TTSClient.VOICE_CLONE_MODELS:
+        logger.info(f"Skipping voice enrollment (model={settings.tts_model}): task_id={task_id}")
+        return task_id
+
+    logger.info(f"Enrolling voices: task_id={task_id}")
 
     try:
-        # 更新任务状态
-        _update_task_status(
-            task_id, TaskStatus.TRANSLATING, current_step="translate", progress=50
-        )
 
-        async def _translate():
+        async def _enroll():
             async with get_db_context() as db:
                 task_service = TaskService(db)
 
-                # 获取任务和分段
                 task = await task_service.get_task(UUID(task_id), with_segments=True)
-                if not task:
+                if not task or not task.extracted_audio_path:
+                    raise ValueError(f"Task {task_id} missing extracted audio")
+
+                voice_cache = _collect_voice_ids(task.segments)
+                _enroll_missing_speakers(
+                    task_id, task.extracted_audio_path, task.segments, voice_cache
+                )
+
+                for seg in task.segments:
+                    seg.voice_id = voice_cache.get(seg.speaker_id or "default")
+                await db.commit()
+
+        run_async(_enroll())
+
+        return task_id
+
+    except Exception as e:
+        logger.error(f"Voice enrollment failed: task_id={task_id}, error={e}")
+        _update_task_status(task_id, TaskStatus.FAILED, error_message=str(e))
+        raise
+
+
+@celery_app.task(name="fan_out_languages", bind=True)
+def fan_out_languages_task(self, previous_result, task_id: str, sibling_task_ids: list[str]):
+    """
+    将共享阶段产物（提取音频、时长、分段、voice_id）复制到各语言任务，
+    并为每种语言启动并行的 translate -> synthesize -> mux 子链
+
+    Args:
+        previous_result: 上一步结果（task_id）
+        task_id: 主任务 ID
+        sibling_task_ids: 其他目标语言的任务 ID 列表
+
+    Returns:
+        task_id
+    """
+    logger.info(f"Fanning out languages: task_id={task_id}, siblings={sibling_task_ids}")
+
+    try:
+
+        async def _fan_out():
+            async with get_db_context() as db:
+                task_service = TaskService(db)
+
+                primary = await task_service.get_task(UUID(task_id), with_segments=True)
+                if not primary:
                     raise ValueError(f"Task {task_id} not found")
 
-                segments = task.segments
-                logger.info(f"Translating {len(segments)} segments using chunked translation")
+                segment_data = [
+                    {
+                        "segment_index": seg.segment_index,
+                        "start_time_ms": seg.start_time_ms,
+                        "end_time_ms": seg.end_time_ms,
+                        "original_text": seg.original_text,
+                        "speaker_id": seg.speaker_id,
+                        "emotion": seg.emotion,
+                        "confidence": seg.confidence,
+                        "voice_id": seg.voice_id,
+                        "source_spans": seg.source_spans,
+                    }
+                    for seg in sorted(primary.segments, key=lambda s: s.segment_index)
+                ]
+
+                for sibling_id in sibling_task_ids:
+                    sibling = await task_service.get_task(UUID(sibling_id))
+                    if not sibling:
+                        logger.warning(f"Sibling task {sibling_id} not found, skipping")
+                        continue
 
-                # 翻译客户端
-                llm_client = LLMClient()
+                    sibling.extracted_audio_path = primary.extracted_audio_path
+                    sibling.audio_hash = primary.audio_hash
+                    sibling.video_duration_ms = primary.video_duration_ms
+                    sibling.media_info = primary.media_info
+                    sibling.segment_count = primary.segment_count
+                    await task_service.create_segments(UUID(sibling_id), segment_data)
 
-                try:
-                    # ========== 分块翻译（使用 TranslationChunker） ==========
-                    logger.info("Starting chunked translation with overlap context")
+                logger.info(
+                    f"Copied {len(segment_data)} segments to {len(sibling_task_ids)} sibling tasks"
+                )
 
-                    # Step 1: 智能分块
-                    chunks = TranslationChunker.chunk_segments(segments)
-                    logger.info(
-                        f"Segmentation complete: {len(segments)} segments -> {len(chunks)} chunks, "
-                        f"max_chars={TranslationChunker.MAX_CHARS_PER_CHUNK}, "
-                        f"overlap={TranslationChunker.OVERLAP_SEGMENTS}"
-                    )
+        run_async(_fan_out())
 
-                    # 存储所有翻译结果（使用 segment_index 作为 key）
-                    all_translations = {}
+        # 各语言并行子链
+        branches = group(_build_dub_chain(tid) for tid in [task_id, *sibling_task_ids])
+        result = branches.apply_async()
 
-                    # Step 2: 逐块翻译
-                    for chunk_idx, chunk in enumerate(chunks, start=1):
-                        chunk_size = len(chunk)
-                        chunk_indices = [seg.segment_index for seg in chunk]
+        logger.info(f"Language branches started: task_id={task_id}, group_id={result.id}")
 
-                        logger.info(
-                            f"Processing chunk {chunk_idx}/{len(chunks)}: "
-                            f"{chunk_size} segments, indices={chunk_indices}"
-                        )
+        return task_id
 
-                        # 构建输入文本（带 segment_index 标记）
-                        chunk_text = TranslationChunker.build_chunk_text(chunk)
+    except Exception as e:
+        logger.error(f"Language fan-out failed: task_id={task_id}, error={e}")
+        for tid in [task_id, *sibling_task_ids]:
+            _update_task_status(tid, TaskStatus.FAILED, error_message=str(e))
+        raise
 
-                        logger.debug(
-                            f"Chunk {chunk_idx} input ({len(chunk_text)} chars): "
-                            f"{chunk_text[:100]}..."
-                        )
 
-                        # 调用 LLM 翻译
-                        translated_chunk = llm_client.translate(
-                            text=chunk_text,
-                            source_lang=task.source_language,
-                            target_lang=task.target_language,
-                        )
+@celery_app.task(name="fail_tasks")
+def fail_tasks(task_ids: list[str], error_message: str):
+    """
+    批量标记任务失败（用于共享阶段的错误回调）
 
-                        logger.debug(
-                            f"Chunk {chunk_idx} output: {translated_chunk[:100]}..."
-                        )
+    Args:
+        task_ids: 任务 ID 列表
+        error_message: 错误信息
+    """
+    for tid in task_ids:
+        _update_task_status(tid, TaskStatus.FAILED, error_message=error_message)
 
-                        # 解析翻译结果
-                        chunk_translations = TranslationChunker.parse_translation_result(
-                            translated_chunk
-                        )
 
-                        logger.info(
-                            f"Chunk {chunk_idx} parsed: {len(chunk_translations)} translations"
-                        )
+# ==================== Step 3: 翻译 ====================
 
-                        # 合并到总结果（处理重叠：使用 update 覆盖之前的版本）
-                        overlap_count = len(set(chunk_translations.keys()) & set(all_translations.keys()))
-                        if overlap_count > 0:
-                            logger.debug(
-                                f"Chunk {chunk_idx} has {overlap_count} overlapping segments, "
-                                "updating with newer translations"
-                            )
 
-                        all_translations.update(chunk_translations)
+@celery_app.task(name="translate_segments", bind=True)
+def translate_segments_task(self, previous_result, task_id: str):
+    """
+    翻译所有分段
 
-                    # Step 3: 更新所有分段的翻译
-                    logger.info(f"Updating {len(all_translations)} segment translations in database")
+    Args:
+        previous_result: 上一步结果（task_id）
+        task_id: 任务 ID
 
-                    for segment in segments:
-                        if not segment.original_text:
-                            continue
+    Returns:
+        task_id
+    """
+    logger.info(f"[Step 3] Translating segments: task_id={task_id}")
 
-                        # 使用 segment.segment_index（不是 enumerate 的 i）
-                        translated = all_translations.get(
-                            segment.segment_index,
-                            segment.original_text  # 降级：未翻译则保留原文
-                        )
+    try:
+        # 更新任务状态
+        _update_task_status(
+            task_id, TaskStatus.TRANSLATING, current_step="translate", progress=50
+        )
 
-                        await task_service.update_segment_translation(
-                            segment.id, translated
-                        )
+        async def _translate():
+            async with get_db_context() as db:
+                task_service = TaskService(db)
 
-                        logger.debug(
-                            f"Segment {segment.segment_index}: "
-                            f"{segment.original_text[:30]} -> {translated[:30]}"
-                        )
+                # 获取任务和分段
+                task = await task_service.get_task(UUID(task_id), with_segments=True)
+                if not task:
+                    raise ValueError(f"Task {task_id} not found")
 
-                    logger.info(
-                        f"Chunked translation completed successfully: "
-                        f"{len(segments)} segments processed via {len(chunks)} chunks"
+                if task.preview_task_id:
+                    # 预览转完整任务：复用预览阶段的译文 / voice_id / 分段音频
+                    await _reuse_preview_segments(task, task_service, StorageService())
+
+                # 已有译文的分段（复用自预览）不再翻译
+                segments = [seg for seg in task.segments if not seg.translated_text]
+                logger.info(f"Translating {len(segments)} segments using chunked translation")
+
+                on_segment = None
+                tts_jobs = []
+                if settings.llm_stream_translation:
+                    # 流式翻译：每行译文就绪即写库并提前合成音频，合成阶段跳过已完成分段
+                    on_segment = _build_stream_tts_callback(
+                        task_id, task, segments, task_service, tts_jobs
                     )
 
-                except Exception as e:
-                    logger.error(
-                        f"Chunked translation failed: {e}, falling back to segment-by-segment translation"
+                translation_service = TranslationService(
+                    source_lang=task.source_language,
+                    target_lang=task.target_language,
+                    on_segment=on_segment,
+                )
+
+                # 短任务走跨任务批处理；批内未完成的分段再单独翻译
+                translations = await _translate_batched(
+                    segments, task.source_language, task.target_language
+                )
+                pending = [
+                    seg for seg in segments
+                    if seg.original_text and seg.segment_index not in translations
+                ]
+
+                # 分块翻译：失败只在块内二分恢复，缺失索引单独补译
+                if pending:
+                    translations.update(
+                        await translation_service.translate_segments(pending)
                     )
 
-                    # 降级：逐段翻译
-                    for segment in segments:
-                        if not segment.original_text:
-                            continue
+                if tts_jobs:
+                    await asyncio.gather(*tts_jobs)
+                    logger.info(f"Early synthesis finished for {len(tts_jobs)} segments")
 
-                        try:
-                            translated = llm_client.translate(
-                                text=segment.original_text,
-                                source_lang=task.source_language,
-                                target_lang=task.target_language,
-                            )
-                            await task_service.update_segment_translation(segment.id, translated)
+                # 更新所有分段的翻译
+                logger.info(f"Updating {len(translations)} segment translations in database")
 
-                            logger.debug(
-                                f"Fallback: Segment {segment.segment_index} translated individually"
-                            )
+                untranslated = []
+                for segment in segments:
+                    if not segment.original_text:
+                        continue
 
-                        except Exception as seg_err:
-                            logger.error(
-                                f"Segment {segment.segment_index} translation failed: {seg_err}, "
-                                "using original text"
-                            )
-                            await task_service.update_segment_translation(
-                                segment.id, segment.original_text
-                            )
+                    translated = translations.get(segment.segment_index)
+                    if translated is None:
+                        # 降级：补译后仍失败的分段保留原文
+                        untranslated.append(segment.segment_index)
+                        translated = segment.original_text
+
+                    await task_service.update_segment_translation(segment.id, translated)
+
+                    logger.debug(
+                        f"Segment {segment.segment_index}: "
+                        f"{segment.original_text[:30]} -> {translated[:30]}"
+                    )
+
+                if untranslated:
+                    logger.warning(
+                        f"{len(untranslated)} segments kept original text after recovery: "
+                        f"indices={untranslated}"
+                    )
+
+                logger.info(
+                    f"Translation completed: {len(segments)} segments, "
+                    f"{len(segments) - len(untranslated)} translated"
+                )
 
-        _run_async(_translate())
+        run_async(_translate())
 
         # 更新进度
         _update_task_status(task_id, TaskStatus.TRANSLATING, progress=60)
@@ -429,7 +697,7 @@ def synthesize_audio_task(self, previous_result, task_id: str):
 
     流程:
     1. 按 speaker_id 分组分段
-    2. 为每个 speaker 复刻声音（获得 voice_id）
+    2. 为尚未复刻的 speaker 复刻声音（已有 voice_id 的直接复用）
     3. 使用对应的 voice_id 合成每个分段的音频
 
     Args:
@@ -457,119 +725,98 @@ def synthesize_audio_task(self, previous_result, task_id: str):
                 if not task:
                     raise ValueError(f"Task {task_id} not found")
 
-                if not task.extracted_audio_path:
-                    raise ValueError(f"Task {task_id} missing extracted audio")
-
                 segments = task.segments
                 logger.info(f"Synthesizing {len(segments)} segments")
 
-                # 下载原始音频（用于声音复刻）
-                temp_dir = tempfile.mkdtemp(prefix=f"task_{task_id}_tts_")
-                local_audio = storage_service.download_file(
-                    task.extracted_audio_path, temp_dir
-                )
-
                 # TTS 客户端
                 tts_client = TTSClient()
 
                 # 检查是否使用声音复刻模型
-                from app.config import settings
-
                 use_voice_cloning = settings.tts_model in tts_client.VOICE_CLONE_MODELS
 
-                # voice_id 缓存（speaker_id -> voice_id）
-                voice_cache = {}
+                # voice_id 缓存（speaker_id -> voice_id），复用已复刻的声音（如多语言共享阶段）
+                voice_cache = _collect_voice_ids(segments) if use_voice_cloning else {}
 
                 if use_voice_cloning:
-                    logger.info("Using voice cloning model, enrolling speakers...")
-
-                    # 按说话人分组
-                    from collections import defaultdict
-
-                    segments_by_speaker = defaultdict(list)
-                    for seg in segments:
-                        speaker_id = seg.speaker_id or "default"
-                        segments_by_speaker[speaker_id].append(
-                            {
-                                "start_time_ms": seg.start_time_ms,
-                                "end_time_ms": seg.end_time_ms,
-                            }
+                    if not task.extracted_audio_path:
+                        # 分片任务没有提取音频，voice_id 由主任务统一复刻后随分段分发；
+                        # 缺少 voice_id 的说话人回退到系统音色
+                        missing = {
+                            seg.speaker_id or "default"
+                            for seg in segments
+                            if not seg.voice_id and (seg.speaker_id or "default") not in voice_cache
+                        }
+                        if missing:
+                            logger.warning(
+                                f"Task {task_id} has no extracted audio, "
+                                f"speakers {sorted(missing)} fall back to system voice"
+                            )
+                    else:
+                        _enroll_missing_speakers(
+                            task_id, task.extracted_audio_path, segments, voice_cache
                         )
 
+                # 语速规划：按译文估算时长，超出时间槽的分段提高语速合成
+                speech_rate_plans = (
+                    SpeechRatePlanner(task.target_language).plan_segments(
+                        segments, task.video_duration_ms
+                    )
+                    if settings.tts_speech_rate_planning
+                    else {}
+                )
+                if speech_rate_plans:
+                    faster = sum(1 for p in speech_rate_plans.values() if p.speech_rate > 1.0)
                     logger.info(
-                        f"Found {len(segments_by_speaker)} speakers: "
-                        f"{list(segments_by_speaker.keys())}"
+                        f"Speech rate planned: {faster}/{len(speech_rate_plans)} segments sped up"
                     )
 
-                    # 为每个说话人复刻声音
-                    from app.services.voice_service import VoiceService
-
-                    voice_service = VoiceService()
-
-                    for speaker_id, speaker_segments in segments_by_speaker.items():
-                        voice_id = voice_service.get_or_create_voice_id(
-                            task_id=UUID(task_id),
-                            speaker_id=speaker_id,
-                            audio_path=local_audio,
-                            segments=speaker_segments,
-                            cache=voice_cache,
-                        )
-
-                        if not voice_id:
-                            logger.error(
-                                f"Failed to enroll speaker {speaker_id}, "
-                                "using default voice"
-                            )
-
-                    logger.info(f"Voice enrollment completed: {voice_cache}")
-
                 # 为每个分段合成音频
                 for i, segment in enumerate(segments):
                     if not segment.translated_text:
                         logger.warning(f"Segment {segment.id} has no translated text")
                         continue
 
+                    if segment.audio_path:
+                        # 流式翻译阶段已提前合成（译文变更时音频路径会被清空）
+                        logger.debug(f"Segment {segment.segment_index} already synthesized")
+                        continue
+
                     try:
                         # 确定使用的 voice
+                        voice_id = None
                         if use_voice_cloning:
-                            speaker_id = segment.speaker_id or "default"
-                            voice_id = voice_cache.get(speaker_id)
-
-                            if not voice_id:
-                                logger.warning(
-                                    f"No voice_id for speaker {speaker_id}, "
-                                    f"falling back to system voice for segment {i+1}"
-                                )
-                                # 降级：使用系统音色（必须指定voice）
-                                fallback_tts = TTSClient(
-                                    model="cosyvoice-v1",
-                                    voice="longxiaochun"  # 系统默认音色
-                                )
-                                audio_data = fallback_tts.synthesize(segment.translated_text)
-                            else:
+                            # 分段上已有的 voice_id 优先（如编辑分段时指定的音色）
+                            voice_id = segment.voice_id or voice_cache.get(
+                                segment.speaker_id or "default"
+                            )
+                            if voice_id:
                                 # 保存 voice_id 到分段
                                 segment.voice_id = voice_id
                                 await db.commit()
 
-                                # 合成音频
-                                audio_data = tts_client.synthesize(
-                                    segment.translated_text, voice=voice_id
-                                )
-                        else:
-                            # 使用系统音色
-                            audio_data = tts_client.synthesize(segment.translated_text)
+                        plan = speech_rate_plans.get(segment.segment_index)
+                        audio_data = _synthesize_segment_audio(
+                            tts_client,
+                            segment,
+                            voice_id,
+                            use_voice_cloning,
+                            speech_rate=plan.speech_rate if plan else None,
+                        )
 
                         # 上传到 OSS
                         audio_path = storage_service.upload_segment_audio(
                             UUID(task_id), segment.segment_index, audio_data
                         )
 
-                        # 更新分段
-                        await task_service.update_segment_audio(segment.id, audio_path)
+                        # 更新分段（时长直接由内存中的音频数据计算，混音时无需实测）
+                        audio_duration_ms = audio_bytes_duration_ms(audio_data)
+                        await task_service.update_segment_audio(
+                            segment.id, audio_path, audio_duration_ms
+                        )
 
                         logger.debug(
                             f"Synthesized segment {i+1}/{len(segments)}: "
-                            f"{len(audio_data)} bytes -> {audio_path}"
+                            f"{len(audio_data)} bytes, {audio_duration_ms}ms -> {audio_path}"
                         )
 
                     except Exception as e:
@@ -578,12 +825,7 @@ def synthesize_audio_task(self, previous_result, task_id: str):
 
                 logger.info(f"Synthesis completed: {len(segments)} segments")
 
-                # 清理临时文件
-                import shutil
-
-                shutil.rmtree(temp_dir)
-
-        _run_async(_synthesize())
+        run_async(_synthesize())
 
         # 更新进度
         _update_task_status(task_id, TaskStatus.SYNTHESIZING, progress=80)
@@ -602,7 +844,7 @@ def synthesize_audio_task(self, previous_result, task_id: str):
 @celery_app.task(name="mux_video", bind=True)
 def mux_video_task(self, previous_result, task_id: str):
     """
-    合成最终视频
+    合成最终视频（仅音频输出时只混音，不下载和封装视频）
 
     Args:
         previous_result: 上一步结果（task_id）
@@ -632,9 +874,44 @@ def mux_video_task(self, previous_result, task_id: str):
                 # 创建临时目录
                 temp_dir = tempfile.mkdtemp(prefix=f"task_{task_id}_mux_")
 
-                # 下载原视频
-                local_video = storage_service.download_file(
-                    task.input_video_path, temp_dir
+                # 仅音频输出：不下载原视频，混音后直接结束
+                output_format = task.output_format or OutputFormat.MP4
+                audio_only = output_format.is_audio_only
+
+                ffmpeg = FFmpegHelper()
+
+                # 下载原视频（预览 / 分片任务通过签名 URL 只读取需要的一段，不下载整个视频）
+                local_video = None
+                if not audio_only:
+                    url_friendly = (
+                        Path(task.input_video_path).suffix.lower() in URL_FRIENDLY_CONTAINERS
+                    )
+                    if (task.is_preview or task.is_shard) and url_friendly:
+                        local_video = storage_service.get_download_url(
+                            task.input_video_path, expires=settings.extract_url_expires
+                        )
+                    else:
+                        local_video = storage_service.download_file(
+                            task.input_video_path, temp_dir
+                        )
+                    if task.is_shard and url_friendly:
+                        # 分片任务：通过 URL 截取自己的时间窗口（起点为关键帧，流复制）；
+                        # 其他容器的窗口已由 plan_shards 在主任务上切好并作为分片输入
+                        local_video = ffmpeg.cut_video(
+                            local_video,
+                            output_path=f"{temp_dir}/shard.mp4",
+                            start_ms=task.shard_start_ms,
+                            duration_ms=task.shard_end_ms - task.shard_start_ms,
+                        )
+
+                # 混音所需的音频时长：优先使用合成时记录的实际时长；
+                # 未记录的分段（旧数据）估算明显短于时间槽时免于实测
+                speech_rate_plans = (
+                    SpeechRatePlanner(task.target_language).plan_segments(
+                        task.segments, task.video_duration_ms
+                    )
+                    if settings.tts_speech_rate_planning
+                    else {}
                 )
 
                 # 下载所有音频分段
@@ -644,23 +921,59 @@ def mux_video_task(self, previous_result, task_id: str):
                         local_audio = storage_service.download_file(
                             segment.audio_path, temp_dir
                         )
-                        audio_files.append(
-                            {
-                                "path": local_audio,
-                                "start_ms": segment.start_time_ms,
-                                "end_ms": segment.end_time_ms,
-                            }
-                        )
+                        audio_file = {
+                            "path": local_audio,
+                            "start_ms": segment.start_time_ms,
+                            "end_ms": segment.end_time_ms,
+                        }
+                        plan = speech_rate_plans.get(segment.segment_index)
+                        if segment.audio_duration_ms is not None:
+                            audio_file["duration_ms"] = segment.audio_duration_ms
+                        elif plan:
+                            audio_file["estimated_ms"] = plan.estimated_ms
+                        audio_files.append(audio_file)
 
                 logger.info(f"Downloaded {len(audio_files)} audio segments")
 
-                # 合成音频
-                ffmpeg = FFmpegHelper()
-                merged_audio = ffmpeg.merge_audio_segments(
-                    audio_files,
-                    output_path=f"{temp_dir}/merged_audio.mp3",
-                    total_duration_ms=task.video_duration_ms,
+                if task.media_info:
+                    media_info = MediaInfo.from_dict(task.media_info)
+                elif audio_only:
+                    # 仅音频输出不探测视频，字幕按默认分辨率布局
+                    media_info = MediaInfo(duration_ms=task.video_duration_ms or 0)
+                else:
+                    media_info = ffmpeg.probe(local_video)
+                mix_options = {
+                    "total_duration_ms": task.video_duration_ms,
+                    "check_margin": settings.tts_duration_check_margin,
+                    "max_lead_ms": settings.mix_max_lead_ms,
+                    "max_lag_ms": settings.mix_max_lag_ms,
+                    "max_speed": settings.mix_max_speed,
+                }
+
+                # HLS 输出只支持单次封装
+                is_hls = output_format == OutputFormat.HLS
+                # 烧录模式：先混音为 M4A 并发布，视频编码期间即可试听，封装时音轨直接复制
+                publish_audio_early = (
+                    settings.mux_publish_audio_early
+                    and not is_hls
+                    and not audio_only
+                    and not task.is_shard  # 分片的音轨不单独发布，拼接后随视频一起输出
+                    and (task.subtitle_mode or SubtitleMode.BURN) == SubtitleMode.BURN
                 )
+                single_pass = (settings.mux_single_pass or is_hls) and not publish_audio_early
+
+                # 合成音频（单次封装模式下混音直接在最终 FFmpeg 中完成）
+                merged_audio = None
+                if not single_pass and not audio_only:
+                    merged_audio = ffmpeg.merge_audio_segments(
+                        audio_files,
+                        output_path=(
+                            f"{temp_dir}/merged_audio.m4a"
+                            if publish_audio_early
+                            else f"{temp_dir}/merged_audio.mp3"
+                        ),
+                        **mix_options,
+                    )
 
                 # ========== 字幕生成 ==========
                 subtitle_mode = task.subtitle_mode or SubtitleMode.BURN
@@ -668,21 +981,11 @@ def mux_video_task(self, previous_result, task_id: str):
 
                 if subtitle_mode != SubtitleMode.NONE:
                     # 准备分段数据
-                    sorted_segments = sorted(task.segments, key=lambda s: s.segment_index)
-                    subtitle_segments = [
-                        {
-                            "start_time_ms": seg.start_time_ms,
-                            "end_time_ms": seg.end_time_ms,
-                            "original_text": seg.original_text or "",
-                            "translated_text": seg.translated_text or "",
-                        }
-                        for seg in sorted_segments
-                        if seg.original_text or seg.translated_text
-                    ]
+                    subtitle_segments = _subtitle_segments(task.segments)
 
                     if subtitle_segments:
-                        # 获取视频分辨率用于字幕布局
-                        video_width, video_height = ffmpeg.get_video_resolution(local_video)
+                        # 获取视频分辨率用于字幕布局（优先使用提取阶段的探测结果）
+                        video_width, video_height = media_info.resolution
 
                         # 生成 ASS 字幕文件
                         local_subtitle = ffmpeg.generate_ass_subtitle(
@@ -702,8 +1005,134 @@ def mux_video_task(self, previous_result, task_id: str):
 
                         logger.info(f"Subtitle file uploaded: {oss_subtitle_path}")
 
+                if publish_audio_early:
+                    # 视频编码前发布配音音轨和字幕（结果接口按 audio_ready/subtitle_ready 返回）
+                    task.output_audio_path = storage_service.upload_output_audio(
+                        UUID(task_id), merged_audio
+                    )
+                    await db.commit()
+
+                    logger.info(f"Dubbed audio published before video encode: {task.output_audio_path}")
+
+                # ========== 仅音频输出 ==========
+                if audio_only:
+                    output_audio = ffmpeg.merge_audio_segments(
+                        audio_files,
+                        output_path=f"{temp_dir}/output.{output_format.value.lower()}",
+                        **mix_options,
+                    )
+                    task.output_audio_path = storage_service.upload_output_audio(
+                        UUID(task_id), output_audio
+                    )
+                    await db.commit()
+
+                    logger.info(f"Output audio uploaded (audio only): {task.output_audio_path}")
+
+                    import shutil
+                    shutil.rmtree(temp_dir)
+                    return
+
                 # ========== 视频合成 ==========
-                if subtitle_mode == SubtitleMode.BURN and subtitle_path:
+                video_source = local_video
+                burn_subtitle_path = (
+                    subtitle_path if subtitle_mode == SubtitleMode.BURN else None
+                )
+                # 软字幕模式：字幕作为轨道封装进输出容器，视频流直接复制
+                soft_subtitle_path = (
+                    subtitle_path if subtitle_mode == SubtitleMode.SOFT else None
+                )
+
+                burn_workers = settings.burn_parallel_workers or os.cpu_count() or 1
+                if (
+                    burn_subtitle_path
+                    and settings.burn_smart_render
+                    and not task.is_preview  # 局部重编码需要切分整个视频，预览只需开头一段
+                    and media_info.video_codec == "h264"
+                    and task.video_duration_ms
+                ):
+                    # 对白稀疏的视频：只重编码有字幕事件的 GOP，其余流复制
+                    smart_output = ffmpeg.smart_burn_subtitles(
+                        video_path=local_video,
+                        subtitle_path=burn_subtitle_path,
+                        output_path=f"{temp_dir}/burned.mp4",
+                        duration_ms=task.video_duration_ms,
+                        media_info=media_info,
+                        workers=burn_workers,
+                        max_reencode_ratio=settings.burn_smart_render_max_ratio,
+                    )
+                    if smart_output:
+                        video_source = smart_output
+                        burn_subtitle_path = None
+
+                if (
+                    burn_subtitle_path
+                    and burn_workers > 1
+                    and not task.is_preview  # 关键帧探测会读完整个视频
+                    and task.video_duration_ms
+                    and task.video_duration_ms >= 2 * settings.burn_min_piece_ms
+                ):
+                    # 长视频：按关键帧分片并行烧录，之后的封装只复制视频流
+                    video_source = ffmpeg.burn_subtitles_parallel(
+                        video_path=local_video,
+                        subtitle_path=burn_subtitle_path,
+                        output_path=f"{temp_dir}/burned.mp4",
+                        duration_ms=task.video_duration_ms,
+                        workers=burn_workers,
+                        min_piece_ms=settings.burn_min_piece_ms,
+                    )
+                    burn_subtitle_path = None
+
+                video_path = None
+                if is_hls:
+                    # HLS：分片写完即上传，播放列表随后更新，合成过程中即可播放
+                    playlist_path = storage_service.build_task_path(
+                        UUID(task_id), "hls/index.m3u8"
+                    )
+                    task.output_video_path = playlist_path
+                    await db.commit()
+
+                    def upload_hls(new_files: list[str], local_playlist: str) -> None:
+                        for local_file in new_files:
+                            storage_service.upload_hls_file(UUID(task_id), local_file)
+                        storage_service.upload_hls_file(UUID(task_id), local_playlist)
+
+                    ffmpeg.mux_dubbed_video(
+                        video_path=video_source,
+                        segments=audio_files,
+                        output_path=f"{temp_dir}/hls/index.m3u8",
+                        subtitle_path=burn_subtitle_path,
+                        soft_subtitle_path=soft_subtitle_path,
+                        hls_segment_seconds=settings.hls_segment_seconds,
+                        on_hls_update=upload_hls,
+                        **mix_options,
+                    )
+                    video_path = playlist_path
+                elif single_pass and settings.mux_stream_upload and not task.is_shard:
+                    # 单次封装 + 边编码边上传：FFmpeg 输出分片 MP4 到管道，直接分片上传 OSS
+                    # （分片任务的输出还要流复制拼接，使用普通 MP4）
+                    video_path = ffmpeg.mux_dubbed_video(
+                        video_path=video_source,
+                        segments=audio_files,
+                        output_path=f"{temp_dir}/output.mp4",
+                        subtitle_path=burn_subtitle_path,
+                        soft_subtitle_path=soft_subtitle_path,
+                        stream_to=lambda stream: storage_service.upload_output_video_stream(
+                            UUID(task_id), stream
+                        ),
+                        **mix_options,
+                    )
+                elif single_pass:
+                    # 配音分段 + 原视频（+ 烧录字幕）一次 FFmpeg 调用，音频只编码一次
+                    output_video = ffmpeg.mux_dubbed_video(
+                        video_path=video_source,
+                        segments=audio_files,
+                        output_path=f"{temp_dir}/output.mp4",
+                        subtitle_path=burn_subtitle_path,
+                        soft_subtitle_path=soft_subtitle_path,
+                        **mix_options,
+                    )
+                    logger.info(f"Video muxed in one pass: {output_video}")
+                elif burn_subtitle_path:
                     # 烧录模式：替换音轨 + 烧录字幕（单次 FFmpeg 调用）
                     output_video = ffmpeg.replace_audio_and_burn_subtitles(
                         video_path=local_video,
@@ -713,18 +1142,21 @@ def mux_video_task(self, previous_result, task_id: str):
                     )
                     logger.info(f"Video muxed with burned subtitles: {output_video}")
                 else:
-                    # 外挂模式 / 无字幕：仅替换音轨（视频流 copy，速度快）
+                    # 外挂 / 软字幕 / 无字幕 / 已并行烧录：仅替换音轨（视频流 copy，速度快）
                     output_video = ffmpeg.replace_audio(
-                        video_path=local_video,
+                        video_path=video_source,
                         audio_path=merged_audio,
                         output_path=f"{temp_dir}/output.mp4",
+                        soft_subtitle_path=soft_subtitle_path,
+                        duration_ms=task.video_duration_ms,
                     )
                     logger.info(f"Video muxed: {output_video}")
 
                 # 上传最终视频
-                video_path = storage_service.upload_output_video(
-                    UUID(task_id), output_video
-                )
+                if video_path is None:
+                    video_path = storage_service.upload_output_video(
+                        UUID(task_id), output_video
+                    )
 
                 task.output_video_path = video_path
                 await db.commit()
@@ -735,7 +1167,7 @@ def mux_video_task(self, previous_result, task_id: str):
                 import shutil
                 shutil.rmtree(temp_dir)
 
-        _run_async(_mux())
+        run_async(_mux())
 
         # 标记任务完成
         _update_task_status(
@@ -752,9 +1184,360 @@ def mux_video_task(self, previous_result, task_id: str):
         raise
 
 
+# ==================== 分片流水线 ====================
+
+
+@celery_app.task(name="plan_shards", bind=True)
+def plan_shards_task(self, previous_result, task_id: str):
+    """
+    规划超长视频的分片流水线（识别完成后执行）
+
+    分片的阶段：translate -> synthesize -> mux 按时间窗口在各分片上并行执行；
+    extract / transcribe / enroll_voices 不分片，在主任务上对全片执行一次，
+    保证说话人 ID 和复刻的声音在各分片间一致。
+
+    切点只取语音间隙中的关键帧，为每个窗口创建分片任务（无法按 URL 读取的容器
+    在这里下载一次并切好各窗口）；之后在主任务上复刻声音，再由 fan_out_shards
+    分发分段。
+    视频较短、预览任务或非 MP4 输出时直接在主任务上继续执行后续步骤。
+
+    Args:
+        previous_result: 上一步结果（task_id）
+        task_id: 主任务 ID
+
+    Returns:
+        分片任务 ID 列表（未分片时为空）
+    """
+    logger.info(f"Planning shards: task_id={task_id}")
+
+    try:
+
+        async def _plan() -> list[str]:
+            async with get_db_context() as db:
+                task_service = TaskService(db)
+                storage_service = StorageService()
+
+                task = await task_service.get_task(UUID(task_id), with_segments=True)
+                if not task or not task.input_video_path:
+                    raise ValueError(f"Task {task_id} not found or missing input video")
+
+                if (
+                    task.is_preview
+                    or (task.output_format or OutputFormat.MP4) != OutputFormat.MP4
+                    or (task.video_duration_ms or 0) < settings.shard_min_duration_ms
+                ):
+                    return []
+
+                temp_dir = tempfile.mkdtemp(prefix=f"task_{task_id}_shards_")
+                try:
+                    ffmpeg = FFmpegHelper()
+                    # 关键帧探测只读取包标记，优先通过签名 URL 访问；
+                    # 其他容器只在主任务上下载一次，切好的窗口作为各分片的输入
+                    suffix = Path(task.input_video_path).suffix.lower()
+                    url_friendly = suffix in URL_FRIENDLY_CONTAINERS
+                    if url_friendly:
+                        media_source = storage_service.get_download_url(
+                            task.input_video_path, expires=settings.extract_url_expires
+                        )
+                    else:
+                        media_source = storage_service.download_file(
+                            task.input_video_path, temp_dir
+                        )
+                    keyframes = ffmpeg.get_keyframe_times_ms(media_source)
+
+                    # 切点只落在语音分段的间隙中，每个分段完整属于一个分片
+                    gaps = speech_gaps(
+                        [(seg.start_time_ms, seg.end_time_ms) for seg in task.segments],
+                        task.video_duration_ms,
+                    )
+                    windows = plan_shards(
+                        task.video_duration_ms,
+                        keyframes,
+                        gaps,
+                        target_shard_ms=settings.shard_target_ms,
+                        min_shard_ms=settings.shard_min_ms,
+                        require_silence=True,
+                    )
+                    if len(windows) <= 1:
+                        return []
+
+                    shards = await task_service.create_shard_tasks(task, windows)
+                    logger.info(f"Shard windows: task_id={task_id}, windows={windows}")
+
+                    if not url_friendly:
+                        for shard in shards:
+                            window_file = ffmpeg.cut_video(
+                                media_source,
+                                output_path=f"{temp_dir}/shard_{shard.shard_index}{suffix}",
+                                start_ms=shard.shard_start_ms,
+                                duration_ms=shard.shard_end_ms - shard.shard_start_ms,
+                            )
+                            with open(window_file, "rb") as f:
+                                shard.input_video_path = storage_service.upload_input_video(
+                                    shard.id, f, window_file
+                                )
+                            os.remove(window_file)
+                        await db.commit()
+
+                    return [str(shard.id) for shard in shards]
+                finally:
+                    import shutil
+                    shutil.rmtree(temp_dir, ignore_errors=True)
+
+        shard_ids = run_async(_plan())
+
+        if not shard_ids:
+            result = _build_dub_chain(task_id).apply_async()
+            logger.info(f"Continuing without sharding: task_id={task_id}, chain_id={result.id}")
+            return []
+
+        # 声音复刻在主任务上执行一次，各分片沿用同一组 voice_id
+        result = chain(
+            enroll_voices_task.s(task_id, task_id),
+            fan_out_shards_task.s(task_id, shard_ids),
+        ).apply_async(
+            link_error=fail_tasks.si(
+                [task_id, *shard_ids], f"Shard planning failed on task {task_id}"
+            )
+        )
+
+        logger.info(
+            f"Shard pipeline planned: task_id={task_id}, shards={len(shard_ids)}, "
+            f"chain_id={result.id}"
+        )
+
+        return shard_ids
+
+    except Exception as e:
+        logger.error(f"Shard planning failed: task_id={task_id}, error={e}")
+        _update_task_status(task_id, TaskStatus.FAILED, error_message=str(e))
+        raise
+
+
+@celery_app.task(name="fan_out_shards", bind=True)
+def fan_out_shards_task(self, previous_result, task_id: str, shard_ids: list[str]):
+    """
+    把主任务的分段按时间窗口分发到各分片（时间平移到窗口起点，保留序号和 voice_id），
+    并行启动各分片的 translate -> synthesize -> mux 子链，全部完成后由 stitch_shards 拼接
+
+    分段按开始时间归属分片。
+
+    Args:
+        previous_result: 上一步结果（task_id）
+        task_id: 主任务 ID
+        shard_ids: 分片任务 ID 列表
+
+    Returns:
+        task_id
+    """
+    logger.info(f"Fanning out shards: task_id={task_id}, shards={len(shard_ids)}")
+
+    try:
+
+        async def _fan_out():
+            async with get_db_context() as db:
+                task_service = TaskService(db)
+
+                task = await task_service.get_task(UUID(task_id), with_segments=True)
+                if not task:
+                    raise ValueError(f"Task {task_id} not found")
+
+                shards = await task_service.list_shard_tasks(UUID(task_id))
+                segments = sorted(task.segments, key=lambda s: s.segment_index)
+                for shard in shards:
+                    offset = shard.shard_start_ms
+                    segment_data = [
+                        {
+                            "segment_index": seg.segment_index,
+                            "start_time_ms": seg.start_time_ms - offset,
+                            "end_time_ms": seg.end_time_ms - offset,
+                            "original_text": seg.original_text,
+                            "speaker_id": seg.speaker_id,
+                            "emotion": seg.emotion,
+                            "confidence": seg.confidence,
+                            "voice_id": seg.voice_id,
+                            "source_spans": _shift_source_spans(seg.source_spans, -offset),
+                        }
+                        for seg in segments
+                        if shard.shard_start_ms <= seg.start_time_ms < shard.shard_end_ms
+                    ]
+                    shard.segment_count = len(segment_data)
+                    await task_service.create_segments(shard.id, segment_data)
+
+        run_async(_fan_out())
+
+        _update_task_status(
+            task_id, TaskStatus.TRANSLATING, current_step="shards", progress=40
+        )
+
+        # 各分片并行子链，全部完成后拼接；任一分片失败时主任务标记失败
+        stitch = stitch_shards_task.si(task_id).on_error(
+            fail_tasks.si([task_id], f"Shard pipeline failed on task {task_id}")
+        )
+        result = chord(group(_build_dub_chain(sid) for sid in shard_ids), stitch).apply_async()
+
+        logger.info(f"Shard branches started: task_id={task_id}, chord_id={result.id}")
+
+        return task_id
+
+    except Exception as e:
+        logger.error(f"Shard fan-out failed: task_id={task_id}, error={e}")
+        for tid in [task_id, *shard_ids]:
+            _update_task_status(tid, TaskStatus.FAILED, error_message=str(e))
+        raise
+
+
+@celery_app.task(name="stitch_shards", bind=True)
+def stitch_shards_task(self, task_id: str):
+    """
+    拼接分片任务的输出
+
+    分片视频流复制拼接为最终视频（软字幕在同一次拼接中封装）；分片合成的译文和音频
+    按分段序号写回主任务，字幕文件按完整分段统一生成。
+
+    Args:
+        task_id: 主任务 ID
+
+    Returns:
+        task_id
+    """
+    logger.info(f"Stitching shards: task_id={task_id}")
+
+    try:
+        _update_task_status(
+            task_id, TaskStatus.MUXING, current_step="stitch_shards", progress=95
+        )
+
+        async def _stitch():
+            async with get_db_context() as db:
+                task_service = TaskService(db)
+                storage_service = StorageService()
+
+                task = await task_service.get_task(UUID(task_id), with_segments=True)
+                if not task:
+                    raise ValueError(f"Task {task_id} not found")
+
+                shards = await task_service.list_shard_tasks(UUID(task_id), with_segments=True)
+                missing = [shard.shard_index for shard in shards if not shard.output_video_path]
+                if not shards or missing:
+                    raise ValueError(f"Task {task_id} has unfinished shards: {missing}")
+
+                # 分片产物写回主任务的分段（分片保留了主任务的分段序号）
+                segments_by_index = {seg.segment_index: seg for seg in task.segments}
+                for shard in shards:
+                    for shard_seg in shard.segments:
+                        seg = segments_by_index.get(shard_seg.segment_index)
+                        if seg is None:
+                            continue
+                        seg.translated_text = shard_seg.translated_text
+                        seg.voice_id = shard_seg.voice_id
+                        seg.audio_path = shard_seg.audio_path
+                        seg.audio_duration_ms = shard_seg.audio_duration_ms
+
+                temp_dir = tempfile.mkdtemp(prefix=f"task_{task_id}_stitch_")
+                ffmpeg = FFmpegHelper()
+
+                # 可下载的字幕文件按完整分段生成（与未分片的封装一致，无论是否烧录都上传）；
+                # 烧录模式的画面字幕已由各分片烧录
+                subtitle_mode = task.subtitle_mode or SubtitleMode.BURN
+                subtitle_segments = _subtitle_segments(task.segments)
+                local_subtitle = None
+                if subtitle_mode != SubtitleMode.NONE and subtitle_segments:
+                    video_width, video_height = MediaInfo.from_dict(task.media_info).resolution
+                    local_subtitle = ffmpeg.generate_ass_subtitle(
+                        segments=subtitle_segments,
+                        output_path=f"{temp_dir}/subtitle.ass",
+                        subtitle_type="bilingual",
+                        video_width=video_width,
+                        video_height=video_height,
+                    )
+                    task.subtitle_file_path = storage_service.upload_subtitle_file(
+                        UUID(task_id), local_subtitle
+                    )
+
+                # 分片输出编码参数一致（同一源视频流复制或同一参数烧录），直接流复制拼接
+                pieces = [
+                    storage_service.download_file(
+                        shard.output_video_path, f"{temp_dir}/shard_{shard.shard_index}"
+                    )
+                    for shard in shards
+                ]
+                output_video = ffmpeg.concat_videos(
+                    pieces,
+                    f"{temp_dir}/output.mp4",
+                    soft_subtitle_path=(
+                        local_subtitle if subtitle_mode == SubtitleMode.SOFT else None
+                    ),
+                )
+
+                task.output_video_path = storage_service.upload_output_video(
+                    UUID(task_id), output_video
+                )
+                await db.commit()
+
+                logger.info(
+                    f"Shards stitched: task_id={task_id}, shards={len(shards)}, "
+                    f"path={task.output_video_path}"
+                )
+
+                import shutil
+                shutil.rmtree(temp_dir)
+
+        run_async(_stitch())
+
+        _update_task_status(
+            task_id, TaskStatus.COMPLETED, current_step="completed", progress=100
+        )
+
+        return task_id
+
+    except Exception as e:
+        logger.error(f"Shard stitching failed: task_id={task_id}, error={e}")
+        _update_task_status(task_id, TaskStatus.FAILED, error_message=str(e))
+        raise
+
+
 # ==================== 辅助函数 ====================
 
 
+def _shift_source_spans(source_spans: Optional[list], offset_ms: int) -> Optional[list]:
+    """平移合并前原始片段的时间（无原始片段时返回 None）"""
+    if not source_spans:
+        return None
+    return [
+        {
+            **span,
+            "start_time_ms": span["start_time_ms"] + offset_ms,
+            "end_time_ms": span["end_time_ms"] + offset_ms,
+        }
+        for span in source_spans
+    ]
+
+
+def _subtitle_segments(segments) -> list[dict]:
+    """
+    整理生成字幕所需的分段数据（按序号排序，跳过无文本的分段）
+
+    Args:
+        segments: Segment 列表
+
+    Returns:
+        generate_ass_subtitle 的 segments 参数
+    """
+    return [
+        {
+            "start_time_ms": seg.start_time_ms,
+            "end_time_ms": seg.end_time_ms,
+            "original_text": seg.original_text or "",
+            "translated_text": seg.translated_text or "",
+            "source_spans": seg.source_spans,
+        }
+        for seg in sorted(segments, key=lambda s: s.segment_index)
+        if seg.original_text or seg.translated_text
+    ]
+
+
+
 def _update_task_status(
     task_id: str,
     status: TaskStatus,
@@ -780,4 +1563,350 @@ def _update_task_status(
                 UUID(task_id), status, current_step, progress, error_message
             )
 
-    _run_async(_update())
+    run_async(_update())
+
+
+def _transcribe(
+    audio_url: str, language_hints: list[str], duration_ms: Optional[int]
+) -> ASRResult:
+    """
+    语音识别：短音频走跨任务批处理，其余（或批处理超时）单独提交
+
+    Args:
+        audio_url: 音频签名 URL
+        language_hints: 语言提示
+        duration_ms: 音频时长（毫秒，未知时不参与批处理）
+
+    Returns:
+        ASRResult 识别结果
+    """
+    use_batch = (
+        settings.asr_batch_enabled
+        and duration_ms is not None
+        and duration_ms <= settings.asr_batch_max_duration_ms
+    )
+
+    if use_batch:
+        try:
+            return ASRBatcher().transcribe(audio_url, language_hints)
+        except TimeoutError as e:
+            logger.warning(f"Batched ASR timed out, submitting individually: {e}")
+
+    return ASRClient(language_hints=language_hints).transcribe(audio_url)
+
+
+async def _translate_batched(segments, source_lang: str, target_lang: str) -> dict[int, str]:
+    """
+    通过跨任务批处理翻译短任务的分段
+
+    仅在启用批处理、未启用流式翻译且分段数不超过 llm_batch_max_segments 时生效；
+    超时或失败时返回已获得的部分（可能为空），由调用方单独翻译其余分段。
+
+    Args:
+        segments: Segment 列表
+        source_lang: 源语言代码
+        target_lang: 目标语言代码
+
+    Returns:
+        segment_index -> 译文 映射
+    """
+    texts_segments = [seg for seg in segments if seg.original_text]
+    use_batch = (
+        settings.llm_batch_enabled
+        and not settings.llm_stream_translation
+        and 0 < len(texts_segments) <= settings.llm_batch_max_segments
+    )
+    if not use_batch:
+        return {}
+
+    loop = asyncio.get_running_loop()
+    try:
+        # 批处理器是同步阻塞的（轮询 Redis），放到线程池中执行
+        translated = await loop.run_in_executor(
+            None,
+            TranslationBatcher().translate,
+            [seg.original_text for seg in texts_segments],
+            source_lang,
+            target_lang,
+        )
+    except Exception as e:
+        logger.warning(f"Batched translation unavailable, translating individually: {e}")
+        return {}
+
+    return {
+        seg.segment_index: text
+        for seg, text in zip(texts_segments, translated, strict=True)
+        if text
+    }
+
+
+def _synthesize_segment_audio(
+    tts_client: TTSClient,
+    segment,
+    voice_id: Optional[str],
+    use_voice_cloning: bool,
+    speech_rate: Optional[float] = None,
+) -> bytes:
+    """
+    合成单个分段的音频
+
+    Args:
+        tts_client: TTS 客户端
+        segment: Segment 对象（使用 translated_text）
+        voice_id: 复刻音色 ID（声音复刻模式）
+        use_voice_cloning: 是否使用声音复刻模型
+        speech_rate: 语速（可选，由 SpeechRatePlanner 规划）
+
+    Returns:
+        音频数据
+    """
+    if not use_voice_cloning:
+        # 使用系统音色
+        return tts_client.synthesize(segment.translated_text, speech_rate=speech_rate)
+
+    if not voice_id:
+        logger.warning(
+            f"No voice_id for speaker {segment.speaker_id or 'default'}, "
+            f"falling back to system voice for segment {segment.segment_index}"
+        )
+        # 降级：使用系统音色（必须指定voice）
+        fallback_tts = TTSClient(
+            model="cosyvoice-v1",
+            voice="longxiaochun"  # 系统默认音色
+        )
+        return fallback_tts.synthesize(segment.translated_text, speech_rate=speech_rate)
+
+    return tts_client.synthesize(
+        segment.translated_text, voice=voice_id, speech_rate=speech_rate
+    )
+
+
+def _build_stream_tts_callback(task_id: str, task, segments, task_service, tts_jobs: list):
+    """
+    构建流式翻译回调：分段译文就绪时写库，并在后台合成该分段音频
+
+    同一 AsyncSession 不能并发使用，数据库操作通过锁串行化；
+    TTS 合成与上传在线程池中执行，并发数受 llm_stream_tts_concurrency 限制。
+    提前合成失败的分段保持无音频，由合成阶段重新处理。
+
+    Args:
+        task_id: 任务 ID
+        task: Task 对象
+        segments: Segment 列表
+        task_service: 任务服务（共享会话）
+        tts_jobs: 收集后台合成任务的列表（调用方负责等待）
+
+    Returns:
+        on_segment 回调
+    """
+    segments_by_index = {seg.segment_index: seg for seg in segments}
+    storage_service = StorageService()
+    tts_client = TTSClient()
+    use_voice_cloning = settings.tts_model in tts_client.VOICE_CLONE_MODELS
+
+    voice_cache = _collect_voice_ids(segments) if use_voice_cloning else {}
+    if use_voice_cloning and task.extracted_audio_path:
+        _enroll_missing_speakers(task_id, task.extracted_audio_path, segments, voice_cache)
+
+    # 时间槽只取决于分段时间轴，译文未就绪时即可计算
+    planner = SpeechRatePlanner(task.target_language) if settings.tts_speech_rate_planning else None
+    slots = SpeechRatePlanner.slots(segments, task.video_duration_ms) if planner else {}
+
+    db_lock = asyncio.Lock()
+    tts_semaphore = asyncio.Semaphore(settings.llm_stream_tts_concurrency)
+
+    async def synthesize_early(segment, voice_id: Optional[str]):
+        loop = asyncio.get_running_loop()
+        speech_rate = None
+        if planner and segment.segment_index in slots:
+            speech_rate = planner.plan(
+                segment.translated_text, slots[segment.segment_index]
+            ).speech_rate
+
+        async with tts_semaphore:
+            try:
+                audio_data = await loop.run_in_executor(
+                    None,
+                    _synthesize_segment_audio,
+                    tts_client,
+                    segment,
+                    voice_id,
+                    use_voice_cloning,
+                    speech_rate,
+                )
+                audio_path = await loop.run_in_executor(
+                    None,
+                    storage_service.upload_segment_audio,
+                    UUID(task_id),
+                    segment.segment_index,
+                    audio_data,
+                )
+            except Exception as e:
+                logger.warning(f"Early synthesis failed for segment {segment.segment_index}: {e}")
+                return
+
+        audio_duration_ms = audio_bytes_duration_ms(audio_data)
+
+        async with db_lock:
+            if voice_id:
+                segment.voice_id = voice_id
+            await task_service.update_segment_audio(segment.id, audio_path, audio_duration_ms)
+
+    async def on_segment(segment_index: int, translated_text: str):
+        segment = segments_by_index.get(segment_index)
+        if segment is None:
+            return
+
+        async with db_lock:
+            await task_service.update_segment_translation(segment.id, translated_text)
+
+        voice_id = voice_cache.get(segment.speaker_id or "default") if use_voice_cloning else None
+        tts_jobs.append(asyncio.create_task(synthesize_early(segment, voice_id)))
+
+    return on_segment
+
+
+async def _reuse_preview_segments(task, task_service: TaskService, storage_service: StorageService) -> int:
+    """
+    把预览任务中相同分段的译文、voice_id 和分段音频复制到完整任务（或完整任务的分片）
+
+    分段音频在 OSS 服务端复制到本任务目录；复制失败的分段只复用译文，之后重新合成。
+
+    Args:
+        task: 完整任务（需已加载分段）
+        task_service: TaskService
+        storage_service: StorageService
+
+    Returns:
+        复用的分段数
+    """
+    preview = await task_service.get_task(task.preview_task_id, with_segments=True)
+    if not preview:
+        logger.warning(f"Preview task {task.preview_task_id} not found, nothing to reuse")
+        return 0
+
+    # 分片任务的分段时间相对窗口起点
+    matches = task_service.match_reusable_segments(
+        preview.segments,
+        task.segments,
+        settings.preview_reuse_tolerance_ms,
+        offset_ms=task.shard_start_ms or 0,
+    )
+    for segment, source in matches:
+        segment.translated_text = source.translated_text
+        segment.voice_id = source.voice_id
+        segment.voice_overridden = source.voice_overridden
+        if source.audio_path:
+            try:
+                segment.audio_path = storage_service.copy_segment_audio(
+                    source.audio_path, task.id, segment.segment_index
+                )
+                segment.audio_duration_ms = source.audio_duration_ms
+            except Exception as e:
+                logger.warning(f"Failed to reuse audio of segment {segment.segment_index}: {e}")
+
+    await task_service.db.commit()
+
+    logger.info(
+        f"Reused {len(matches)}/{len(task.segments)} segments from preview task {preview.id}"
+    )
+
+    return len(matches)
+
+
+def _collect_voice_ids(segments) -> dict[str, str]:
+    """
+    收集分段上已有的 voice_id（speaker_id -> voice_id）
+
+    编辑分段时单独指定的音色只属于该分段，不计入说话人的音色。
+
+    Args:
+        segments: Segment 列表
+
+    Returns:
+        已复刻说话人的 voice_id 映射
+    """
+    voice_cache = {}
+    for seg in segments:
+        if seg.voice_id and not seg.voice_overridden:
+            voice_cache.setdefault(seg.speaker_id or "default", seg.voice_id)
+    return voice_cache
+
+
+def _enroll_missing_speakers(
+    task_id: str,
+    extracted_audio_path: str,
+    segments,
+    voice_cache: dict[str, str],
+) -> dict[str, str]:
+    """
+    为尚未复刻的说话人复刻声音（结果写入 voice_cache）
+
+    仅当存在未复刻的说话人时才下载原始音频。
+
+    Args:
+        task_id: 任务 ID
+        extracted_audio_path: 提取音频的 OSS 路径
+        segments: Segment 列表
+        voice_cache: voice_id 缓存（speaker_id -> voice_id）
+
+    Returns:
+        voice_cache
+    """
+    from collections import defaultdict
+
+    from app.services.voice_service import VoiceService
+
+    # 按说话人分组（跳过已有 voice_id 的说话人）
+    segments_by_speaker = defaultdict(list)
+    for seg in segments:
+        speaker_id = seg.speaker_id or "default"
+        if speaker_id in voice_cache:
+            continue
+        segments_by_speaker[speaker_id].append(
+            {
+                "start_time_ms": seg.start_time_ms,
+                "end_time_ms": seg.end_time_ms,
+            }
+        )
+
+    if not segments_by_speaker:
+        logger.info(f"All speakers already enrolled: {voice_cache}")
+        return voice_cache
+
+    logger.info(
+        f"Using voice cloning model, enrolling {len(segments_by_speaker)} speakers: "
+        f"{list(segments_by_speaker.keys())}"
+    )
+
+    # 下载原始音频（用于声音复刻）
+    storage_service = StorageService()
+    temp_dir = tempfile.mkdtemp(prefix=f"task_{task_id}_enroll_")
+
+    try:
+        local_audio = storage_service.download_file(extracted_audio_path, temp_dir)
+
+        voice_service = VoiceService()
+
+        for speaker_id, speaker_segments in segments_by_speaker.items():
+            voice_id = voice_service.get_or_create_voice_id(
+                task_id=UUID(task_id),
+                speaker_id=speaker_id,
+                audio_path=local_audio,
+                segments=speaker_segments,
+                cache=voice_cache,
+            )
+
+            if not voice_id:
+                logger.error(
+                    f"Failed to enroll speaker {speaker_id}, "
+                    "using default voice"
+                )
+    finally:
+        # 清理临时文件
+        import shutil
+
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    logger.info(f"Voice enrollment completed: {voice_cache}")
+    return voice_cache
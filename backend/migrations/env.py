@@ -16,7 +16,7 @@ from app.config import settings
 
 # 导入 Base 和所有模型
 from app.database import Base
-from app.models import Task, Segment  # noqa: F401 - 确保模型被加载
+from app.models import Task, Segment, ASRCache  # noqa: F401 - 确保模型被加载
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
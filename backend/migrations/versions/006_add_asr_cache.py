@@ -0,0 +1,43 @@
+"""Add ASR result cache
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '006'
+down_revision: Union[str, None] = '005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 任务记录提取音频的内容哈希
+    op.add_column('tasks', sa.Column('audio_hash', sa.String(length=64), nullable=True))
+    op.create_index(op.f('ix_tasks_audio_hash'), 'tasks', ['audio_hash'], unique=False)
+
+    # 跨任务 ASR 结果缓存
+    op.create_table('asr_cache',
+    sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('audio_hash', sa.String(length=64), nullable=False),
+    sa.Column('model', sa.String(length=100), nullable=False),
+    sa.Column('language_hints', sa.String(length=100), nullable=False),
+    sa.Column('result', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_asr_cache_key', 'asr_cache', ['audio_hash', 'model', 'language_hints'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_asr_cache_key', table_name='asr_cache')
+    op.drop_table('asr_cache')
+    op.drop_index(op.f('ix_tasks_audio_hash'), table_name='tasks')
+    op.drop_column('tasks', 'audio_hash')
@@ -0,0 +1,33 @@
+"""Add parent_task_id for multi-language fan-out
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '007'
+down_revision: Union[str, None] = '006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('tasks', sa.Column('parent_task_id', postgresql.UUID(as_uuid=True), nullable=True))
+    op.create_foreign_key(
+        'fk_tasks_parent_task_id', 'tasks', 'tasks',
+        ['parent_task_id'], ['id'], ondelete='SET NULL'
+    )
+    op.create_index(op.f('ix_tasks_parent_task_id'), 'tasks', ['parent_task_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_tasks_parent_task_id'), table_name='tasks')
+    op.drop_constraint('fk_tasks_parent_task_id', 'tasks', type_='foreignkey')
+    op.drop_column('tasks', 'parent_task_id')
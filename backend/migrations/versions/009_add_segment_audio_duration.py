@@ -0,0 +1,25 @@
+"""Add audio_duration_ms to segments
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '009'
+down_revision: Union[str, None] = '008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('segments', sa.Column('audio_duration_ms', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('segments', 'audio_duration_ms')
@@ -0,0 +1,38 @@
+"""Add SOFT subtitle mode (subtitle track muxed into the container)
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-19 22:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '011'
+down_revision: Union[str, None] = '010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # ALTER TYPE ... ADD VALUE 不能在事务块中执行（PostgreSQL < 12）
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE subtitlemode ADD VALUE IF NOT EXISTS 'SOFT'")
+
+
+def downgrade() -> None:
+    # PostgreSQL 不支持删除枚举值：将 SOFT 任务改为 EXTERNAL 后重建类型
+    op.execute("ALTER TABLE tasks ALTER COLUMN subtitle_mode DROP DEFAULT")
+    op.execute("UPDATE tasks SET subtitle_mode = 'EXTERNAL' WHERE subtitle_mode = 'SOFT'")
+    op.execute("ALTER TYPE subtitlemode RENAME TO subtitlemode_old")
+    op.execute("CREATE TYPE subtitlemode AS ENUM ('NONE', 'EXTERNAL', 'BURN')")
+    op.execute("""
+        ALTER TABLE tasks
+        ALTER COLUMN subtitle_mode TYPE subtitlemode
+        USING subtitle_mode::text::subtitlemode
+    """)
+    op.execute("DROP TYPE subtitlemode_old")
+    op.execute("ALTER TABLE tasks ALTER COLUMN subtitle_mode SET DEFAULT 'BURN'::subtitlemode")
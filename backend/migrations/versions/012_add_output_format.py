@@ -0,0 +1,32 @@
+"""Add output_format to tasks for HLS packaging
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-19 23:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '012'
+down_revision: Union[str, None] = '011'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+output_format_enum = sa.Enum('MP4', 'HLS', name='outputformat')
+
+
+def upgrade() -> None:
+    output_format_enum.create(op.get_bind(), checkfirst=True)
+    op.add_column('tasks', sa.Column(
+        'output_format', output_format_enum,
+        nullable=False, server_default='MP4'
+    ))
+
+
+def downgrade() -> None:
+    op.drop_column('tasks', 'output_format')
+    output_format_enum.drop(op.get_bind(), checkfirst=True)
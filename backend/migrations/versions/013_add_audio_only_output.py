@@ -0,0 +1,41 @@
+"""Add audio-only output formats and output_audio_path to tasks
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-20 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '013'
+down_revision: Union[str, None] = '012'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # ALTER TYPE ... ADD VALUE 不能在事务块中执行（PostgreSQL < 12）
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE outputformat ADD VALUE IF NOT EXISTS 'M4A'")
+        op.execute("ALTER TYPE outputformat ADD VALUE IF NOT EXISTS 'OPUS'")
+    op.add_column('tasks', sa.Column('output_audio_path', sa.String(length=500), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('tasks', 'output_audio_path')
+    # PostgreSQL 不支持删除枚举值：将仅音频任务改为 MP4 后重建类型
+    op.execute("ALTER TABLE tasks ALTER COLUMN output_format DROP DEFAULT")
+    op.execute("UPDATE tasks SET output_format = 'MP4' WHERE output_format IN ('M4A', 'OPUS')")
+    op.execute("ALTER TYPE outputformat RENAME TO outputformat_old")
+    op.execute("CREATE TYPE outputformat AS ENUM ('MP4', 'HLS')")
+    op.execute("""
+        ALTER TABLE tasks
+        ALTER COLUMN output_format TYPE outputformat
+        USING output_format::text::outputformat
+    """)
+    op.execute("DROP TYPE outputformat_old")
+    op.execute("ALTER TABLE tasks ALTER COLUMN output_format SET DEFAULT 'MP4'::outputformat")
@@ -0,0 +1,33 @@
+"""Add preview fields to tasks (preview window and preview -> full run link)
+
+Revision ID: 014
+Revises: 013
+Create Date: 2026-10-20 01:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '014'
+down_revision: Union[str, None] = '013'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('tasks', sa.Column('preview_duration_ms', sa.Integer(), nullable=True))
+    op.add_column('tasks', sa.Column('preview_task_id', postgresql.UUID(as_uuid=True), nullable=True))
+    op.create_foreign_key(
+        'fk_tasks_preview_task_id', 'tasks', 'tasks',
+        ['preview_task_id'], ['id'], ondelete='SET NULL'
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('fk_tasks_preview_task_id', 'tasks', type_='foreignkey')
+    op.drop_column('tasks', 'preview_task_id')
+    op.drop_column('tasks', 'preview_duration_ms')
@@ -0,0 +1,39 @@
+"""Add shard fields to tasks for the time-sharded pipeline
+
+Revision ID: 015
+Revises: 014
+Create Date: 2026-10-20 02:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '015'
+down_revision: Union[str, None] = '014'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('tasks', sa.Column('shard_parent_id', postgresql.UUID(as_uuid=True), nullable=True))
+    op.add_column('tasks', sa.Column('shard_index', sa.Integer(), nullable=True))
+    op.add_column('tasks', sa.Column('shard_start_ms', sa.Integer(), nullable=True))
+    op.add_column('tasks', sa.Column('shard_end_ms', sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        'fk_tasks_shard_parent_id', 'tasks', 'tasks',
+        ['shard_parent_id'], ['id'], ondelete='CASCADE'
+    )
+    op.create_index(op.f('ix_tasks_shard_parent_id'), 'tasks', ['shard_parent_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_tasks_shard_parent_id'), table_name='tasks')
+    op.drop_constraint('fk_tasks_shard_parent_id', 'tasks', type_='foreignkey')
+    op.drop_column('tasks', 'shard_end_ms')
+    op.drop_column('tasks', 'shard_start_ms')
+    op.drop_column('tasks', 'shard_index')
+    op.drop_column('tasks', 'shard_parent_id')
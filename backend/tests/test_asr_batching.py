@@ -0,0 +1,60 @@
+"""
+ASR 多文件转写结果路由测试
+"""
+
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from app.integrations.dashscope import asr_client as asr_module
+from app.integrations.dashscope.asr_client import ASRClient
+
+
+def _transcription(text: str) -> dict:
+    return {
+        "properties": {"original_duration_in_milliseconds": 1000},
+        "transcripts": [
+            {"sentences": [{"text": text, "begin_time": 0, "end_time": 1000}]}
+        ],
+    }
+
+
+@pytest.fixture
+def asr_client():
+    return ASRClient(api_key="test-key", language_hints=["en"])
+
+
+def test_transcribe_batch_routes_results_by_file_url(asr_client: ASRClient):
+    """测试多文件任务按 file_url 分发结果，失败子任务被跳过"""
+    submitted = SimpleNamespace(status_code=200, output=SimpleNamespace(task_id="job-1"))
+    finished = SimpleNamespace(
+        output=SimpleNamespace(
+            task_status="SUCCEEDED",
+            results=[
+                # 返回顺序与提交顺序不同
+                {"file_url": "https://b.wav", "subtask_status": "SUCCEEDED"},
+                {"file_url": "https://c.wav", "subtask_status": "FAILED"},
+                {"file_url": "https://a.wav", "subtask_status": "SUCCEEDED"},
+            ],
+        )
+    )
+    # 结果项直接携带转写内容（无 transcription_url，避免下载）
+    for item in finished.output.results:
+        if item["file_url"] == "https://a.wav":
+            item.update(_transcription("alpha"))
+        elif item["file_url"] == "https://b.wav":
+            item.update(_transcription("bravo"))
+
+    with patch.object(asr_module.Transcription, "async_call", return_value=submitted) as submit, \
+            patch.object(asr_module.Transcription, "fetch", return_value=finished):
+        results = asr_client.transcribe_batch(
+            ["https://a.wav", "https://b.wav", "https://c.wav"]
+        )
+
+    assert submit.call_args.kwargs["file_urls"] == [
+        "https://a.wav", "https://b.wav", "https://c.wav"
+    ]
+    assert set(results) == {"https://a.wav", "https://b.wav"}
+    assert results["https://a.wav"].full_text == "alpha"
+    assert results["https://b.wav"].full_text == "bravo"
@@ -0,0 +1,45 @@
+"""
+ASR 结果缓存测试
+"""
+
+import hashlib
+
+from app.integrations.dashscope.asr_client import ASRResult, ASRSegment
+from app.services import ASRCacheService
+
+
+def test_asr_result_round_trip():
+    """测试 ASRResult 序列化/反序列化"""
+    result = ASRResult(
+        task_id="asr-task",
+        file_url="https://example.com/audio.wav",
+        segments=[
+            ASRSegment("你好", 0, 1200, speaker_id="speaker_0", confidence=0.9),
+            ASRSegment("世界", 1300, 2500, speaker_id="speaker_1", emotion="happy"),
+        ],
+        full_text="你好 世界",
+        duration_ms=2500,
+    )
+
+    restored = ASRResult.from_dict(result.to_dict())
+
+    assert restored.duration_ms == 2500
+    assert restored.full_text == "你好 世界"
+    assert [seg.to_dict() for seg in restored.segments] == [
+        seg.to_dict() for seg in result.segments
+    ]
+
+
+def test_compute_audio_hash(tmp_path):
+    """测试音频内容哈希与 hashlib 一致"""
+    audio_file = tmp_path / "audio.wav"
+    data = b"RIFF" + bytes(range(256)) * 10000
+    audio_file.write_bytes(data)
+
+    assert ASRCacheService.compute_audio_hash(str(audio_file)) == hashlib.sha256(data).hexdigest()
+
+
+def test_normalize_language_hints():
+    """测试语言提示归一化（顺序无关、去重）"""
+    assert ASRCacheService.normalize_language_hints(["zh", "en"]) == "en,zh"
+    assert ASRCacheService.normalize_language_hints(["en", "zh", "en"]) == "en,zh"
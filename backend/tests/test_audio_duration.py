@@ -0,0 +1,52 @@
+"""
+音频字节时长计算测试
+"""
+
+import io
+import struct
+import wave
+
+from app.utils.audio_duration import audio_bytes_duration_ms
+
+
+def _wav_bytes(duration_ms: int, sample_rate: int = 24000) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(b"\x00\x00" * (sample_rate * duration_ms // 1000))
+    return buffer.getvalue()
+
+
+def _mp3_frames(count: int) -> bytes:
+    """MPEG1 Layer III, 128kbps, 44.1kHz, 无填充：每帧 417 字节、1152 个采样"""
+    header = struct.pack(">I", 0xFFFB9000)
+    return (header + b"\x00" * 413) * count
+
+
+def test_wav_duration():
+    """测试 WAV 按 fmt 字节率和 data 大小计算"""
+    assert audio_bytes_duration_ms(_wav_bytes(1500)) == 1500
+
+
+def test_pcm_duration():
+    """测试裸 PCM 按采样参数计算"""
+    assert audio_bytes_duration_ms(b"\x01\x02" * 24000) == 1000
+    assert audio_bytes_duration_ms(b"\x01\x02" * 16000, pcm_sample_rate=16000) == 1000
+
+
+def test_mp3_duration_by_frames():
+    """测试 MP3 逐帧累加时长（含 ID3v2 标签）"""
+    frames = _mp3_frames(100)
+    expected = int(100 * 1152 / 44100 * 1000)
+
+    assert audio_bytes_duration_ms(frames) == expected
+
+    id3 = b"ID3\x03\x00\x00" + bytes([0, 0, 0, 20]) + b"\x00" * 20
+    assert audio_bytes_duration_ms(id3 + frames) == expected
+
+
+def test_empty_data_returns_none():
+    """测试空数据返回 None"""
+    assert audio_bytes_duration_ms(b"") is None
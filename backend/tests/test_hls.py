@@ -0,0 +1,65 @@
+"""
+HLS 输出测试
+"""
+
+from unittest.mock import patch
+
+from app.utils.ffmpeg import FFmpegHelper
+from app.utils.hls import is_playlist_complete, playlist_files, rewrite_playlist
+
+PLAYLIST = """#EXTM3U
+#EXT-X-VERSION:7
+#EXT-X-TARGETDURATION:6
+#EXT-X-PLAYLIST-TYPE:EVENT
+#EXT-X-MAP:URI="init.mp4"
+#EXTINF:6.000000,
+seg_00000.m4s
+#EXTINF:4.000000,
+seg_00001.m4s
+#EXT-X-ENDLIST
+"""
+
+
+def test_playlist_files_lists_init_then_segments():
+    """测试解析播放列表引用的文件"""
+    assert playlist_files(PLAYLIST) == ["init.mp4", "seg_00000.m4s", "seg_00001.m4s"]
+    assert is_playlist_complete(PLAYLIST)
+    assert not is_playlist_complete(PLAYLIST.replace("#EXT-X-ENDLIST\n", ""))
+
+
+def test_rewrite_playlist_signs_every_uri():
+    """测试分片 URI 改写为签名 URL，其他标签保持不变"""
+    rewritten = rewrite_playlist(PLAYLIST, lambda name: f"https://oss/{name}?sig=1")
+
+    assert '#EXT-X-MAP:URI="https://oss/init.mp4?sig=1"' in rewritten
+    assert "https://oss/seg_00001.m4s?sig=1" in rewritten
+    assert "#EXT-X-PLAYLIST-TYPE:EVENT" in rewritten
+    assert playlist_files(rewritten)[0] == "https://oss/init.mp4?sig=1"
+
+
+def test_hls_mux_publishes_segments_and_final_playlist(tmp_path):
+    """测试 HLS 封装：输出 fMP4 分片，完成后回调新分片和最终播放列表"""
+    playlist = tmp_path / "index.m3u8"
+    playlist.write_text(PLAYLIST)
+    updates = []
+
+    class FakeProcess:
+        returncode = 0
+
+        def poll(self):
+            return 0
+
+    segments = [{"path": "a.mp3", "start_ms": 0, "end_ms": 1000, "duration_ms": 800}]
+    with patch("app.utils.ffmpeg.subprocess.Popen", return_value=FakeProcess()) as popen:
+        result = FFmpegHelper().mux_dubbed_video(
+            "input.mp4", segments, str(playlist), total_duration_ms=10000,
+            soft_subtitle_path="sub.ass",
+            on_hls_update=lambda files, path: updates.append(([f.rsplit("/", 1)[-1] for f in files], path)),
+        )
+
+    cmd = popen.call_args.args[0]
+    assert result == str(playlist)
+    assert cmd[cmd.index("-hls_segment_type") + 1] == "fmp4"
+    # HLS 不封装软字幕轨道
+    assert "sub.ass" not in cmd
+    assert updates == [(["init.mp4", "seg_00000.m4s", "seg_00001.m4s"], str(playlist))]
@@ -157,7 +157,7 @@ async def test_llm_translate_batch_async(llm_client: LLMClient):
     )
 
     assert len(translations) == len(texts)
-    for text, translation in zip(texts, translations):
+    for text, translation in zip(texts, translations, strict=True):
         assert translation
         print(f"\n{text} -> {translation}")
 
@@ -0,0 +1,70 @@
+"""
+LLM 客户端（原生异步路径）测试
+"""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.integrations.dashscope import llm_client as llm_module
+from app.integrations.dashscope.llm_client import LLMClient, TranslationTruncatedError
+
+
+def _completion(content: str, finish_reason: str = "stop") -> dict:
+    return {
+        "id": "chatcmpl-test",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "qwen-turbo",
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": finish_reason,
+            }
+        ],
+        "usage": {"prompt_tokens": 5, "completion_tokens": 5, "total_tokens": 10},
+    }
+
+
+@pytest.fixture
+def mock_llm(monkeypatch):
+    """使用 httpx.MockTransport 替换共享连接池，记录请求"""
+    requests = []
+    responses = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(json.loads(request.content))
+        return httpx.Response(200, json=responses.pop(0))
+
+    monkeypatch.setattr(
+        llm_module,
+        "_get_shared_http_client",
+        lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+    client = LLMClient(api_key="test-key", base_url="https://llm.example.com/v1")
+    return client, requests, responses
+
+
+def test_translate_async_uses_async_client(mock_llm):
+    """测试原生异步翻译"""
+    client, requests, responses = mock_llm
+    responses.append(_completion("  [0] 你好  "))
+
+    result = asyncio.run(client.translate_async("[0] Hello", "en", "zh"))
+
+    assert result == "[0] 你好"
+    assert requests[0]["messages"][-1]["content"] == "[0] Hello"
+
+
+def test_translate_async_truncation_not_retried(mock_llm):
+    """测试截断直接抛出且不重试"""
+    client, requests, responses = mock_llm
+    responses.append(_completion("[0] 你", finish_reason="length"))
+
+    with pytest.raises(TranslationTruncatedError):
+        asyncio.run(client.translate_async("[0] Hello", "en", "zh"))
+
+    assert len(requests) == 1
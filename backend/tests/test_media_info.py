@@ -0,0 +1,81 @@
+"""
+媒体探测（MediaInfo）测试
+"""
+
+import json
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from app.utils.ffmpeg import FFmpegHelper, _probe_cache
+from app.utils.media_info import MediaInfo
+
+FFPROBE_OUTPUT = {
+    "format": {"format_name": "mov,mp4,m4a,3gp,3g2,mj2", "duration": "125.480000"},
+    "streams": [
+        {
+            "index": 0, "codec_type": "video", "codec_name": "h264",
+            "width": 1280, "height": 720, "avg_frame_rate": "30000/1001",
+        },
+        {
+            "index": 1, "codec_type": "audio", "codec_name": "aac",
+            "sample_rate": "48000", "channels": 2, "tags": {"language": "eng"},
+        },
+    ],
+    "packets": [
+        {"stream_index": 0, "pts_time": "0.000000", "flags": "K__"},
+        {"stream_index": 0, "pts_time": "0.033000", "flags": "___"},
+        {"stream_index": 1, "pts_time": "0.000000", "flags": "K__"},
+        {"stream_index": 0, "pts_time": "2.002000", "flags": "K__"},
+        {"stream_index": 0, "pts_time": "4.004000", "flags": "K__"},
+    ],
+}
+
+
+def test_parse_ffprobe_output():
+    """测试解析 ffprobe JSON"""
+    info = MediaInfo.from_ffprobe(FFPROBE_OUTPUT)
+
+    assert info.duration_ms == 125480
+    assert info.resolution == (1280, 720)
+    assert info.video_codec == "h264"
+    assert info.frame_rate == 29.97
+    assert info.keyframe_interval_s == 2.002
+    assert [(s.index, s.codec, s.sample_rate, s.language) for s in info.audio_streams] == [
+        (1, "aac", 48000, "eng")
+    ]
+
+    # 可序列化后原样恢复（存入 Task.media_info）
+    assert MediaInfo.from_dict(json.loads(json.dumps(info.to_dict()))) == info
+
+
+def test_probe_runs_ffprobe_once_per_file(tmp_path):
+    """测试同一文件只探测一次，时长和分辨率共用探测结果"""
+    video = tmp_path / "input.mp4"
+    video.write_bytes(b"fake")
+    _probe_cache.clear()
+
+    result = SimpleNamespace(stdout=json.dumps(FFPROBE_OUTPUT).encode())
+    with patch("app.utils.ffmpeg.subprocess.run", return_value=result) as run:
+        helper = FFmpegHelper()
+        assert helper.get_duration_ms(str(video)) == 125480
+        assert helper.get_video_resolution(str(video)) == (1280, 720)
+
+    assert run.call_count == 1
+    _probe_cache.clear()
+
+
+def test_probe_remote_url_is_not_cached():
+    """测试远程 URL 探测带重连参数，且不缓存（签名参数每次不同）"""
+    _probe_cache.clear()
+    url = "https://bucket.oss-cn-beijing.aliyuncs.com/videos/input.mp4?Signature=abc"
+
+    result = SimpleNamespace(stdout=json.dumps(FFPROBE_OUTPUT).encode())
+    with patch("app.utils.ffmpeg.subprocess.run", return_value=result) as run:
+        helper = FFmpegHelper()
+        helper.probe(url)
+        helper.probe(url)
+
+    assert run.call_count == 2
+    cmd = run.call_args.args[0]
+    assert "-reconnect" in cmd and cmd[-1] == url
+    assert not _probe_cache
@@ -0,0 +1,65 @@
+"""
+跨任务微批处理（提交超时处理）测试，使用内存中的假 Redis
+"""
+
+import json
+
+import pytest
+
+from app.services.micro_batcher import RedisMicroBatcher
+
+
+class FakeRedis:
+    """只支持微批处理用到的列表 / 字符串命令"""
+
+    def __init__(self):
+        self.lists: dict[str, list] = {}
+        self.values: dict[str, bytes] = {}
+
+    def rpush(self, key, value):
+        self.lists.setdefault(key, []).append(value)
+
+    def lrem(self, key, count, value):
+        items = self.lists.get(key, [])
+        if value in items:
+            items.remove(value)
+            return 1
+        return 0
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def delete(self, key):
+        self.values.pop(key, None)
+
+    def set(self, key, value, **kwargs):
+        self.values[key] = value.encode() if isinstance(value, str) else value
+        return True
+
+
+class LeaderTookRequestRedis(FakeRedis):
+    """模拟其他 leader 取走请求，在提交者最后一次轮询之后才写入结果"""
+
+    def rpush(self, key, value):
+        request_id = json.loads(value)["id"]
+        self.set(f"{RedisMicroBatcher.NAMESPACE}:result:{request_id}", json.dumps({"ok": 1}))
+
+
+def test_timed_out_request_withdrawn_from_queue():
+    """测试超时仍在队列中的请求被撤回，不再被之后的 leader 处理"""
+    fake = FakeRedis()
+    batcher = RedisMicroBatcher(window_ms=0, max_items=10, redis_client=fake)
+
+    with pytest.raises(TimeoutError):
+        batcher.submit("key", {"text": "a"}, timeout=0)
+
+    assert fake.lists[batcher._queue_key("key")] == []
+
+
+def test_result_written_at_deadline_still_returned():
+    """测试请求已被 leader 取走时，超时后再读取一次结果"""
+    fake = LeaderTookRequestRedis()
+    batcher = RedisMicroBatcher(window_ms=0, max_items=10, redis_client=fake)
+
+    assert batcher.submit("key", {"text": "a"}, timeout=0) == {"ok": 1}
+    assert fake.values == {}
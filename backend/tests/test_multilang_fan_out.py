@@ -0,0 +1,88 @@
+"""
+多语言配音分发（共享阶段产物复制到各语言任务）测试
+"""
+
+from contextlib import asynccontextmanager
+from unittest.mock import MagicMock, patch
+from uuid import uuid4
+
+from app.models import Segment, Task
+from app.workers import tasks as worker_tasks
+
+
+class _FakeTaskService:
+    """只支持 get_task / create_segments 的任务服务"""
+
+    def __init__(self, tasks: dict):
+        self.tasks = tasks
+        self.created = {}
+
+    async def get_task(self, task_id, with_segments=False):
+        return self.tasks.get(task_id)
+
+    async def create_segments(self, task_id, segments):
+        self.created[task_id] = segments
+        return len(segments)
+
+
+def _primary() -> Task:
+    task = Task(
+        id=uuid4(),
+        source_language="zh",
+        target_language="en",
+        extracted_audio_path="task_p/audio.wav",
+        audio_hash="abc",
+        video_duration_ms=8000,
+        media_info={"duration_ms": 8000, "width": 1280, "height": 720},
+        segment_count=2,
+    )
+    task.segments = [
+        Segment(
+            segment_index=1, start_time_ms=3000, end_time_ms=5000,
+            original_text="第二句", speaker_id="1", voice_id="voice-1",
+        ),
+        Segment(
+            segment_index=0, start_time_ms=0, end_time_ms=2000,
+            original_text="第一句", speaker_id="0", voice_id="voice-0",
+            source_spans=[{"start_time_ms": 0, "end_time_ms": 2000, "text": "第一句"}],
+        ),
+    ]
+    return task
+
+
+def test_fan_out_copies_shared_results_to_siblings():
+    """测试分发时把分段、探测结果和 voice_id 复制到每个其他语言的任务"""
+    primary = _primary()
+    siblings = [
+        Task(id=uuid4(), source_language="zh", target_language=lang) for lang in ("ja", "ko")
+    ]
+    service = _FakeTaskService({task.id: task for task in [primary, *siblings]})
+
+    @asynccontextmanager
+    async def _db_context():
+        yield MagicMock()
+
+    with (
+        patch.object(worker_tasks, "get_db_context", _db_context),
+        patch.object(worker_tasks, "TaskService", lambda db: service),
+        patch.object(worker_tasks, "_build_dub_chain"),
+        patch.object(worker_tasks, "group") as group,
+        patch.object(worker_tasks, "_update_task_status"),
+    ):
+        worker_tasks.fan_out_languages_task.run(
+            str(primary.id), str(primary.id), [str(s.id) for s in siblings]
+        )
+
+    group.return_value.apply_async.assert_called_once()
+    for sibling in siblings:
+        assert sibling.extracted_audio_path == "task_p/audio.wav"
+        assert sibling.audio_hash == "abc"
+        assert sibling.media_info == primary.media_info
+        assert sibling.video_duration_ms == 8000
+        assert sibling.segment_count == 2
+
+        segments = service.created[sibling.id]
+        assert [seg["segment_index"] for seg in segments] == [0, 1]
+        assert [seg["voice_id"] for seg in segments] == ["voice-0", "voice-1"]
+        assert segments[0]["source_spans"] == primary.segments[1].source_spans
+        assert segments[1]["original_text"] == "第二句"
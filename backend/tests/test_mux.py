@@ -0,0 +1,130 @@
+"""
+最终封装（FFmpeg 命令构建）测试
+"""
+
+import io
+from unittest.mock import patch
+
+from app.utils.ffmpeg import FFmpegHelper
+
+SEGMENTS = [
+    {"path": "a.mp3", "start_ms": 0, "end_ms": 1000, "duration_ms": 800},
+    {"path": "b.mp3", "start_ms": 2000, "end_ms": 3000, "duration_ms": 900},
+]
+
+
+def _run_mux(**kwargs) -> list[str]:
+    with patch("app.utils.ffmpeg.subprocess.run") as run:
+        FFmpegHelper().mux_dubbed_video(
+            "input.mp4", SEGMENTS, "out.mp4", total_duration_ms=4000, **kwargs
+        )
+    assert run.call_count == 1
+    return run.call_args.args[0]
+
+
+def test_single_pass_mux_copies_video_and_encodes_audio_once():
+    """测试单次封装：配音分段直接作为输入，视频流复制，音频只编码为 AAC"""
+    cmd = _run_mux()
+
+    assert cmd[cmd.index("-c:v") + 1] == "copy"
+    assert cmd[cmd.index("-c:a") + 1] == "aac"
+    assert [cmd[i + 1] for i, arg in enumerate(cmd) if arg == "-i"] == [
+        "input.mp4", "a.mp3", "b.mp3"
+    ]
+    # 分段输入从 1 开始编号
+    graph = cmd[cmd.index("-filter_complex") + 1]
+    assert "[1:a]" in graph and "[2:a]" in graph and "[0:a]" not in graph
+
+
+def test_single_pass_mux_burns_subtitles_in_same_graph():
+    """测试烧录模式在同一滤镜图中叠加字幕"""
+    cmd = _run_mux(subtitle_path="sub.ass")
+
+    graph = cmd[cmd.index("-filter_complex") + 1]
+    assert "[0:v:0]ass='sub.ass'[video]" in graph
+    assert cmd[cmd.index("-c:v") + 1] == "libx264"
+
+
+def test_soft_subtitles_muxed_as_track_without_reencode():
+    """测试软字幕：MP4 使用 mov_text 轨道，MKV 保留 ASS，视频流复制"""
+    cmd = _run_mux(soft_subtitle_path="sub.ass")
+
+    assert cmd[cmd.index("-c:v") + 1] == "copy"
+    assert [cmd[i + 1] for i, arg in enumerate(cmd) if arg == "-i"][-1] == "sub.ass"
+    assert cmd[cmd.index("-map", cmd.index("[mixed]")) + 1] == "3:s:0"
+    assert cmd[cmd.index("-c:s") + 1] == "mov_text"
+
+    assert FFmpegHelper._soft_subtitle_args("out.mkv", 2)[:4] == ["-map", "2:s:0", "-c:s", "ass"]
+
+
+def test_streaming_mux_writes_fragmented_mp4_to_pipe():
+    """测试边编码边上传：输出分片 MP4 到标准输出，交给消费者读取"""
+    consumed = []
+
+    class FakeProcess:
+        stdout = io.BytesIO(b"fragmented mp4")
+
+        def wait(self):
+            return 0
+
+    with patch("app.utils.ffmpeg.subprocess.Popen", return_value=FakeProcess()) as popen:
+        result = FFmpegHelper().mux_dubbed_video(
+            "input.mp4", SEGMENTS, "out.mp4", total_duration_ms=4000,
+            stream_to=lambda stream: consumed.append(stream.read()) or "oss/output.mp4",
+        )
+
+    cmd = popen.call_args.args[0]
+    assert result == "oss/output.mp4"
+    assert consumed == [b"fragmented mp4"]
+    assert cmd[-1] == "pipe:1" and "out.mp4" not in cmd
+    assert "empty_moov" in cmd[cmd.index("-movflags") + 1]
+
+
+def test_audio_only_mix_encodes_by_extension():
+    """测试仅音频输出：按扩展名选择编码（M4A 为 AAC，Opus 为 libopus）"""
+    with patch("app.utils.ffmpeg.subprocess.run") as run:
+        FFmpegHelper().merge_audio_segments(SEGMENTS, "out.m4a", total_duration_ms=4000)
+        FFmpegHelper().merge_audio_segments(SEGMENTS, "out.opus", total_duration_ms=4000)
+
+    m4a_cmd, opus_cmd = (call.args[0] for call in run.call_args_list)
+    assert m4a_cmd[m4a_cmd.index("-c:a") + 1] == "aac"
+    assert opus_cmd[opus_cmd.index("-c:a") + 1] == "libopus"
+    assert "input.mp4" not in m4a_cmd
+
+
+def test_replacement_audio_copied_when_already_aac():
+    """测试提前发布的 M4A 音轨在封装时直接复制，不二次编码"""
+    assert FFmpegHelper._replacement_audio_args("merged_audio.m4a") == ["-c:a", "copy"]
+    assert FFmpegHelper._replacement_audio_args("merged_audio.mp3")[:2] == ["-c:a", "aac"]
+
+
+def test_replace_audio_soft_subtitles_cut_to_given_duration():
+    """测试软字幕封装按给定时长截取（预览窗口），URL 输入带 HTTP 读取参数，不再探测"""
+    with (
+        patch("app.utils.ffmpeg.subprocess.run") as run,
+        patch.object(FFmpegHelper, "probe") as probe,
+    ):
+        FFmpegHelper().replace_audio(
+            "https://bucket/input.mp4", "dub.m4a", "out.mp4",
+            soft_subtitle_path="sub.ass", duration_ms=30000,
+        )
+
+    cmd = run.call_args.args[0]
+    probe.assert_not_called()
+    assert cmd.index("-reconnect") < cmd.index("https://bucket/input.mp4")
+    assert [cmd[i + 1] for i, arg in enumerate(cmd) if arg == "-i"] == [
+        "https://bucket/input.mp4", "dub.m4a", "sub.ass"
+    ]
+    assert cmd[cmd.index("-t") + 1] == "30.0" and "-shortest" not in cmd
+
+
+def test_single_pass_mux_url_input_reconnects():
+    """测试视频输入为签名 URL 时带 HTTP 重连参数（只作用于视频输入）"""
+    with patch("app.utils.ffmpeg.subprocess.run") as run:
+        FFmpegHelper().mux_dubbed_video(
+            "https://bucket/input.mp4", SEGMENTS, "out.mp4", total_duration_ms=4000
+        )
+
+    cmd = run.call_args.args[0]
+    assert cmd.index("-reconnect") < cmd.index("https://bucket/input.mp4") < cmd.index("a.mp3")
+    assert cmd.count("-reconnect") == 1
@@ -0,0 +1,88 @@
+"""
+OSS 流式分片上传测试（不访问网络，使用假 Bucket）
+"""
+
+import io
+from types import SimpleNamespace
+
+import pytest
+
+from app.integrations.oss import OSSClient
+
+
+class FakeBucket:
+    """记录分片上传调用的假 Bucket"""
+
+    def __init__(self, fail_part: int = 0):
+        self.fail_part = fail_part
+        self.parts: dict[int, bytes] = {}
+        self.completed = None
+        self.aborted = False
+
+    def init_multipart_upload(self, key, headers=None):
+        return SimpleNamespace(upload_id="upload-1")
+
+    def upload_part(self, key, upload_id, part_number, data):
+        if part_number == self.fail_part:
+            raise RuntimeError("network error")
+        self.parts[part_number] = data
+        return SimpleNamespace(etag=f"etag-{part_number}")
+
+    def complete_multipart_upload(self, key, upload_id, parts):
+        self.completed = (key, [(p.part_number, p.etag) for p in parts])
+
+    def abort_multipart_upload(self, key, upload_id):
+        self.aborted = True
+
+
+@pytest.fixture
+def oss_client():
+    client = OSSClient(
+        endpoint="oss-cn-test.aliyuncs.com",
+        bucket_name="bucket",
+        access_key_id="id",
+        access_key_secret="secret",
+        prefix="videos/",
+    )
+    return client
+
+
+def test_stream_split_into_ordered_parts(oss_client: OSSClient):
+    """测试流按分片大小切分上传，按序完成"""
+    oss_client.bucket = FakeBucket()
+    data = bytes(range(256)) * 10  # 2560 字节
+
+    key = oss_client.upload_stream_multipart(io.BytesIO(data), "t/output.mp4", part_size=1000)
+
+    assert key == "videos/t/output.mp4"
+    assert oss_client.bucket.completed == (
+        key, [(1, "etag-1"), (2, "etag-2"), (3, "etag-3")]
+    )
+    assert b"".join(oss_client.bucket.parts[n] for n in (1, 2, 3)) == data
+
+
+def test_stream_upload_aborts_on_part_failure(oss_client: OSSClient):
+    """测试分片失败时取消分片上传"""
+    oss_client.bucket = FakeBucket(fail_part=2)
+
+    with pytest.raises(RuntimeError):
+        oss_client.upload_stream_multipart(io.BytesIO(b"x" * 3000), "t/output.mp4", part_size=1000)
+
+    assert oss_client.bucket.aborted
+    assert oss_client.bucket.completed is None
+
+
+def test_large_copy_split_into_part_copies(oss_client: OSSClient):
+    """测试超过分片大小的文件按字节范围分片复制"""
+    bucket = FakeBucket()
+    ranges = []
+    bucket.head_object = lambda key: SimpleNamespace(content_length=2500)
+    bucket.upload_part_copy = lambda src_bucket, src_key, byte_range, key, upload_id, n: (
+        ranges.append(byte_range) or SimpleNamespace(etag=f"etag-{n}")
+    )
+    oss_client.bucket = bucket
+
+    key = oss_client.copy_file("a/input.mp4", "b/input.mp4", part_size=1000)
+
+    assert ranges == [(0, 999), (1000, 1999), (2000, 2499)]
+    assert bucket.completed == (key, [(1, "etag-1"), (2, "etag-2"), (3, "etag-3")])
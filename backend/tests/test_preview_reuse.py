@@ -0,0 +1,58 @@
+"""
+预览任务产物复用测试
+"""
+
+from types import SimpleNamespace
+
+from app.services.task_service import TaskService
+
+
+def _seg(index, start, end, text, translated=None):
+    return SimpleNamespace(
+        segment_index=index,
+        start_time_ms=start,
+        end_time_ms=end,
+        original_text=text,
+        translated_text=translated,
+    )
+
+
+def test_matches_same_text_within_tolerance():
+    """测试原文相同且时间接近的分段才复用"""
+    preview = [
+        _seg(0, 0, 1500, "你好", "Hello"),
+        _seg(1, 2000, 3000, "今天天气不错", "Nice weather today"),
+        # 预览窗口末尾被截断的分段
+        _seg(2, 118000, 120000, "我们接下", "We next"),
+    ]
+    full = [
+        _seg(0, 40, 1480, "你好"),
+        _seg(1, 2600, 3600, "今天天气不错"),       # 时间偏差超出容差
+        _seg(2, 118000, 121500, "我们接下来看看"),  # 原文不同
+    ]
+
+    matches = TaskService.match_reusable_segments(preview, full, tolerance_ms=300)
+
+    assert [(seg.segment_index, src.translated_text) for seg, src in matches] == [(0, "Hello")]
+
+
+def test_each_source_segment_reused_once():
+    """测试重复原文（如"好的"）按时间一一对应，不重复复用"""
+    preview = [_seg(0, 0, 500, "好的", "OK"), _seg(1, 5000, 5500, "好的", "Sure")]
+    full = [_seg(0, 5000, 5500, "好的"), _seg(1, 0, 500, "好的"), _seg(2, 9000, 9500, "好的")]
+
+    matches = TaskService.match_reusable_segments(preview, full)
+
+    assert [(seg.segment_index, src.translated_text) for seg, src in matches] == [
+        (0, "Sure"), (1, "OK")
+    ]
+
+
+def test_shard_segments_matched_with_window_offset():
+    """测试分片分段（时间相对窗口起点）按窗口偏移匹配预览分段"""
+    preview = [_seg(7, 61000, 63000, "欢迎收看", "Welcome")]
+    shard = [_seg(7, 1000, 3000, "欢迎收看")]
+
+    assert TaskService.match_reusable_segments(preview, shard) == []
+    matches = TaskService.match_reusable_segments(preview, shard, offset_ms=60000)
+    assert [(seg.segment_index, src.translated_text) for seg, src in matches] == [(7, "Welcome")]
@@ -0,0 +1,80 @@
+"""
+ASR 分段合并测试
+"""
+
+from app.integrations.dashscope.asr_client import ASRSegment
+from app.services import SegmentCoalescer
+from app.utils.ffmpeg import FFmpegHelper
+
+
+def _coalescer(**kwargs) -> SegmentCoalescer:
+    params = {"max_gap_ms": 400, "max_duration_ms": 10000, "max_chars": 120, "min_duration_ms": 1500}
+    params.update(kwargs)
+    return SegmentCoalescer(**params)
+
+
+def test_merges_adjacent_same_speaker_fragments():
+    """测试同一说话人、间隔较小的片段被合并，并保留原始片段"""
+    segments = [
+        ASRSegment("So today", 0, 600, speaker_id="spk0", confidence=0.8),
+        ASRSegment("we are going", 700, 1300, speaker_id="spk0", confidence=1.0),
+        ASRSegment("to talk.", 1400, 2000, speaker_id="spk0"),
+        ASRSegment("Sounds good", 2100, 3000, speaker_id="spk1"),
+    ]
+
+    units = _coalescer().coalesce(segments)
+
+    assert [u["original_text"] for u in units] == [
+        "So today we are going to talk.",
+        "Sounds good",
+    ]
+    assert units[0]["start_time_ms"] == 0 and units[0]["end_time_ms"] == 2000
+    assert [span["text"] for span in units[0]["source_spans"]] == ["So today", "we are going", "to talk."]
+    assert units[0]["confidence"] == 0.9
+    assert units[1]["source_spans"] is None
+    assert [u["segment_index"] for u in units] == [0, 1]
+
+
+def test_respects_gap_length_and_sentence_boundaries():
+    """测试间隔、时长和句末标点阈值"""
+    segments = [
+        ASRSegment("第一句话说完了。", 0, 2000, speaker_id="spk0"),
+        ASRSegment("第二句", 2100, 2600, speaker_id="spk0"),
+        ASRSegment("紧接着", 2700, 3200, speaker_id="spk0"),
+        ASRSegment("停顿很久", 5000, 5600, speaker_id="spk0"),
+    ]
+
+    units = _coalescer().coalesce(segments)
+
+    assert [u["original_text"] for u in units] == ["第一句话说完了。", "第二句紧接着", "停顿很久"]
+
+    long_units = _coalescer(max_duration_ms=3000).coalesce(
+        [ASRSegment("a", 0, 1000), ASRSegment("b", 1100, 2000), ASRSegment("c", 2100, 3200)]
+    )
+    assert [u["original_text"] for u in long_units] == ["a b", "c"]
+
+
+def test_subtitle_uses_source_spans_for_original_lines(tmp_path):
+    """测试合并单元的原文字幕按原始片段时间轴输出"""
+    output = FFmpegHelper().generate_ass_subtitle(
+        segments=[
+            {
+                "start_time_ms": 0,
+                "end_time_ms": 2000,
+                "original_text": "Hello there",
+                "translated_text": "你好",
+                "source_spans": [
+                    {"start_time_ms": 0, "end_time_ms": 900, "text": "Hello"},
+                    {"start_time_ms": 1000, "end_time_ms": 2000, "text": "there"},
+                ],
+            }
+        ],
+        output_path=str(tmp_path / "sub.ass"),
+    )
+
+    with open(output, encoding="utf-8-sig") as f:
+        events = [line for line in f if line.startswith("Dialogue")]
+    assert len(events) == 3
+    assert "0:00:00.00,0:00:02.00,Translated" in events[0]
+    assert events[1].endswith("Hello\n") and "0:00:00.00,0:00:00.90,Original" in events[1]
+    assert events[2].endswith("there\n") and "0:00:01.00,0:00:02.00,Original" in events[2]
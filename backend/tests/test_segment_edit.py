@@ -0,0 +1,132 @@
+"""
+分段编辑（增量重新配音）测试
+"""
+
+import asyncio
+from types import SimpleNamespace
+from uuid import uuid4
+
+from app.models import Segment, Task
+from app.services.task_service import TaskService
+from app.workers.tasks import _collect_voice_ids
+
+
+class _Result:
+    def __init__(self, value):
+        self.value = value
+
+    def scalar_one_or_none(self):
+        return self.value
+
+
+class _FakeSession:
+    """只支持 execute / commit / refresh 的异步会话"""
+
+    def __init__(self, segment):
+        self.segment = segment
+        self.commits = 0
+
+    async def execute(self, query):
+        return _Result(self.segment)
+
+    async def commit(self):
+        self.commits += 1
+
+    async def refresh(self, obj):
+        pass
+
+
+def _segment(**kwargs):
+    data = {
+        "task_id": uuid4(),
+        "segment_index": 3,
+        "start_time_ms": 1000,
+        "end_time_ms": 2500,
+        "translated_text": "Hello",
+        "speaker_id": "0",
+        "voice_id": "voice-0",
+        "audio_path": "task_x/segments/segment_0003.mp3",
+        "audio_duration_ms": 1200,
+    }
+    data.update(kwargs)
+    return Segment(**data)
+
+
+def test_edit_translation_marks_segment_for_synthesis():
+    """测试修改译文后清空音频，分段待重新合成"""
+    segment = _segment()
+    session = _FakeSession(segment)
+
+    asyncio.run(
+        TaskService(session).edit_segment(segment.task_id, uuid4(), translated_text="Hi there")
+    )
+
+    assert segment.translated_text == "Hi there"
+    assert segment.audio_path is None and segment.audio_duration_ms is None
+    assert segment.needs_synthesis
+    assert segment.voice_id == "voice-0"
+
+
+def test_unchanged_edit_keeps_audio():
+    """测试内容未变化的编辑不清空音频、不提交"""
+    segment = _segment()
+    session = _FakeSession(segment)
+
+    asyncio.run(
+        TaskService(session).edit_segment(
+            segment.task_id, uuid4(), translated_text="Hello", speaker_id="0"
+        )
+    )
+
+    assert segment.audio_path is not None
+    assert not segment.needs_synthesis
+    assert session.commits == 0
+
+
+def test_speaker_change_resets_voice_unless_given():
+    """测试更换说话人时清空 voice_id，同时指定音色时使用指定的音色"""
+    segment = _segment()
+    asyncio.run(TaskService(_FakeSession(segment)).edit_segment(segment.task_id, uuid4(), speaker_id="1"))
+
+    assert segment.speaker_id == "1"
+    assert segment.voice_id is None
+    assert segment.needs_synthesis
+
+    segment = _segment()
+    asyncio.run(
+        TaskService(_FakeSession(segment)).edit_segment(
+            segment.task_id, uuid4(), speaker_id="1", voice_id="voice-custom"
+        )
+    )
+
+    assert segment.voice_id == "voice-custom"
+    assert segment.voice_overridden
+    assert segment.audio_path is None
+
+
+def test_overridden_voice_not_used_for_speaker():
+    """测试单独指定的音色不作为说话人的音色，其他分段仍使用说话人自己的音色"""
+    segments = [
+        _segment(segment_index=0, speaker_id="0", voice_id="voice-custom", voice_overridden=True),
+        _segment(segment_index=1, speaker_id="0", voice_id="voice-0"),
+        _segment(segment_index=2, speaker_id="1", voice_id="voice-other", voice_overridden=True),
+    ]
+
+    assert _collect_voice_ids(segments) == {"0": "voice-0"}
+
+
+def test_redub_claim_is_conditional():
+    """测试重新配音的状态更新是条件更新：任务已在处理中时不再启动"""
+
+    class _UpdateSession(_FakeSession):
+        def __init__(self, rowcount):
+            super().__init__(None)
+            self.rowcount = rowcount
+
+        async def execute(self, query):
+            return SimpleNamespace(rowcount=self.rowcount)
+
+    task = Task(id=uuid4(), source_language="zh", target_language="en")
+
+    assert asyncio.run(TaskService(_UpdateSession(1)).start_redub(task))
+    assert not asyncio.run(TaskService(_UpdateSession(0)).start_redub(task))
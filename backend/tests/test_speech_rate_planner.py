@@ -0,0 +1,94 @@
+"""
+语速规划测试
+"""
+
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from app.services import SpeechRatePlanner
+from app.utils.ffmpeg import FFmpegHelper
+
+
+def _seg(index, start, end, text):
+    return SimpleNamespace(
+        segment_index=index,
+        start_time_ms=start,
+        end_time_ms=end,
+        original_text="src",
+        translated_text=text,
+    )
+
+
+def test_estimate_duration_by_language():
+    """测试中英文时长估算与语速成反比"""
+    zh = SpeechRatePlanner("zh")
+    en = SpeechRatePlanner("en")
+
+    assert zh.estimate_duration_ms("你好世界你好世界你") == 2000
+    assert en.estimate_duration_ms("a" * 28) == 2000
+    assert en.estimate_duration_ms("a" * 28, speech_rate=2.0) == 1000
+    # 句中标点增加停顿
+    assert en.estimate_duration_ms("aaaaaaa, aaaaaaa") > en.estimate_duration_ms("aaaaaaa aaaaaaa")
+
+
+def test_plan_speeds_up_only_overruns_and_caps_rate():
+    """测试只对超出时间槽的分段提速，且不超过最大语速"""
+    planner = SpeechRatePlanner("en", max_rate=1.5, fill_ratio=1.0)
+
+    fits = planner.plan("a" * 14, slot_ms=2000)
+    assert fits.speech_rate == 1.0 and fits.fits
+
+    overrun = planner.plan("a" * 28, slot_ms=1600)
+    assert overrun.speech_rate == 1.25 and overrun.fits
+
+    capped = planner.plan("a" * 70, slot_ms=1000)
+    assert capped.speech_rate == 1.5 and not capped.fits
+
+
+def test_plan_segments_uses_gap_to_next_segment():
+    """测试时间槽取到下一个分段开始（而非分段自身结束）"""
+    planner = SpeechRatePlanner("en", fill_ratio=1.0)
+    segments = [
+        _seg(0, 0, 1000, "a" * 28),       # 自身 1s，但到下一段有 2s
+        _seg(1, 2000, 3000, "a" * 28),    # 最后一段到视频结束 1.5s
+    ]
+
+    plans = planner.plan_segments(segments, total_duration_ms=3500)
+
+    assert plans[0].slot_ms == 2000 and plans[0].speech_rate == 1.0
+    assert plans[1].slot_ms == 1500 and plans[1].speech_rate == 1.33
+
+
+def test_merge_probes_only_unsure_segments(tmp_path):
+    """测试混音时只实测估算时长接近时间槽的分段"""
+    helper = FFmpegHelper()
+    segments = [
+        {"path": "a.mp3", "start_ms": 0, "end_ms": 1000, "estimated_ms": 500},
+        {"path": "b.mp3", "start_ms": 2000, "end_ms": 3000, "estimated_ms": 1900},
+        {"path": "c.mp3", "start_ms": 4000, "end_ms": 5000},
+    ]
+
+    with patch.object(FFmpegHelper, "get_audio_duration_ms", return_value=800) as probe, \
+            patch("app.utils.ffmpeg.subprocess.run"):
+        helper.merge_audio_segments(
+            segments, output_path=str(tmp_path / "out.mp3"), total_duration_ms=6000
+        )
+
+    assert [call.args[0] for call in probe.call_args_list] == ["b.mp3", "c.mp3"]
+
+
+def test_merge_skips_probe_for_known_durations(tmp_path):
+    """测试已记录实际时长的分段不再实测"""
+    helper = FFmpegHelper()
+    segments = [
+        {"path": "a.mp3", "start_ms": 0, "end_ms": 1000, "duration_ms": 1200},
+        {"path": "b.mp3", "start_ms": 2000, "end_ms": 3000, "duration_ms": 900, "estimated_ms": 1900},
+    ]
+
+    with patch.object(FFmpegHelper, "get_audio_duration_ms") as probe, \
+            patch("app.utils.ffmpeg.subprocess.run"):
+        helper.merge_audio_segments(
+            segments, output_path=str(tmp_path / "out.mp3"), total_duration_ms=4000
+        )
+
+    probe.assert_not_called()
@@ -0,0 +1,49 @@
+"""
+配音时间轴求解测试
+"""
+
+from app.utils.timeline import solve_timeline
+
+
+def test_clips_that_fit_keep_original_placement():
+    """测试放得下的片段保持原始位置和原速"""
+    placements = solve_timeline([(0, 800), (1000, 900), (2000, 500)], total_duration_ms=3000)
+
+    assert [p.start_ms for p in placements] == [0, 1000, 2000]
+    assert all(p.speed == 1.0 and not p.trimmed for p in placements)
+
+
+def test_long_clip_borrows_neighbor_gaps():
+    """测试超长片段借用相邻空隙，最大加速倍数低于逐段贪心压缩"""
+    clips = [(0, 500), (1000, 1600), (2000, 300)]
+    # 贪心：第二段压缩到 [1000, 2000)，需要 1.6x
+    greedy_speed = 1600 / 1000
+
+    placements = solve_timeline(clips, total_duration_ms=4000, max_lead_ms=200, max_lag_ms=300)
+
+    # 第二段提前约 200ms、第三段推迟 300ms，只需约 1.07x（贪心需 1.6x）
+    assert max(p.speed for p in placements) < 1.1 < greedy_speed
+    assert 800 <= placements[1].start_ms < 820
+    # 不重叠，且都在偏移范围内
+    ends = [p.start_ms + p.duration_ms for p in placements]
+    assert all(ends[i] <= placements[i + 1].start_ms for i in range(len(placements) - 1))
+    for (orig, _), p in zip(clips, placements, strict=True):
+        assert orig - 200 <= p.start_ms <= orig + 300
+
+
+def test_results_follow_input_order():
+    """测试结果与输入顺序一一对应"""
+    placements = solve_timeline([(2000, 500), (0, 500)], total_duration_ms=3000)
+
+    assert [p.start_ms for p in placements] == [2000, 0]
+
+
+def test_infeasible_clips_are_trimmed_at_max_speed():
+    """测试最大加速仍放不下时截断"""
+    placements = solve_timeline(
+        [(0, 5000), (1000, 500)], total_duration_ms=2000, max_lag_ms=0, max_speed=2.0
+    )
+
+    assert placements[0].trimmed
+    assert placements[0].speed == 2.0
+    assert placements[0].start_ms + placements[0].duration_ms <= placements[1].start_ms
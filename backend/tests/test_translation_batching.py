@@ -0,0 +1,91 @@
+"""
+翻译跨任务批处理结果拆分测试
+"""
+
+import asyncio
+import re
+from unittest.mock import patch
+
+from app.services import translation_batcher as batcher_module
+from app.services.translation_batcher import TranslationBatcher
+
+
+class EchoLLM:
+    """按行回显 "[i] T(text)"，省略指定文本以模拟缺失"""
+
+    def __init__(self, skip_text=None):
+        self.skip_text = skip_text
+        self.calls = []
+
+    async def translate_async(self, text, source_lang, target_lang, context=None):
+        self.calls.append(text)
+        output = []
+        for line in text.split("\n"):
+            match = re.match(r"\[(\d+)\]\s*(.+)", line)
+            if not match:
+                if text == self.skip_text:
+                    raise RuntimeError("boom")
+                return f"T({text})"
+            if match.group(2) == self.skip_text:
+                continue
+            output.append(f"[{match.group(1)}] T({match.group(2)})")
+        return "\n".join(output)
+
+
+def test_process_batch_demultiplexes_per_task():
+    """测试多个任务的分段合并为一次请求，并按任务拆分结果"""
+    llm = EchoLLM()
+    batcher = TranslationBatcher(redis_client=object())
+    payloads = [
+        {"texts": ["a1", "a2"], "source_lang": "en", "target_lang": "zh", "model": "m"},
+        {"texts": ["b1"], "source_lang": "en", "target_lang": "zh", "model": "m"},
+        {"texts": ["c1", "c2", "c3"], "source_lang": "en", "target_lang": "zh", "model": "m"},
+    ]
+
+    with patch.object(batcher_module, "LLMClient", return_value=llm):
+        results = batcher.process_batch("m|en|zh", payloads)
+
+    assert len(llm.calls) == 1
+    assert results == [
+        {"translations": ["T(a1)", "T(a2)"]},
+        {"translations": ["T(b1)"]},
+        {"translations": ["T(c1)", "T(c2)", "T(c3)"]},
+    ]
+
+
+def test_process_batch_marks_untranslated_as_none():
+    """测试补译后仍失败的分段在结果中为 None"""
+    llm = EchoLLM(skip_text="b1")
+    batcher = TranslationBatcher(redis_client=object())
+    payloads = [
+        {"texts": ["a1"], "source_lang": "en", "target_lang": "zh", "model": "m"},
+        {"texts": ["b1", "b2"], "source_lang": "en", "target_lang": "zh", "model": "m"},
+    ]
+
+    with patch.object(batcher_module, "LLMClient", return_value=llm):
+        results = batcher.process_batch("m|en|zh", payloads)
+
+    assert results == [
+        {"translations": ["T(a1)"]},
+        {"translations": [None, "T(b2)"]},
+    ]
+
+
+def test_batches_reuse_thread_event_loop():
+    """测试同一线程的各批次复用同一事件循环（共享 httpx 连接池不随批次泄漏）"""
+    loops = []
+
+    class LoopRecordingLLM(EchoLLM):
+        async def translate_async(self, text, source_lang, target_lang, context=None):
+            loops.append(asyncio.get_running_loop())
+            return await super().translate_async(text, source_lang, target_lang, context)
+
+    batcher = TranslationBatcher(redis_client=object())
+    payloads = [{"texts": ["a1"], "source_lang": "en", "target_lang": "zh", "model": "m"}]
+
+    with patch.object(batcher_module, "LLMClient", return_value=LoopRecordingLLM()):
+        batcher.process_batch("m|en|zh", payloads)
+        batcher.process_batch("m|en|zh", payloads)
+
+    assert len(loops) == 2 and loops[0] is loops[1]
+    assert not loops[0].is_closed()
@@ -0,0 +1,75 @@
+"""
+翻译分块（token 预算）测试
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.translation_chunker import StreamingTranslationParser, TranslationChunker
+
+
+def _seg(index: int, text: str):
+    return SimpleNamespace(segment_index=index, original_text=text)
+
+
+@pytest.fixture(autouse=True)
+def _reset_budget_scales():
+    TranslationChunker._budget_scales.clear()
+    yield
+    TranslationChunker._budget_scales.clear()
+
+
+def test_chunks_respect_output_budget():
+    """测试每块预估输出 token 不超过预算"""
+    segments = [_seg(i, "这是一个用于测试分块的中文句子。" * 5) for i in range(40)]
+    budget = TranslationChunker.output_token_budget("zh", "en", max_tokens=1000)
+
+    chunks = TranslationChunker.chunk_segments(segments, "zh", "en", max_tokens=1000)
+
+    assert len(chunks) > 1
+    for chunk in chunks:
+        estimated = sum(
+            TranslationChunker.estimate_output_tokens(s.original_text, "zh", "en")
+            for s in chunk
+        )
+        assert estimated <= budget
+
+    covered = {s.segment_index for chunk in chunks for s in chunk}
+    assert covered == set(range(40))
+
+
+def test_expansion_ratio_affects_chunk_count():
+    """测试目标语言膨胀系数：en->zh 比 zh->en 需要更多块"""
+    segments = [_seg(i, "This is a sentence used to test chunking. " * 3) for i in range(40)]
+
+    to_zh = TranslationChunker.chunk_segments(segments, "en", "zh", max_tokens=1000)
+    to_es = TranslationChunker.chunk_segments(segments, "en", "es", max_tokens=1000)
+
+    assert len(to_zh) > len(to_es)
+
+
+def test_truncation_shrinks_and_success_recovers_budget():
+    """测试截断后预算缩小、成功后逐步恢复"""
+    full = TranslationChunker.output_token_budget("zh", "en", max_tokens=1000)
+
+    TranslationChunker.record_truncation("zh", "en")
+    shrunk = TranslationChunker.output_token_budget("zh", "en", max_tokens=1000)
+    assert shrunk < full
+    # 其他语言对不受影响
+    assert TranslationChunker.output_token_budget("zh", "ja", max_tokens=1000) == full
+
+    for _ in range(20):
+        TranslationChunker.record_success("zh", "en")
+    assert TranslationChunker.output_token_budget("zh", "en", max_tokens=1000) == full
+
+
+def test_streaming_parser_yields_complete_lines():
+    """测试流式解析器只产出完整的行"""
+    parser = StreamingTranslationParser()
+
+    assert parser.feed("[3] Hel") == []
+    assert parser.feed("lo\n[4] Wo") == [(3, "Hello")]
+    assert parser.feed("rld\nnoise\n") == [(4, "World")]
+    assert parser.feed("[5] End") == []
+    assert parser.close() == [(5, "End")]
@@ -0,0 +1,189 @@
+"""
+分段翻译服务（局部失败恢复）测试
+"""
+
+import asyncio
+import re
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from app.integrations.dashscope.llm_client import TranslationTruncatedError
+from app.services import TranslationChunker, TranslationService
+
+
+def _seg(index: int, text: str):
+    return SimpleNamespace(segment_index=index, original_text=text)
+
+
+class FakeLLM:
+    """按行回显 "[i] T(text)" 的假 LLM，可注入失败"""
+
+    def __init__(self, fail_on=None, drop=None, truncate_over=None):
+        self.fail_on = set(fail_on or [])        # 包含这些索引的请求直接失败
+        self.drop = set(drop or [])              # 首次出现时从输出中省略这些索引
+        self.truncate_over = truncate_over       # 行数超过该值时模拟截断
+        self.calls = []
+
+    async def translate_async(self, text, source_lang, target_lang, context=None):
+        self.calls.append(text)
+        lines = text.split("\n")
+        indices = [int(m.group(1)) for m in (re.match(r"\[(\d+)\]", line) for line in lines) if m]
+
+        if not indices:
+            if any(text == f"line {i}" for i in self.fail_on):
+                raise RuntimeError("boom")
+            return f"T({text})"
+        if self.fail_on & set(indices):
+            raise RuntimeError("boom")
+        if self.truncate_over and len(indices) > self.truncate_over:
+            raise TranslationTruncatedError("truncated")
+
+        output = []
+        for line in lines:
+            idx, body = re.match(r"\[(\d+)\]\s*(.+)", line).groups()
+            if int(idx) in self.drop:
+                self.drop.discard(int(idx))
+                continue
+            output.append(f"[{idx}] T({body})")
+        return "\n".join(output)
+
+
+def _service(llm):
+    return TranslationService("en", "zh", llm_client=llm)
+
+
+def test_failed_chunk_is_bisected():
+    """测试失败块二分后只放弃真正失败的分段"""
+    segments = [_seg(i, f"line {i}") for i in range(8)]
+    llm = FakeLLM(fail_on={5})
+
+    result = asyncio.run(_service(llm).translate_segments(segments))
+
+    assert set(result) == set(range(8)) - {5}
+    assert result[0] == "T(line 0)"
+
+
+def test_missing_indices_are_resent_only():
+    """测试只补译缺失的索引，已完成的翻译不重发"""
+    segments = [_seg(i, f"line {i}") for i in range(6)]
+    llm = FakeLLM(drop={2, 4})
+
+    result = asyncio.run(_service(llm).translate_segments(segments))
+
+    assert set(result) == set(range(6))
+    assert len(llm.calls) == 2
+    assert llm.calls[1] == "[2] line 2\n[4] line 4"
+
+
+def test_truncated_chunk_is_resplit():
+    """测试截断的块被拆分重译"""
+    segments = [_seg(i, f"line {i}") for i in range(6)]
+    llm = FakeLLM(truncate_over=2)
+
+    result = asyncio.run(_service(llm).translate_segments(segments))
+
+    assert set(result) == set(range(6))
+
+
+class FakeStreamLLM(FakeLLM):
+    """以小片段流式输出的假 LLM，可在输出若干行后截断"""
+
+    def __init__(self, truncate_after_lines=None, **kwargs):
+        super().__init__(**kwargs)
+        self.truncate_after_lines = truncate_after_lines
+        self.events = []
+
+    async def translate_stream_async(self, text, source_lang, target_lang, context=None):
+        full = await self.translate_async(text, source_lang, target_lang, context)
+        lines = full.split("\n")
+        truncated = self.truncate_after_lines is not None and len(lines) > self.truncate_after_lines
+        if truncated:
+            # 截断：完整输出前 N 行，再输出半行
+            lines = lines[: self.truncate_after_lines] + [lines[self.truncate_after_lines][:4]]
+        output = "\n".join(lines)
+        for start in range(0, len(output), 3):
+            self.events.append("delta")
+            yield output[start:start + 3]
+        if truncated:
+            raise TranslationTruncatedError("truncated")
+
+
+def test_stream_emits_segments_before_chunk_completes():
+    """测试流式翻译逐行回调（回调发生在流结束前）"""
+    segments = [_seg(i, f"line {i}") for i in range(4)]
+    llm = FakeStreamLLM()
+    emitted = []
+
+    async def on_segment(idx, text):
+        llm.events.append(f"seg{idx}")
+        emitted.append((idx, text))
+
+    service = TranslationService("en", "zh", llm_client=llm, on_segment=on_segment, stream=True)
+    result = asyncio.run(service.translate_segments(segments))
+
+    assert emitted == [(i, f"T(line {i})") for i in range(4)]
+    assert result == dict(emitted)
+    # 第一个分段在最后一个增量之前就已回调
+    assert llm.events.index("seg0") < len(llm.events) - 1 - llm.events[::-1].index("delta")
+
+
+def test_stream_truncation_keeps_received_lines():
+    """测试流式截断时保留已完成的行，只重译剩余分段"""
+    segments = [_seg(i, f"line {i}") for i in range(6)]
+    llm = FakeStreamLLM(truncate_after_lines=4)
+
+    result = asyncio.run(
+        TranslationService("en", "zh", llm_client=llm, stream=True).translate_segments(segments)
+    )
+
+    assert result == {i: f"T(line {i})" for i in range(6)}
+    assert llm.calls[1] == "[4] line 4\n[5] line 5"
+
+
+class ChunkTaggingLLM(FakeStreamLLM):
+    """译文标记所属块（按块首索引），首个分段为 slow_first 的块延迟输出"""
+
+    def __init__(self, slow_first=None):
+        super().__init__()
+        self.slow_first = slow_first
+
+    async def translate_async(self, text, source_lang, target_lang, context=None):
+        first = int(re.match(r"\[(\d+)\]", text).group(1))
+        if first == self.slow_first:
+            await asyncio.sleep(0.05)
+        output = await super().translate_async(text, source_lang, target_lang, context)
+        return "\n".join(f"{line}@{first}" for line in output.split("\n"))
+
+
+def _overlapping_chunks(segments, *args, **kwargs):
+    # 两块重叠 1、2 两个分段
+    return [segments[:3], segments[1:]]
+
+
+def test_overlap_uses_later_chunk():
+    """测试重叠分段使用后一块的译文"""
+    segments = [_seg(i, f"line {i}") for i in range(4)]
+
+    with patch.object(TranslationChunker, "chunk_segments", _overlapping_chunks):
+        result = asyncio.run(_service(ChunkTaggingLLM()).translate_segments(segments))
+
+    assert result == {0: "T(line 0)@0", 1: "T(line 1)@1", 2: "T(line 2)@1", 3: "T(line 3)@1"}
+
+
+def test_overlap_keeps_emitted_translation():
+    """测试流式回调过的重叠分段保持回调时的译文（即使来自先完成的块）"""
+    segments = [_seg(i, f"line {i}") for i in range(4)]
+    emitted = {}
+
+    async def on_segment(idx, text):
+        emitted[idx] = text
+
+    # 前一块较慢：后一块先回调了重叠分段，前一块的版本不能覆盖
+    service = TranslationService(
+        "en", "zh", llm_client=ChunkTaggingLLM(slow_first=0), on_segment=on_segment, stream=True
+    )
+    with patch.object(TranslationChunker, "chunk_segments", _overlapping_chunks):
+        result = asyncio.run(service.translate_segments(segments))
+
+    assert result == emitted
+    assert result[1] == "T(line 1)@1"
@@ -0,0 +1,154 @@
+"""
+视频分片（关键帧切分 / ASS 平移）测试
+"""
+
+from unittest.mock import patch
+
+from app.utils.ffmpeg import FFmpegHelper
+from app.utils.media_info import MediaInfo
+from app.utils.video_split import (
+    ass_event_intervals,
+    plan_shards,
+    plan_smart_render,
+    plan_split_points,
+    shift_ass_events,
+    speech_gaps,
+)
+
+ASS = """[Script Info]
+ScriptType: v4.00+
+
+[Events]
+Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
+Dialogue: 0,0:00:01.00,0:00:03.00,Translated,,0,0,0,,first, with comma
+Dialogue: 0,0:00:09.50,0:00:11.00,Translated,,0,0,0,,second
+Dialogue: 1,0:00:25.00,0:00:26.00,Original,,0,0,0,,third
+"""
+
+
+def test_split_points_snap_to_nearest_keyframes():
+    """测试切点取最接近等分位置的关键帧"""
+    keyframes = list(range(0, 60000, 2000))
+
+    ranges = plan_split_points(keyframes, 60000, pieces=3)
+
+    assert ranges == [(0, 20000), (20000, 40000), (40000, 60000)]
+
+
+def test_split_points_respect_min_piece_duration():
+    """测试过短的分片被合并"""
+    ranges = plan_split_points([0, 5000, 9000], 10000, pieces=4, min_piece_ms=4000)
+
+    assert ranges == [(0, 5000), (5000, 10000)]
+    assert plan_split_points([], 10000, pieces=4) == [(0, 10000)]
+
+
+def test_shift_ass_events_to_piece_timeline():
+    """测试按分片平移字幕：只保留重叠事件，并裁剪到分片范围"""
+    shifted = shift_ass_events(ASS, offset_ms=10000, duration_ms=10000)
+
+    assert "[Script Info]" in shifted
+    assert ass_event_intervals(shifted) == [(0, 1000)]
+    assert "first" not in shifted and "third" not in shifted
+
+    assert ass_event_intervals(ASS) == [(1000, 3000), (9500, 11000), (25000, 26000)]
+    assert "first, with comma" in shift_ass_events(ASS, 0, 10000)
+
+
+def test_smart_render_reencodes_only_gops_with_events():
+    """测试只有与字幕事件重叠的 GOP 需要重编码，相邻同类 GOP 合并"""
+    keyframes = list(range(0, 30000, 2000))
+    events = ass_event_intervals(ASS)  # 1-3s, 9.5-11s, 25-26s
+
+    runs = plan_smart_render(keyframes, 30000, events)
+
+    assert runs == [
+        (0, 4000, True),
+        (4000, 8000, False),
+        (8000, 12000, True),
+        (12000, 24000, False),
+        (24000, 26000, True),
+        (26000, 30000, False),
+    ]
+    assert plan_smart_render(keyframes, 30000, []) == [(0, 30000, False)]
+
+
+def test_shards_prefer_keyframes_inside_silences():
+    """测试分片切点优先选择理想位置附近落在静音中的关键帧"""
+    keyframes = list(range(0, 3600000, 2000))
+    # 理想切点 1200000 / 2400000 附近各有一段静音，但不在最近的关键帧上
+    silences = [(1250500, 1252500), (2330000, 2333000)]
+
+    windows = plan_shards(3600000, keyframes, silences, target_shard_ms=1200000)
+
+    assert windows == [(0, 1252000), (1252000, 2332000), (2332000, 3600000)]
+
+
+def test_shards_fall_back_to_nearest_keyframe_and_merge_short_tail():
+    """测试附近没有静音时取最近关键帧，过短的尾片并入前一片"""
+    keyframes = [0, 865000, 2400000]
+
+    windows = plan_shards(2600000, keyframes, [], target_shard_ms=1000000, min_shard_ms=700000)
+
+    assert windows == [(0, 865000), (865000, 2600000)]
+    assert plan_shards(900000, keyframes, [], target_shard_ms=1000000) == [(0, 900000)]
+
+
+def test_shards_never_cut_inside_speech_when_silence_required():
+    """测试要求静音切点时不取语音中间的关键帧：取更远的静音关键帧，没有时不切分"""
+    keyframes = [0, 1000000, 1600000, 2000000]
+    gaps = [(1590000, 1610000)]
+
+    windows = plan_shards(
+        2000000, keyframes, gaps, target_shard_ms=1000000, require_silence=True
+    )
+
+    assert windows == [(0, 1600000), (1600000, 2000000)]
+    assert plan_shards(
+        2000000, keyframes, [], target_shard_ms=1000000, require_silence=True
+    ) == [(0, 2000000)]
+
+
+def test_speech_gaps_between_merged_segments():
+    """测试语音间隙：重叠分段合并后取空白，包含开头和结尾"""
+    intervals = [(5000, 8000), (1000, 3000), (2500, 4000), (9000, 10000)]
+
+    assert speech_gaps(intervals, 12000) == [(0, 1000), (4000, 5000), (8000, 9000), (10000, 12000)]
+    assert speech_gaps([(0, 12000)], 12000) == []
+
+
+def test_open_gop_detected_from_leading_frames():
+    """测试关键帧之后（解码顺序）出现显示时间更早的帧时判定为开放 GOP"""
+    closed = [(0, True), (80, False), (40, False), (120, False), (2000, True), (2080, False), (2040, False)]
+    open_gop = [(0, True), (80, False), (40, False), (2000, True), (1920, False), (1960, False)]
+
+    assert not FFmpegHelper._has_open_gop(closed)
+    assert FFmpegHelper._has_open_gop(open_gop)
+
+
+def test_smart_render_encodes_with_source_parameters():
+    """测试重编码分片沿用源视频的档次 / 级别 / 参考帧 / 码率"""
+    info = MediaInfo(
+        duration_ms=60000, video_codec="h264", pix_fmt="yuv420p",
+        video_profile="High", video_level=40, video_refs=4, video_bit_rate=2000000,
+    )
+
+    args = FFmpegHelper._matching_h264_args(info)
+
+    assert args[:6] == ["-profile:v", "high", "-level:v", "4.0", "-refs", "4"]
+    assert "-crf" not in args and "2000000" in args
+    assert "-crf" in FFmpegHelper._matching_h264_args(MediaInfo(duration_ms=1, video_codec="h264"))
+
+
+def test_smart_render_refuses_open_gop_and_other_codecs(tmp_path):
+    """测试源视频为开放 GOP 或非 H.264 时不做局部重编码"""
+    subtitle = tmp_path / "sub.ass"
+    subtitle.write_text(ASS, encoding="utf-8")
+    helper = FFmpegHelper()
+    h264 = MediaInfo(duration_ms=30000, video_codec="h264")
+
+    with patch.object(helper, "_probe_video_packets", return_value=[(0, True), (2000, True), (1960, False)]):
+        assert helper.smart_burn_subtitles("in.mp4", str(subtitle), "out.mp4", 30000, media_info=h264) is None
+    with patch.object(helper, "_probe_video_packets", return_value=[(0, True)]):
+        hevc = MediaInfo(duration_ms=30000, video_codec="hevc")
+        assert helper.smart_burn_subtitles("in.mp4", str(subtitle), "out.mp4", 30000, media_info=hevc) is None
@@ -261,6 +261,9 @@ export default function TaskDetailPage({ params }: { params: { id: string } }) {
                 {task.subtitle_mode === 'BURN' && (
                   <span>（字幕已烧录到视频中）</span>
                 )}
+                {task.subtitle_mode === 'SOFT' && (
+                  <span>（字幕已作为可切换轨道封装进视频）</span>
+                )}
               </p>
             </div>
           </div>
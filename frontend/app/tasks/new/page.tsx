@@ -309,6 +309,12 @@ export default function NewTaskPage() {
                       <span className="text-xs text-muted-foreground">将字幕嵌入视频画面，无需单独加载</span>
                     </div>
                   </SelectItem>
+                  <SelectItem value="soft">
+                    <div className="flex flex-col">
+                      <span>软字幕轨道</span>
+                      <span className="text-xs text-muted-foreground">字幕作为可切换轨道封装进视频，无需重新编码，速度最快</span>
+                    </div>
+                  </SelectItem>
                   <SelectItem value="external">
                     <div className="flex flex-col">
                       <span>外挂字幕</span>
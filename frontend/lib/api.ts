@@ -51,8 +51,9 @@ export type TaskStatus =
   | 'failed';
 
 // 后端返回大写，前端发送小写（后端会转换）
-export type SubtitleMode = 'none' | 'external' | 'burn';
-export type SubtitleModeResponse = 'NONE' | 'EXTERNAL' | 'BURN';
+export type SubtitleMode = 'none' | 'external' | 'burn' | 'soft';
+export type SubtitleModeResponse = 'NONE' | 'EXTERNAL' | 'BURN' | 'SOFT';
+export type OutputFormatResponse = 'MP4' | 'HLS' | 'M4A' | 'OPUS';
 
 export interface Task {
   id: string;
@@ -61,6 +62,9 @@ export interface Task {
   target_language: string;
   status: TaskStatus;
   subtitle_mode: SubtitleModeResponse;
+  output_format: OutputFormatResponse;
+  preview_duration_ms: number | null;
+  preview_task_id: string | null;
   progress: number;
   current_step: string | null;
   error_message: string | null;
@@ -83,6 +87,8 @@ export interface Segment {
   confidence: number | null;
   voice_id: string | null;
   audio_path: string | null;
+  needs_synthesis?: boolean;
+  source_spans?: { start_time_ms: number; end_time_ms: number; text: string }[] | null;
   created_at: string;
   updated_at: string;
 }
@@ -92,6 +98,7 @@ export interface TaskDetail extends Task {
   input_video_path: string | null;
   extracted_audio_path: string | null;
   output_video_path: string | null;
+  output_audio_path: string | null;
   subtitle_file_path: string | null;
   celery_task_id: string | null;
   segments: Segment[];
@@ -108,6 +115,14 @@ export interface TaskListResponse {
 export interface DownloadUrlResponse {
   download_url: string;
   subtitle_url?: string;
+  // HLS 输出：播放列表地址（合成过程中即可播放），ready 表示是否已全部生成
+  playlist_url?: string;
+  ready?: boolean;
+  audio_url?: string;
+  // 烧录模式下音轨和字幕先于视频发布
+  audio_ready?: boolean;
+  subtitle_ready?: boolean;
+  video_ready?: boolean;
   expires_in: number;
 }
 
@@ -260,6 +275,32 @@ export async function deleteTask(taskId: string): Promise<void> {
   await apiClient.delete(`/tasks/${taskId}`);
 }
 
+export interface SegmentUpdate {
+  translated_text?: string;
+  speaker_id?: string;
+  voice_id?: string;
+}
+
+/**
+ * 编辑分段（译文 / 说话人 / 音色），修改后待重新配音
+ */
+export async function updateSegment(
+  taskId: string,
+  segmentId: string,
+  data: SegmentUpdate
+): Promise<Segment> {
+  const response = await apiClient.patch<Segment>(`/tasks/${taskId}/segments/${segmentId}`, data);
+  return response.data;
+}
+
+/**
+ * 重新配音已编辑的分段（只合成修改过的分段，之后重新封装）
+ */
+export async function redubTask(taskId: string): Promise<Task> {
+  const response = await apiClient.post<Task>(`/tasks/${taskId}/redub`);
+  return response.data;
+}
+
 /**
  * 获取任务结果下载链接
  */
@@ -412,4 +453,12 @@ export const taskApi = {
   getResult: async (taskId: string): Promise<DownloadUrlResponse> => {
     return getDownloadUrl(taskId);
   },
+
+  updateSegment: async (taskId: string, segmentId: string, data: SegmentUpdate): Promise<Segment> => {
+    return updateSegment(taskId, segmentId, data);
+  },
+
+  redub: async (taskId: string): Promise<Task> => {
+    return redubTask(taskId);
+  },
 };
@@ -9,6 +9,12 @@ export type TaskStatus =
   | 'completed'
   | 'failed';
 
+export interface SourceSpan {
+  start_time_ms: number;
+  end_time_ms: number;
+  text: string;
+}
+
 export interface Segment {
   id: string;
   task_id: string;
@@ -21,10 +27,15 @@ export interface Segment {
   emotion: string | null;
   confidence: number | null;
   audio_path: string | null;
+  audio_duration_ms?: number | null;
+  needs_synthesis?: boolean;
   voice_id: string | null;
+  source_spans?: SourceSpan[] | null;
 }
 
-export type SubtitleMode = 'none' | 'external' | 'burn';
+export type SubtitleMode = 'none' | 'external' | 'burn' | 'soft';
+
+export type OutputFormat = 'MP4' | 'HLS' | 'M4A' | 'OPUS';
 
 export interface Task {
   id: string;
@@ -33,6 +44,9 @@ export interface Task {
   target_language: string;
   status: TaskStatus;
   subtitle_mode: SubtitleMode;
+  output_format?: OutputFormat;
+  preview_duration_ms?: number | null;
+  preview_task_id?: string | null;
 
   // 进度相关
   current_step: string | null;
@@ -43,6 +57,7 @@ export interface Task {
   input_video_path: string | null;
   extracted_audio_path: string | null;
   output_video_path: string | null;
+  output_audio_path?: string | null;
   subtitle_file_path: string | null;
 
   // 元数据
@@ -75,5 +90,12 @@ export interface TaskListResponse {
 export interface TaskResultResponse {
   download_url: string;
   subtitle_url?: string;
+  playlist_url?: string;
+  ready?: boolean;
+  audio_url?: string;
+  // 烧录模式下音轨和字幕先于视频发布
+  audio_ready?: boolean;
+  subtitle_ready?: boolean;
+  video_ready?: boolean;
   expires_in: number;
 }